@@ -1,10 +1,39 @@
 from __future__ import absolute_import
 
+import six
+
+from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
+from django.db import connections
+from threading import Lock
+from time import time
+
+from sentry.utils import metrics
+from sentry.utils.threadpool import BoundedThreadPool
 
 registry = {}
 
 
+_attr_loader_pool = None
+_attr_loader_pool_lock = Lock()
+
+
+def get_attr_loader_pool():
+    global _attr_loader_pool
+
+    if not settings.SENTRY_API_SERIALIZER_WORKERS:
+        return None
+
+    if _attr_loader_pool is None:
+        with _attr_loader_pool_lock:
+            if _attr_loader_pool is None:
+                _attr_loader_pool = BoundedThreadPool(
+                    workers=settings.SENTRY_API_SERIALIZER_WORKERS,
+                    name='serializer-attr-loader',
+                )
+    return _attr_loader_pool
+
+
 def serialize(objects, user=None, serializer=None, *args, **kwargs):
     if user is None:
         user = AnonymousUser()
@@ -50,6 +79,39 @@ def register(type):
     return wrapped
 
 
+def _in_atomic_block():
+    return any(conn.in_atomic_block for conn in connections.all())
+
+
+def _close_unusable_connections():
+    # Worker threads outlive requests, so they need to discard database
+    # connections which have gone bad themselves. Unlike
+    # ``close_old_connections`` this keeps connections open when
+    # ``CONN_MAX_AGE`` is 0, which would otherwise reconnect for every loader.
+    for conn in connections.all():
+        if conn.connection is None:
+            continue
+        if conn.errors_occurred:
+            if conn.is_usable():
+                conn.errors_occurred = False
+            else:
+                conn.close()
+                continue
+        max_age = conn.settings_dict.get('CONN_MAX_AGE')
+        if max_age and conn.close_at is not None and time() >= conn.close_at:
+            conn.close()
+
+
+def _run_attr_loader(serializer_name, name, loader, in_thread=False):
+    if in_thread:
+        _close_unusable_connections()
+    with metrics.timer('api.serializer.attr-loader', tags={
+        'serializer': serializer_name,
+        'loader': name,
+    }):
+        return loader()
+
+
 class Serializer(object):
     def __call__(self, obj, attrs, user, *args, **kwargs):
         if obj is None:
@@ -59,5 +121,33 @@ class Serializer(object):
     def get_attrs(self, item_list, user, *args, **kwargs):
         return {}
 
+    def load_attrs(self, loaders):
+        """
+        Run a mapping of independent attribute loaders (callables which take
+        no arguments) and return a mapping of the same keys to their results.
+
+        When ``SENTRY_API_SERIALIZER_WORKERS`` is set the loaders run
+        concurrently on a shared, bounded thread pool, so the time taken is
+        that of the slowest loader rather than the sum of all of them.
+        Otherwise they run sequentially in the calling thread, as they do
+        inside a transaction, whose uncommitted writes are not visible to
+        the connections of the pool.
+        """
+        serializer_name = type(self).__name__
+        pool = None
+        if len(loaders) > 1 and not _in_atomic_block():
+            pool = get_attr_loader_pool()
+        if pool is None:
+            return {
+                name: _run_attr_loader(serializer_name, name, loader)
+                for name, loader in six.iteritems(loaders)
+            }
+
+        futures = {
+            name: pool.submit(_run_attr_loader, serializer_name, name, loader, in_thread=True)
+            for name, loader in six.iteritems(loaders)
+        }
+        return {name: future.result() for name, future in six.iteritems(futures)}
+
     def serialize(self, obj, attrs, user, *args, **kwargs):
         return {}
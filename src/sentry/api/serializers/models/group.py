@@ -108,57 +108,80 @@ class GroupSerializer(Serializer):
 
         return results
 
-    def get_attrs(self, item_list, user):
-        from sentry.plugins import plugins
+    def get_attr_loaders(self, item_list, user):
+        """
+        Returns the independent queries needed to serialize ``item_list``,
+        which are run concurrently by ``load_attrs``.
+        """
+        group_ids = [g.id for g in item_list]
+
+        loaders = {
+            'assignees': lambda: dict(
+                (a.group_id, a.user)
+                for a in GroupAssignee.objects.filter(
+                    group__in=group_ids,
+                ).select_related('user')
+            ),
+            'user_counts': lambda: tagstore.get_group_values_seen(
+                group_ids, environment_id=None, key='sentry:user'),
+            'ignore_items': lambda: {g.group_id: g for g in GroupSnooze.objects.filter(
+                group__in=group_ids,
+            )},
+            'resolutions': lambda: {
+                i[0]: i[1:]
+                for i in GroupResolution.objects.filter(
+                    group__in=group_ids,
+                ).values_list(
+                    'group',
+                    'type',
+                    'release__version',
+                    'actor_id',
+                )
+            },
+            'share_ids': lambda: dict(GroupShare.objects.filter(
+                group__in=group_ids,
+            ).values_list('group_id', 'uuid')),
+        }
 
+        if user.is_authenticated() and item_list:
+            loaders.update({
+                'bookmarks': lambda: set(
+                    GroupBookmark.objects.filter(
+                        user=user,
+                        group__in=group_ids,
+                    ).values_list('group_id', flat=True)
+                ),
+                'seen_groups': lambda: dict(
+                    GroupSeen.objects.filter(
+                        user=user,
+                        group__in=group_ids,
+                    ).values_list('group_id', 'last_seen')
+                ),
+                'subscriptions': lambda: self._get_subscriptions(item_list, user),
+            })
+
+        return loaders
+
+    def get_attrs(self, item_list, user):
         GroupMeta.objects.populate_cache(item_list)
 
         attach_foreignkey(item_list, Group.project)
 
-        if user.is_authenticated() and item_list:
-            bookmarks = set(
-                GroupBookmark.objects.filter(
-                    user=user,
-                    group__in=item_list,
-                ).values_list('group_id', flat=True)
-            )
-            seen_groups = dict(
-                GroupSeen.objects.filter(
-                    user=user,
-                    group__in=item_list,
-                ).values_list('group_id', 'last_seen')
-            )
-            subscriptions = self._get_subscriptions(item_list, user)
-        else:
-            bookmarks = set()
-            seen_groups = {}
-            subscriptions = defaultdict(lambda: (False, None))
-
-        assignees = dict(
-            (a.group_id, a.user)
-            for a in GroupAssignee.objects.filter(
-                group__in=item_list,
-            ).select_related('user')
-        )
-
-        user_counts = tagstore.get_group_values_seen(
-            [g.id for g in item_list], environment_id=None, key='sentry:user')
-
-        ignore_items = {g.group_id: g for g in GroupSnooze.objects.filter(
-            group__in=item_list,
-        )}
-
-        resolutions = {
-            i[0]: i[1:]
-            for i in GroupResolution.objects.filter(
-                group__in=item_list,
-            ).values_list(
-                'group',
-                'type',
-                'release__version',
-                'actor_id',
-            )
-        }
+        loaded = self.load_attrs(self.get_attr_loaders(item_list, user))
+        return self.build_attrs(item_list, user, loaded)
+
+    def build_attrs(self, item_list, user, loaded):
+        from sentry.plugins import plugins
+
+        assignees = loaded['assignees']
+        user_counts = loaded['user_counts']
+        ignore_items = loaded['ignore_items']
+        resolutions = loaded['resolutions']
+        share_ids = loaded['share_ids']
+        bookmarks = loaded.get('bookmarks', set())
+        seen_groups = loaded.get('seen_groups', {})
+        subscriptions = loaded.get('subscriptions', defaultdict(lambda: (False, None)))
+
         actor_ids = set(r[-1] for r in six.itervalues(resolutions))
         actor_ids.update(r.actor_id for r in six.itervalues(ignore_items))
         if actor_ids:
@@ -170,10 +193,6 @@ class GroupSerializer(Serializer):
         else:
             actors = {}
 
-        share_ids = dict(GroupShare.objects.filter(
-            group__in=item_list,
-        ).values_list('group_id', 'uuid'))
-
         result = {}
         for item in item_list:
             active_date = item.active_at or item.first_seen
@@ -335,8 +354,8 @@ class StreamGroupSerializer(GroupSerializer):
         self.stats_period = stats_period
         self.matching_event_id = matching_event_id
 
-    def get_attrs(self, item_list, user):
-        attrs = super(StreamGroupSerializer, self).get_attrs(item_list, user)
+    def get_attr_loaders(self, item_list, user):
+        loaders = super(StreamGroupSerializer, self).get_attr_loaders(item_list, user)
 
         if self.stats_period:
             # we need to compute stats at 1d (1h resolution), and 14d
@@ -344,7 +363,7 @@ class StreamGroupSerializer(GroupSerializer):
 
             segments, interval = self.STATS_PERIOD_CHOICES[self.stats_period]
             now = timezone.now()
-            stats = tsdb.get_range(
+            loaders['stats'] = lambda: tsdb.get_range(
                 model=tsdb.models.group,
                 keys=group_ids,
                 end=now,
@@ -352,6 +371,13 @@ class StreamGroupSerializer(GroupSerializer):
                 rollup=int(interval.total_seconds()),
             )
 
+        return loaders
+
+    def build_attrs(self, item_list, user, loaded):
+        attrs = super(StreamGroupSerializer, self).build_attrs(item_list, user, loaded)
+
+        if self.stats_period:
+            stats = loaded['stats']
             for item in item_list:
                 attrs[item].update({
                     'stats': stats[item.id],
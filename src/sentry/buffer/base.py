@@ -38,7 +38,7 @@ class Buffer(Service):
     This is useful in situations where a single event might be happening so fast that the queue cant
     keep up with the updates.
     """
-    __all__ = ('incr', 'process', 'process_pending', 'validate')
+    __all__ = ('incr', 'incr_multi', 'process', 'process_pending', 'validate')
 
     def incr(self, model, columns, filters, extra=None):
         """
@@ -53,6 +53,20 @@ class Buffer(Service):
             }
         )
 
+    def incr_multi(self, items):
+        """
+        Increment several counters at once. ``items`` is a sequence of
+        ``(model, columns, filters, extra)`` tuples, each of which is handled
+        exactly like a call to ``incr``.
+
+        >>> incr_multi([
+        >>>     (Group, {'times_seen': 1}, {'pk': group.pk}, None),
+        >>>     (Project, {'times_seen': 1}, {'pk': project.pk}, None),
+        >>> ])
+        """
+        for model, columns, filters, extra in items:
+            self.incr(model, columns, filters, extra)
+
     def process_pending(self):
         return []
 
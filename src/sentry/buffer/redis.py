@@ -85,6 +85,18 @@ class RedisBuffer(Buffer):
     def _make_lock_key(self, key):
         return 'l:%s' % (key, )
 
+    def _add_incr_to_pipeline(self, pipe, key, model, columns, filters, extra=None):
+        pipe.hsetnx(key, 'm', '%s.%s' % (model.__module__, model.__name__))
+        pipe.hsetnx(key, 'f', pickle.dumps(filters))
+        for column, amount in six.iteritems(columns):
+            pipe.hincrby(key, 'i+' + column, amount)
+
+        if extra:
+            for column, value in six.iteritems(extra):
+                pipe.hset(key, 'e+' + column, pickle.dumps(value))
+        pipe.expire(key, self.key_expire)
+        pipe.zadd(self.pending_key, time(), key)
+
     def incr(self, model, columns, filters, extra=None):
         """
         Increment the key by doing the following:
@@ -102,18 +114,31 @@ class RedisBuffer(Buffer):
         conn = self.cluster.get_local_client_for_key(key)
 
         pipe = conn.pipeline()
-        pipe.hsetnx(key, 'm', '%s.%s' % (model.__module__, model.__name__))
-        pipe.hsetnx(key, 'f', pickle.dumps(filters))
-        for column, amount in six.iteritems(columns):
-            pipe.hincrby(key, 'i+' + column, amount)
-
-        if extra:
-            for column, value in six.iteritems(extra):
-                pipe.hset(key, 'e+' + column, pickle.dumps(value))
-        pipe.expire(key, self.key_expire)
-        pipe.zadd(self.pending_key, time(), key)
+        self._add_incr_to_pipeline(pipe, key, model, columns, filters, extra)
         pipe.execute()
 
+    def incr_multi(self, items):
+        """
+        Increment several keys, issuing a single pipeline per Redis shard
+        instead of one per key. Each shard keeps its own pending key, exactly
+        as with ``incr``.
+        """
+        router = self.cluster.get_router()
+        items_by_host = {}
+        for model, columns, filters, extra in items:
+            key = self._make_key(model, filters)
+            items_by_host.setdefault(router.get_host_for_key(key), []).append(
+                (key, model, columns, filters, extra)
+            )
+
+        for host_id, host_items in six.iteritems(items_by_host):
+            pipe = self.cluster.get_local_client(host_id).pipeline()
+            for key, model, columns, filters, extra in host_items:
+                self._add_incr_to_pipeline(pipe, key, model, columns, filters, extra)
+            pipe.execute()
+
+        metrics.timing('buffer.incr-multi.size', len(items))
+
     def process_pending(self):
         client = self.cluster.get_routing_client()
         lock_key = self._make_lock_key(self.pending_key)
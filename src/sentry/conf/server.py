@@ -432,8 +432,8 @@ CELERY_IMPORTS = (
     'sentry.tasks.digests', 'sentry.tasks.email', 'sentry.tasks.merge',
     'sentry.tasks.options', 'sentry.tasks.ping', 'sentry.tasks.post_process',
     'sentry.tasks.process_buffer', 'sentry.tasks.reports', 'sentry.tasks.reprocessing',
-    'sentry.tasks.scheduler', 'sentry.tasks.store', 'sentry.tasks.unmerge',
-    'sentry.tasks.symcache_update',
+    'sentry.tasks.scheduler', 'sentry.tasks.similarity', 'sentry.tasks.store',
+    'sentry.tasks.tagindex', 'sentry.tasks.unmerge', 'sentry.tasks.symcache_update',
 )
 CELERY_QUEUES = [
     Queue('alerts', routing_key='alerts'),
@@ -457,7 +457,9 @@ CELERY_QUEUES = [
     Queue('reports.deliver', routing_key='reports.deliver'),
     Queue('reports.prepare', routing_key='reports.prepare'),
     Queue('search', routing_key='search'),
+    Queue('similarity', routing_key='similarity'),
     Queue('stats', routing_key='stats'),
+    Queue('symcache', routing_key='symcache'),
     Queue('unmerge', routing_key='unmerge'),
     Queue('update', routing_key='update'),
 ]
@@ -529,6 +531,14 @@ CELERYBEAT_SCHEDULE = {
             'queue': 'options',
         }
     },
+    'flush-similarity-buffer': {
+        'task': 'sentry.tasks.similarity.flush_buffered_features',
+        'schedule': timedelta(seconds=10),
+        'options': {
+            'expires': 10,
+            'queue': 'similarity',
+        }
+    },
     'schedule-digests': {
         'task': 'sentry.tasks.digests.schedule_digests',
         'schedule': timedelta(seconds=30),
@@ -881,6 +891,17 @@ SENTRY_BUFFER_OPTIONS = {}
 SENTRY_CACHE = None
 SENTRY_CACHE_OPTIONS = {}
 
+# A process-local cache of models in front of the cache above (for lookups
+# through ``get_from_cache``.) Entries are evicted in every process through
+# Redis pub/sub when a model is changed, and expire after ``ttl`` seconds.
+SENTRY_MODEL_LOCAL_CACHE = {
+    'enabled': False,
+    'cluster': 'default',
+    'channel': 'sentry.modelcache',
+    'ttl': 10,
+    'max_entries': 10000,
+}
+
 # The internal Django cache is still used in many places
 # TODO(dcramer): convert uses over to Sentry's backend
 CACHES = {
@@ -917,6 +938,10 @@ SENTRY_NODESTORE_OPTIONS = {}
 SENTRY_TAGSTORE = 'sentry.tagstore.legacy.LegacyTagStorage'
 SENTRY_TAGSTORE_OPTIONS = {}
 
+# Tag search index backend
+SENTRY_TAGINDEX = 'sentry.tagindex.base.TagIndex'
+SENTRY_TAGINDEX_OPTIONS = {}
+
 # Search backend
 SENTRY_SEARCH = 'sentry.search.django.DjangoSearchBackend'
 SENTRY_SEARCH_OPTIONS = {}
@@ -925,6 +950,10 @@ SENTRY_SEARCH_OPTIONS = {}
 #     'timeout': 5,
 # }
 
+# Write the store endpoint's received/rejected/blacklisted TSDB counters from
+# a background thread instead of during the request
+SENTRY_STORE_ASYNC_OUTCOMES = False
+
 # Time-series storage backend
 SENTRY_TSDB = 'sentry.tsdb.dummy.DummyTSDB'
 SENTRY_TSDB_OPTIONS = {}
@@ -940,6 +969,11 @@ SENTRY_TSDB_ROLLUPS = (
     (3600 * 24, 90),  # 90 days at 1 day
 )
 
+# The number of threads shared by API serializers to load independent
+# attributes concurrently. Attributes are loaded sequentially in the request
+# thread if this is 0. Each thread keeps its own database connection open.
+SENTRY_API_SERIALIZER_WORKERS = 0
+
 # Internal metrics
 SENTRY_METRICS_BACKEND = 'sentry.metrics.dummy.DummyMetricsBackend'
 SENTRY_METRICS_OPTIONS = {}
@@ -962,6 +996,9 @@ SENTRY_MAX_EXTRA_VARIABLE_SIZE = 4096 * 4  # 16kb
 # For changing the amount of data seen in Http Response Body part.
 SENTRY_MAX_HTTP_BODY_SIZE = 4096 * 4  # 16kb
 
+# Events whose (decompressed) payload is larger than this are rejected
+SENTRY_MAX_EVENT_PAYLOAD_SIZE = 20 * 1024 * 1024  # 20MB
+
 # For various attributes we don't limit the entire attribute on size, but the
 # individual item. In those cases we also want to limit the maximum number of
 # keys
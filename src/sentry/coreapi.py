@@ -17,10 +17,9 @@ import zlib
 import re
 
 from collections import MutableMapping
+from django.conf import settings
 from django.core.exceptions import SuspiciousOperation
 from django.utils.crypto import constant_time_compare
-from gzip import GzipFile
-from six import BytesIO
 from time import time
 
 from sentry import filters
@@ -37,7 +36,6 @@ from sentry.utils.csp import is_valid_csp_report
 from sentry.utils.http import origin_from_request
 from sentry.utils.data_filters import is_valid_ip, \
     is_valid_release, is_valid_error_message, FilterStatKeys
-from sentry.utils.strings import decompress
 
 try:
     # Attempt to load ujson if it's installed.
@@ -46,11 +44,18 @@ try:
     # simple win. ujson differs from simplejson a bunch
     # so it's not worth utilizing it anywhere else.
     import ujson as json  # noqa
+    # ujson parses UTF-8 encoded payloads without decoding them first.
+    _json_loads_bytes = True
 except ImportError:
     from sentry.utils import json
+    _json_loads_bytes = False
 
 _dist_re = re.compile(r'^[a-zA-Z0-9_.-]+$')
 
+# Compressed payloads are inflated in chunks of this size, so that a payload
+# is rejected as soon as it exceeds SENTRY_MAX_EVENT_PAYLOAD_SIZE.
+DECOMPRESS_CHUNK_SIZE = 64 * 1024
+
 
 class APIError(Exception):
     http_status = 400
@@ -76,6 +81,11 @@ class APIForbidden(APIError):
     http_status = 403
 
 
+class APIPayloadTooLarge(APIError):
+    http_status = 413
+    msg = 'Event payload is too large'
+
+
 class APIRateLimited(APIError):
     http_status = 429
     msg = 'Creation of this event was denied due to rate limiting'
@@ -244,9 +254,36 @@ class ClientApiHelper(object):
             raise APIError('Bad data decoding request (%s, %s)' %
                            (type(e).__name__, e))
 
+    def check_payload_size(self, data):
+        if len(data) > settings.SENTRY_MAX_EVENT_PAYLOAD_SIZE:
+            raise APIPayloadTooLarge()
+        return data
+
+    def inflate(self, data, wbits=zlib.MAX_WBITS):
+        """
+        Decompresses ``data`` in chunks, and gives up as soon as the result
+        grows larger than the maximum event payload size.
+        """
+        max_size = settings.SENTRY_MAX_EVENT_PAYLOAD_SIZE
+        decompressor = zlib.decompressobj(wbits)
+        chunks = []
+        size = 0
+        while data:
+            chunk = decompressor.decompress(data, DECOMPRESS_CHUNK_SIZE)
+            size += len(chunk)
+            if size > max_size:
+                raise APIPayloadTooLarge()
+            chunks.append(chunk)
+            data = decompressor.unconsumed_tail
+        chunks.append(decompressor.flush())
+        return self.check_payload_size(b''.join(chunks))
+
     def decompress_deflate(self, encoded_data):
+        """Returns the UTF-8 encoded payload of a deflate request body."""
         try:
-            return zlib.decompress(encoded_data).decode('utf-8')
+            return self.inflate(encoded_data)
+        except APIError:
+            raise
         except Exception as e:
             # This error should be caught as it suggests that there's a
             # bug somewhere in the client's code.
@@ -255,13 +292,11 @@ class ClientApiHelper(object):
                            (type(e).__name__, e))
 
     def decompress_gzip(self, encoded_data):
+        """Returns the UTF-8 encoded payload of a gzip request body."""
         try:
-            fp = BytesIO(encoded_data)
-            try:
-                f = GzipFile(fileobj=fp)
-                return f.read().decode('utf-8')
-            finally:
-                f.close()
+            return self.inflate(encoded_data, 16 + zlib.MAX_WBITS)
+        except APIError:
+            raise
         except Exception as e:
             # This error should be caught as it suggests that there's a
             # bug somewhere in the client's code.
@@ -270,11 +305,17 @@ class ClientApiHelper(object):
                            (type(e).__name__, e))
 
     def decode_and_decompress_data(self, encoded_data):
+        """Returns the UTF-8 encoded payload of a base64 encoded (and
+        optionally compressed) request body.
+        """
         try:
+            data = base64.b64decode(encoded_data)
             try:
-                return decompress(encoded_data).decode('utf-8')
+                return self.inflate(data)
             except zlib.error:
-                return base64.b64decode(encoded_data).decode('utf-8')
+                return self.check_payload_size(data)
+        except APIError:
+            raise
         except Exception as e:
             # This error should be caught as it suggests that there's a
             # bug somewhere in the client's code.
@@ -284,7 +325,7 @@ class ClientApiHelper(object):
 
     def safely_load_json_string(self, json_string):
         try:
-            if isinstance(json_string, six.binary_type):
+            if isinstance(json_string, six.binary_type) and not _json_loads_bytes:
                 json_string = json_string.decode('utf-8')
             obj = json.loads(json_string)
             assert isinstance(obj, dict)
@@ -532,8 +573,11 @@ class LazyData(MutableMapping):
             elif data[0] != b'{':
                 data = helper.decode_and_decompress_data(data)
             else:
+                data = helper.check_payload_size(data)
+            if not _json_loads_bytes:
                 data = helper.decode_data(data)
-        if isinstance(data, six.text_type):
+            data = helper.safely_load_json_string(data)
+        elif isinstance(data, six.text_type):
             data = helper.safely_load_json_string(data)
 
         # We need data validation/etc to apply as part of LazyData so that
@@ -16,7 +16,10 @@ class BulkDeleteQuery(object):
         self.order_by = order_by
         self.using = router.db_for_write(model)
 
-    def execute_postgres(self, chunk_size=10000):
+    def _get_returning_fields(self, returning):
+        return [self.model._meta.get_field(name) for name in returning or ()]
+
+    def execute_postgres(self, chunk_size=10000, returning=None, callback=None):
         quote_name = connections[self.using].ops.quote_name
 
         where = []
@@ -50,6 +53,13 @@ class BulkDeleteQuery(object):
         else:
             order_clause = ''
 
+        if returning:
+            returning_clause = ' returning {}'.format(', '.join(
+                quote_name(field.column) for field in self._get_returning_fields(returning)
+            ))
+        else:
+            returning_clause = ''
+
         query = """
             delete from {table}
             where id = any(array(
@@ -58,24 +68,27 @@ class BulkDeleteQuery(object):
                 {where}
                 {order}
                 limit {chunk_size}
-            ));
+            )){returning};
         """.format(
             table=self.model._meta.db_table,
             chunk_size=chunk_size,
             where=where_clause,
             order=order_clause,
+            returning=returning_clause,
         )
 
-        return self._continuous_query(query)
+        return self._continuous_query(query, callback if returning else None)
 
-    def _continuous_query(self, query):
+    def _continuous_query(self, query, callback=None):
         results = True
         cursor = connections[self.using].cursor()
         while results:
             cursor.execute(query)
             results = cursor.rowcount > 0
+            if results and callback is not None:
+                callback(cursor.fetchall())
 
-    def execute_generic(self, chunk_size=100):
+    def execute_generic(self, chunk_size=100, returning=None, callback=None):
         qs = self.model.objects.all()
 
         if self.days:
@@ -87,7 +100,7 @@ class BulkDeleteQuery(object):
             else:
                 qs = qs.filter(project_id=self.project_id)
 
-        return self._continuous_generic_query(qs, chunk_size)
+        return self._continuous_generic_query(qs, chunk_size, returning, callback)
 
     def execute_sharded(self, total_shards, shard_id, chunk_size=100):
         assert total_shards > 1
@@ -112,18 +125,30 @@ class BulkDeleteQuery(object):
 
         return self._continuous_generic_query(qs, chunk_size)
 
-    def _continuous_generic_query(self, query, chunk_size):
+    def _continuous_generic_query(self, query, chunk_size, returning=None, callback=None):
+        fields = self._get_returning_fields(returning)
+
         # XXX: we step through because the deletion collector will pull all
         # relations into memory
         exists = True
         while exists:
             exists = False
+            rows = []
             for item in query[:chunk_size].iterator():
+                if fields:
+                    rows.append(tuple(getattr(item, field.attname) for field in fields))
                 item.delete()
                 exists = True
-
-    def execute(self, chunk_size=10000):
+            if rows and callback is not None:
+                callback(rows)
+
+    def execute(self, chunk_size=10000, returning=None, callback=None):
+        """
+        Deletes the matching rows in chunks. If ``returning`` is a sequence of
+        field names, ``callback`` is called with the values of those fields
+        for every chunk of rows that was deleted.
+        """
         if db.is_postgres():
-            self.execute_postgres(chunk_size)
+            self.execute_postgres(chunk_size, returning, callback)
         else:
-            self.execute_generic(chunk_size)
+            self.execute_generic(chunk_size, returning, callback)
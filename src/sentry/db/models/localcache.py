@@ -0,0 +1,180 @@
+"""
+sentry.db.models.localcache
+~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+:copyright: (c) 2010-2017 by the Sentry Team, see AUTHORS for more details.
+:license: BSD, see LICENSE for more details.
+"""
+
+from __future__ import absolute_import
+
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+
+from sentry.utils import json, metrics
+from sentry.utils.compat import pickle
+from sentry.utils.datastructures import LRUCache
+
+__all__ = ('LocalModelCache', 'get_local_cache')
+
+logger = logging.getLogger('sentry')
+
+
+class LocalModelCache(object):
+    """
+    A process-local cache in front of the shared cache used by
+    ``BaseManager.get_from_cache``.
+
+    Every process subscribes to ``channel`` on a background thread. When a
+    cached model is saved or deleted, its cache keys are published on the
+    channel and evicted from the local cache of every subscribed process.
+    Entries also expire after ``ttl`` seconds, which bounds how stale they
+    can be if a message is lost, and nothing is read from or written to the
+    local cache while the subscription is down.
+    """
+
+    def __init__(self, client, channel, ttl=10, max_entries=10000, retry_interval=1.0):
+        self.client = client
+        self.channel = channel
+        self.ttl = ttl
+        self.retry_interval = retry_interval
+        # Incremented by every eviction, so that a value read from the shared
+        # cache before an eviction is not stored locally after it.
+        self.generation = 0
+        self.__entries = LRUCache(max_entries)
+        self.__lock = threading.Lock()
+        self.__subscribed = threading.Event()
+        self.__pid = None
+
+    def __start(self):
+        # The listener thread does not survive forking, so every process
+        # needs to start (and fill) its own.
+        pid = os.getpid()
+        if self.__pid == pid:
+            return
+
+        with self.__lock:
+            if self.__pid == pid:
+                return
+
+            self.__subscribed.clear()
+            self.__entries.clear()
+            thread = threading.Thread(target=self.__listen, name='sentry.modelcache')
+            thread.daemon = True
+            thread.start()
+            self.__pid = pid
+
+    def __listen(self):
+        while True:
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                self.__subscribed.set()
+                for message in pubsub.listen():
+                    if message['type'] == 'message':
+                        self.__evict(json.loads(message['data']))
+            except Exception as error:
+                logger.warning(
+                    'Lost local model cache subscription due to error: %r',
+                    error,
+                    exc_info=True,
+                )
+            finally:
+                # Any messages sent while we're not subscribed are lost.
+                self.__subscribed.clear()
+                self.__evict(None)
+            time.sleep(self.retry_interval)
+
+    def __evict(self, keys):
+        with self.__lock:
+            self.generation += 1
+            if keys is None:
+                self.__entries.clear()
+            else:
+                for key in keys:
+                    self.__entries.delete(key)
+
+    def get(self, key):
+        self.__start()
+        if not self.__subscribed.is_set():
+            return None
+
+        entry = self.__entries.get(key)
+        if entry is not None and entry[0] < time.time():
+            self.__entries.delete(key)
+            entry = None
+
+        metrics.incr(
+            'modelcache.local',
+            tags={'result': 'miss' if entry is None else 'hit'},
+            skip_internal=True,
+        )
+
+        if entry is None:
+            return None
+
+        # Values are stored pickled so that every caller gets its own copy.
+        return pickle.loads(entry[1])
+
+    def set(self, key, value, generation):
+        """
+        Stores a value that was read from the shared cache. ``generation``
+        must be the value of ``self.generation`` from before the read.
+        """
+        if not self.__subscribed.is_set():
+            return
+
+        entry = (time.time() + self.ttl, pickle.dumps(value, protocol=2))
+        with self.__lock:
+            if generation == self.generation:
+                self.__entries.set(key, entry)
+
+    def invalidate(self, keys):
+        """
+        Evicts keys from the local cache of this and every other process.
+        """
+        self.__evict(keys)
+        try:
+            self.client.publish(self.channel, json.dumps(keys))
+        except Exception as error:
+            logger.warning(
+                'Could not publish local model cache invalidation due to error: %r',
+                error,
+                exc_info=True,
+            )
+
+
+_local_cache = []
+_local_cache_lock = threading.Lock()
+
+
+def get_local_cache():
+    """
+    Returns the configured ``LocalModelCache``, or ``None`` if it is disabled.
+    """
+    if _local_cache:
+        return _local_cache[0]
+
+    with _local_cache_lock:
+        if not _local_cache:
+            _local_cache.append(_make_local_cache(settings.SENTRY_MODEL_LOCAL_CACHE))
+    return _local_cache[0]
+
+
+def _make_local_cache(options):
+    if not options.get('enabled'):
+        return None
+
+    from sentry.utils import redis
+
+    channel = options.get('channel', 'sentry.modelcache')
+    return LocalModelCache(
+        redis.clusters.get(options.get('cluster', 'default')).get_local_client_for_key(channel),
+        channel,
+        ttl=options.get('ttl', 10),
+        max_entries=options.get('max_entries', 10000),
+    )
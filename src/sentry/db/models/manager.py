@@ -23,6 +23,7 @@ from sentry import nodestore
 from sentry.utils.cache import cache
 from sentry.utils.hashlib import md5_text
 
+from .localcache import get_local_cache
 from .query import create_or_update
 
 __all__ = ('BaseManager', )
@@ -130,6 +131,17 @@ class BaseManager(Manager):
         Pushes changes to an instance into the cache, and removes invalid (changed)
         lookup values.
         """
+        # The eviction is published once the shared cache has been updated,
+        # otherwise another process could read the old value from the shared
+        # cache after the eviction and keep it locally.
+        local_cache = get_local_cache()
+        if local_cache is not None:
+            invalidation_keys = self.__get_invalidation_keys(instance)
+        self.__push_to_cache(instance)
+        if local_cache is not None:
+            local_cache.invalidate(invalidation_keys)
+
+    def __push_to_cache(self, instance):
         pk_name = instance._meta.pk.name
         pk_names = ('pk', pk_name)
         pk_val = instance.pk
@@ -195,9 +207,60 @@ class BaseManager(Manager):
             version=self.cache_version,
         )
 
+        # As in ``__post_save``, evict only once the shared cache is updated.
+        local_cache = get_local_cache()
+        if local_cache is not None:
+            local_cache.invalidate(self.__get_invalidation_keys(instance))
+
     def __get_lookup_cache_key(self, **kwargs):
         return make_key(self.model, 'modelcache', kwargs)
 
+    def __get_invalidation_keys(self, instance):
+        """
+        Returns the lookup cache keys for both the current and the previously
+        tracked state of an instance.
+        """
+        pk_name = instance._meta.pk.name
+        keys = set([self.__get_lookup_cache_key(**{pk_name: instance.pk})])
+        states = [{key: self.__value_for_field(instance, key) for key in self.cache_fields}]
+        if instance in self.__cache:
+            states.append(self.__cache[instance])
+        for state in states:
+            for key, value in six.iteritems(state):
+                if key not in ('pk', pk_name):
+                    keys.add(self.__get_lookup_cache_key(**{key: value}))
+        return sorted(keys)
+
+    def __get_cached(self, cache_keys):
+        """
+        Reads lookup cache keys from the local cache (if it's enabled) and then
+        the shared cache, returning a mapping of the keys that were found.
+        """
+        results = {}
+        local_cache = get_local_cache()
+        if local_cache is not None:
+            generation = local_cache.generation
+            for cache_key in cache_keys:
+                value = local_cache.get(cache_key)
+                if value is not None:
+                    results[cache_key] = value
+
+        missing = [cache_key for cache_key in cache_keys if cache_key not in results]
+        if missing:
+            if len(missing) == 1:
+                values = {missing[0]: cache.get(missing[0], version=self.cache_version)}
+            else:
+                values = cache.get_many(missing, version=self.cache_version)
+
+            for cache_key, value in six.iteritems(values):
+                if value is None:
+                    continue
+                results[cache_key] = value
+                if local_cache is not None:
+                    local_cache.set(cache_key, value, generation)
+
+        return results
+
     def __value_for_field(self, instance, key):
         """
         Return the cacheable value for a field.
@@ -240,11 +303,11 @@ class BaseManager(Manager):
         if key in self.cache_fields or key == pk_name:
             cache_key = self.__get_lookup_cache_key(**{key: value})
 
-            retval = cache.get(cache_key, version=self.cache_version)
+            retval = self.__get_cached([cache_key]).get(cache_key)
             if retval is None:
                 result = self.get(**kwargs)
                 # Ensure we're pushing it into the cache
-                self.__post_save(instance=result)
+                self.__push_to_cache(result)
                 return result
 
             # If we didn't look up by pk we need to hit the reffed
@@ -270,6 +333,66 @@ class BaseManager(Manager):
         else:
             return self.get(**kwargs)
 
+    def get_many_from_cache(self, values, key='pk'):
+        """
+        Bulk version of ``get_from_cache``, which looks up instances by the
+        primary key or one of the ``cache_fields`` and returns the instances
+        that were found in the order of ``values``.
+
+        Cached values are fetched with a single multi-get, and all of the
+        instances missing from the cache with a single query.
+        """
+        pk_name = self.model._meta.pk.name
+        if key == 'pk':
+            key = pk_name
+
+        if key.endswith('__exact'):
+            key = key.split('__exact', 1)[0]
+
+        if not self.cache_fields or (key not in self.cache_fields and key != pk_name):
+            return list(self.filter(**{'%s__in' % key: values}))
+
+        field = self.model._meta.get_field(key)
+        values = [
+            field.to_python(value.pk if isinstance(value, Model) else value) for value in values
+        ]
+
+        cache_keys = {self.__get_lookup_cache_key(**{key: value}): value for value in values}
+        found = {}
+        for cache_key, retval in six.iteritems(self.__get_cached(list(cache_keys))):
+            found[cache_keys[cache_key]] = retval
+
+        if key != pk_name:
+            # We store pointers to the primary key for other fields
+            instances = {
+                instance.pk: instance
+                for instance in self.get_many_from_cache(set(found.values()))
+            }
+            found = {
+                value: instances[pk] for value, pk in six.iteritems(found) if pk in instances
+            }
+        else:
+            for value, retval in list(found.items()):
+                if type(retval) != self.model or retval.pk != value:
+                    logger.error('Cache response returned invalid value %r', retval)
+                    del found[value]
+
+        missing = set(values) - set(found)
+        if missing:
+            for instance in self.filter(**{'%s__in' % key: missing}):
+                # Ensure we're pushing it into the cache
+                self.__push_to_cache(instance)
+                found[self.__value_for_field(instance, key)] = instance
+
+        db = router.db_for_read(self.model)
+        results = []
+        for value in values:
+            if value in found:
+                instance = found[value]
+                instance._state.db = db
+                results.append(instance)
+        return results
+
     def create_or_update(self, **kwargs):
         return create_or_update(self.model, **kwargs)
 
@@ -295,6 +418,10 @@ class BaseManager(Manager):
         cache_key = self.__get_lookup_cache_key(**{pk_name: instance_id})
         cache.delete(cache_key, version=self.cache_version)
 
+        local_cache = get_local_cache()
+        if local_cache is not None:
+            local_cache.invalidate([cache_key])
+
     def post_save(self, instance, **kwargs):
         """
         Triggered when a model bound to this manager is saved.
@@ -37,11 +37,14 @@ class GroupDeletionTask(ModelDeletionTask):
         return relations
 
     def delete_instance(self, instance):
+        from sentry import tagindex
         from sentry.similarity import features
 
         if not self.skip_models or features not in self.skip_models:
             features.delete(instance)
 
+        tagindex.delete_groups(instance.project_id, [instance.id])
+
         return super(GroupDeletionTask, self).delete_instance(instance)
 
     def mark_deletion_in_progress(self, instance_list):
@@ -49,3 +49,10 @@ class ProjectDeletionTask(ModelDeletionTask):
         )
 
         return relations
+
+    def delete_instance(self, instance):
+        from sentry import tagindex
+
+        tagindex.delete_project(instance.id)
+
+        return super(ProjectDeletionTask, self).delete_instance(instance)
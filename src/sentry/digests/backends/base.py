@@ -13,7 +13,7 @@ def load(options):
 
 
 DEFAULT_CODEC = {
-    'path': 'sentry.digests.codecs.CompressedPickleCodec',
+    'path': 'sentry.digests.codecs.CompactNotificationCodec',
 }
 
 
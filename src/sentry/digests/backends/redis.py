@@ -2,16 +2,20 @@ from __future__ import absolute_import
 
 import logging
 import six
+import sys
 import time
 
 from contextlib import contextmanager
 from redis.client import ResponseError
+from six.moves.queue import Empty, Queue
 
 from sentry.digests import Record, ScheduleEntry
 from sentry.digests.backends.base import Backend, InvalidState
+from sentry.utils import metrics
 from sentry.utils.locking.backends.redis import RedisLockBackend
 from sentry.utils.locking.manager import LockManager
 from sentry.utils.redis import (check_cluster_versions, get_cluster_from_options, load_script)
+from sentry.utils.threadpool import BoundedThreadPool
 from sentry.utils.versioning import Version
 
 logger = logging.getLogger('sentry.digests')
@@ -84,6 +88,16 @@ class RedisBackend(Backend):
         # too early.
         self.ttl = options.pop('ttl', 60 * 60)
 
+        # Scheduling and maintenance run against all partitions concurrently.
+        # This sets the time (in seconds) to wait for the partitions to respond
+        # before giving up on the ones that haven't. Anything those partitions
+        # moved to the ready state is recovered by a later maintenance pass.
+        self.partition_timeout = options.pop('partition_timeout', 30)
+        self.pool = BoundedThreadPool(
+            workers=options.pop('partition_workers', None) or max(len(self.cluster.hosts), 1),
+            name='digests',
+        )
+
         super(RedisBackend, self).__init__(**options)
 
     def validate(self):
@@ -153,21 +167,79 @@ class RedisBackend(Backend):
             ],
         )
 
-    def schedule(self, deadline, timestamp=None):
-        if timestamp is None:
-            timestamp = time.time()
+    def __run_partitions(self, operation, func, deadline, timestamp):
+        """
+        Runs ``func`` against every partition concurrently, yielding ``(host,
+        result)`` pairs in the order that the partitions respond. Partitions
+        that fail, or don't respond within the partition timeout, are logged
+        and skipped.
+        """
+        results = Queue()
+
+        def run(host):
+            start = time.time()
+            try:
+                result = (host, func(host, deadline, timestamp), None)
+            except Exception:
+                result = (host, None, sys.exc_info())
+            metrics.timing(
+                'digests.{}.partition_duration'.format(operation),
+                time.time() - start,
+                tags={'partition': host},
+            )
+            results.put(result)
+
+        pending = set(self.cluster.hosts)
+        for host in pending:
+            self.pool.submit(run, host)
 
-        for host in self.cluster.hosts:
+        expires = time.time() + self.partition_timeout
+        while pending:
             try:
-                for key, timestamp in self.__schedule_partition(host, deadline, timestamp):
-                    yield ScheduleEntry(key, float(timestamp))
-            except Exception as error:
+                host, result, exc_info = results.get(timeout=max(expires - time.time(), 0))
+            except Empty:
+                break
+
+            pending.discard(host)
+            if exc_info is not None:
                 logger.error(
-                    'Failed to perform scheduling for partition %r due to error: %r',
+                    'Failed to perform %s for partition %r due to error: %r',
+                    operation,
                     host,
-                    error,
-                    exc_info=True
+                    exc_info[1],
+                    exc_info=exc_info
                 )
+                continue
+
+            yield host, result
+
+        for host in pending:
+            metrics.incr(
+                'digests.{}.partition_timeout'.format(operation),
+                tags={'partition': host},
+            )
+            logger.error(
+                'Timed out performing %s for partition %r after %s seconds',
+                operation,
+                host,
+                self.partition_timeout,
+            )
+
+    def schedule(self, deadline, timestamp=None):
+        if timestamp is None:
+            timestamp = time.time()
+
+        partitions = self.__run_partitions(
+            'schedule', self.__schedule_partition, deadline, timestamp)
+        for host, entries in partitions:
+            lag = 0.0
+            for key, scheduled in entries:
+                scheduled = float(scheduled)
+                lag = max(lag, timestamp - scheduled)
+                yield ScheduleEntry(key, scheduled)
+
+            # How far behind the oldest entry this partition released was.
+            metrics.timing('digests.schedule.partition_lag', lag, tags={'partition': host})
 
     def __maintenance_partition(self, host, deadline, timestamp):
         return script(
@@ -186,16 +258,9 @@ class RedisBackend(Backend):
         if timestamp is None:
             timestamp = time.time()
 
-        for host in self.cluster.hosts:
-            try:
-                self.__maintenance_partition(host, deadline, timestamp)
-            except Exception as error:
-                logger.error(
-                    'Failed to perform maintenance on digest partition %r due to error: %r',
-                    host,
-                    error,
-                    exc_info=True
-                )
+        for _ in self.__run_partitions(
+                'maintenance', self.__maintenance_partition, deadline, timestamp):
+            pass
 
     @contextmanager
     def digest(self, key, minimum_delay=None, timestamp=None):
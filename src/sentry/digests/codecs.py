@@ -1,5 +1,6 @@
 from __future__ import absolute_import
 
+import struct
 import zlib
 
 from sentry.utils.compat import pickle
@@ -19,3 +20,74 @@ class CompressedPickleCodec(Codec):
 
     def decode(self, value):
         return pickle.loads(zlib.decompress(value))
+
+
+class CompactNotificationCodec(Codec):
+    """
+    Encodes notifications as a fixed binary structure that only contains
+    references to the event and rules:
+
+    .. code::
+
+        magic (1) | version (1) | group id (8) | timestamp (8) | rule count (2)
+        | rule ids (8 * rule count) | event id (remainder)
+
+    Decoded notifications contain an ``EventReference`` in place of the event,
+    which is resolved in bulk when the digest is built (see
+    ``sentry.digests.notifications.build_digest``.)
+
+    Values that aren't notifications are encoded with the
+    ``CompressedPickleCodec``, which is also used to decode any values that
+    were written before this codec was enabled.
+    """
+    magic = b'\x00'
+    version = 1
+
+    header = struct.Struct('>cBQdH')
+    rule = struct.Struct('>Q')
+
+    def __init__(self):
+        self.fallback = CompressedPickleCodec()
+
+    def encode(self, value):
+        from sentry.digests.notifications import Notification, to_event_reference
+
+        if not isinstance(value, Notification):
+            return self.fallback.encode(value)
+
+        reference = to_event_reference(value.event)
+        return b''.join(
+            [
+                self.header.pack(
+                    self.magic,
+                    self.version,
+                    reference.group_id,
+                    reference.timestamp,
+                    len(value.rules),
+                ),
+            ] + [self.rule.pack(rule) for rule in value.rules] +
+            [reference.event_id.encode('utf-8')]
+        )
+
+    def decode(self, value):
+        from sentry.digests.notifications import EventReference, Notification
+
+        # zlib streams never start with a null byte, so anything else must
+        # have been written by the fallback codec.
+        if value[:1] != self.magic:
+            return self.fallback.decode(value)
+
+        _, version, group_id, timestamp, count = self.header.unpack_from(value)
+        if version != self.version:
+            raise ValueError('Unsupported notification version: %r' % (version, ))
+
+        offset = self.header.size
+        rules = []
+        for _ in range(count):
+            rules.append(self.rule.unpack_from(value, offset)[0])
+            offset += self.rule.size
+
+        return Notification(
+            EventReference(value[offset:].decode('utf-8'), group_id, timestamp),
+            rules,
+        )
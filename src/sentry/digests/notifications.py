@@ -15,6 +15,7 @@ from six.moves import reduce
 from sentry.app import tsdb
 from sentry.digests import Record
 from sentry.models import (
+    Event,
     Project,
     Group,
     GroupStatus,
@@ -26,6 +27,10 @@ logger = logging.getLogger('sentry.digests')
 
 Notification = namedtuple('Notification', 'event rules')
 
+# A reference to an event that has not been loaded yet, used by compact
+# record codecs in place of the event itself.
+EventReference = namedtuple('EventReference', 'event_id group_id timestamp')
+
 
 def split_key(key):
     from sentry.plugins import plugins  # XXX
@@ -53,6 +58,48 @@ def event_to_record(event, rules):
     )
 
 
+def to_event_reference(event):
+    if isinstance(event, EventReference):
+        return event
+    return EventReference(event.event_id, event.group_id, to_timestamp(event.datetime))
+
+
+def fetch_events(project, records):
+    """
+    Replaces any event references in the records with the events themselves,
+    loading them (and their data from nodestore) in bulk. Records for events
+    that no longer exist are dropped.
+    """
+    event_ids = set(
+        record.value.event.event_id for record in records
+        if isinstance(record.value.event, EventReference)
+    )
+    if not event_ids:
+        return records
+
+    events = {
+        event.event_id: event
+        for event in Event.objects.filter(project_id=project.id, event_id__in=event_ids)
+    }
+    Event.objects.bind_nodes(events.values(), 'data')
+
+    results = []
+    for record in records:
+        event = record.value.event
+        if isinstance(event, EventReference):
+            event = events.get(event.event_id)
+            if event is None:
+                logger.debug('%r could not be associated with an event.', record)
+                continue
+            record = Record(
+                record.key,
+                Notification(event, record.value.rules),
+                record.timestamp,
+            )
+        results.append(record)
+    return results
+
+
 def fetch_state(project, records):
     # This reads a little strange, but remember that records are returned in
     # reverse chronological order, and we query the database in chronological
@@ -203,7 +250,7 @@ def sort_rule_groups(rules):
 
 
 def build_digest(project, records, state=None):
-    records = list(records)
+    records = fetch_events(project, list(records))
     if not records:
         return
 
@@ -87,8 +87,9 @@ def get_hashes_for_event(event):
 
 
 def get_hashes_for_event_with_reason(event):
-    interfaces = event.get_interfaces()
-    for interface in six.itervalues(interfaces):
+    # Reuse the event's memoized interfaces (and their compact stacktraces)
+    # rather than building them from the data again.
+    for interface in six.itervalues(event.interfaces):
         result = interface.compute_hashes(event.platform)
         if not result:
             continue
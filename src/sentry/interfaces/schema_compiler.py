@@ -0,0 +1,404 @@
+"""
+sentry.interfaces.schema_compiler
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+:copyright: (c) 2010-2017 by the Sentry Team, see AUTHORS for more details.
+:license: BSD, see LICENSE for more details.
+"""
+
+from __future__ import absolute_import
+
+import numbers
+import re
+import six
+
+from itertools import islice
+
+from jsonschema import Draft4Validator, ValidationError
+
+__all__ = ('CompiledValidator', )
+
+DEFAULT_TYPES = {
+    'array': list,
+    'boolean': bool,
+    'integer': six.integer_types,
+    'null': type(None),
+    'number': numbers.Number,
+    'object': dict,
+    'string': six.string_types,
+}
+
+
+def _flatten(pytypes):
+    if isinstance(pytypes, tuple):
+        result = ()
+        for pytype in pytypes:
+            result += _flatten(pytype)
+        return result
+    return (pytypes, )
+
+
+def _ensure_list(thing):
+    if isinstance(thing, six.string_types):
+        return [thing]
+    return thing
+
+
+def _noop(instance, errors):
+    pass
+
+
+def _error(message, keyword, value, instance, schema, context=()):
+    return ValidationError(
+        message,
+        validator=keyword,
+        validator_value=value,
+        instance=instance,
+        schema=schema,
+        schema_path=(keyword, ),
+        context=context,
+    )
+
+
+def _descend(errors, start, path, schema_path):
+    for error in islice(errors, start, None):
+        if path is not None:
+            error.path.appendleft(path)
+        for item in schema_path:
+            error.schema_path.appendleft(item)
+
+
+def _types_msg(instance, types):
+    reprs = []
+    for type in types:
+        try:
+            reprs.append(repr(type['name']))
+        except Exception:
+            reprs.append(repr(type))
+    return '%r is not of type %s' % (instance, ', '.join(reprs))
+
+
+def _additional_properties_msg(extras, schema):
+    if 'patternProperties' in schema:
+        return '%s %s not match any of the regexes: %s' % (
+            ', '.join(map(repr, sorted(extras))),
+            'does' if len(extras) == 1 else 'do',
+            ', '.join(map(repr, sorted(schema['patternProperties']))),
+        )
+    return 'Additional properties are not allowed (%s %s unexpected)' % (
+        ', '.join(repr(extra) for extra in extras),
+        'was' if len(extras) == 1 else 'were',
+    )
+
+
+class CompiledValidator(object):
+    """
+    A drop-in replacement for ``jsonschema.Draft4Validator`` that generates
+    and compiles a specialized Python function for every node of the schema
+    once, instead of interpreting the schema on every call.
+
+    Errors are reported in the same order and with the same ``path``,
+    ``schema_path``, ``validator``, ``validator_value``, ``instance``,
+    ``schema``, ``context`` and ``message`` as ``Draft4Validator`` (without a
+    format checker). Schemas using keywords that are not supported here
+    (``$ref``, ``oneOf``, ...) raise ``NotImplementedError`` at construction
+    time so callers can fall back to the interpreting validator.
+    """
+
+    def __init__(self, schema, types=()):
+        self.schema = schema
+        self.source = []
+        self._types = dict(DEFAULT_TYPES)
+        self._types.update(types)
+        self._compiled = {}
+        self._constants = {}
+        self._globals = {
+            'error': _error,
+            'descend': _descend,
+            'types_msg': _types_msg,
+            'additional_properties_msg': _additional_properties_msg,
+        }
+        self._check = self._compile(schema)
+
+    def iter_errors(self, instance):
+        errors = []
+        self._check(instance, errors)
+        return iter(errors)
+
+    def is_valid(self, instance):
+        errors = []
+        self._check(instance, errors)
+        return not errors
+
+    def validate(self, instance):
+        for error in self.iter_errors(instance):
+            raise error
+
+    def _const(self, value):
+        # Constants are bound by identity, so generated code sees exactly the
+        # objects from the schema (which are also what errors report).
+        name = self._constants.get(id(value))
+        if name is None:
+            name = 'c%d' % len(self._constants)
+            self._constants[id(value)] = name
+            self._globals[name] = value
+        return name
+
+    def _is_type(self, var, type):
+        if type not in self._types:
+            raise NotImplementedError('Unknown type %r' % (type, ))
+        pytypes = self._types[type]
+        # bool inherits from int, so ensure bools aren't reported as ints
+        flat = _flatten(pytypes)
+        if bool not in flat and any(issubclass(t, numbers.Number) for t in flat):
+            return '(isinstance(%s, %s) and not isinstance(%s, bool))' % (
+                var, self._const(pytypes), var)
+        return 'isinstance(%s, %s)' % (var, self._const(pytypes))
+
+    def _is_schema_object(self, value):
+        pytypes = self._types['object']
+        return isinstance(value, pytypes) and not isinstance(value, bool)
+
+    def _compile(self, schema):
+        if id(schema) in self._compiled:
+            return self._compiled[id(schema)]
+
+        if '$ref' in schema or 'id' in schema:
+            raise NotImplementedError('References are not supported')
+
+        schema_name = self._const(schema)
+        lines = []
+        for keyword, value in six.iteritems(schema):
+            if keyword not in Draft4Validator.VALIDATORS:
+                continue
+            emit = getattr(self, '_emit_%s' % keyword, None)
+            if emit is None:
+                raise NotImplementedError('Unsupported keyword %r' % (keyword, ))
+            emit(lines, keyword, value, schema, schema_name)
+
+        if not lines:
+            func = _noop
+        else:
+            name = 'validate_%d' % len(self.source)
+            source = 'def %s(instance, errors):\n    %s\n' % (name, '\n    '.join(lines))
+            six.exec_(compile(source, '<schema %s>' % name, 'exec'), self._globals)
+            self.source.append(source)
+            func = self._globals[name]
+
+        self._compiled[id(schema)] = func
+        self._const(func)
+        return func
+
+    def _emit_call(self, func, var, path, schema_path):
+        if func is _noop:
+            return []
+        return [
+            'n = len(errors)',
+            '%s(%s, errors)' % (self._const(func), var),
+            'if len(errors) > n:',
+            '    descend(errors, n, %s, %s)' % (path, self._const(schema_path)),
+        ]
+
+    def _emit_error(self, message, keyword, value, schema_name, context=''):
+        return 'errors.append(error(%s, %s, %s, instance, %s%s))' % (
+            message, self._const(keyword), value, schema_name, context)
+
+    def _indent(self, lines, depth=1):
+        return [('    ' * depth) + line for line in lines]
+
+    def _emit_type(self, lines, keyword, value, schema, schema_name):
+        types = _ensure_list(value)
+        lines.append('if not (%s):' % ' or '.join(self._is_type('instance', t) for t in types))
+        lines.append('    ' + self._emit_error(
+            'types_msg(instance, %s)' % self._const(types), keyword, self._const(value), schema_name))
+
+    def _emit_properties(self, lines, keyword, value, schema, schema_name):
+        body = []
+        for prop, subschema in six.iteritems(value):
+            call = self._emit_call(
+                self._compile(subschema), 'instance[%s]' % self._const(prop),
+                self._const(prop), (prop, keyword))
+            if call:
+                body.append('if %s in instance:' % self._const(prop))
+                body.extend(self._indent(call))
+
+        if body:
+            lines.append('if %s:' % self._is_type('instance', 'object'))
+            lines.extend(self._indent(body))
+
+    def _emit_required(self, lines, keyword, value, schema, schema_name):
+        lines.extend([
+            'if %s:' % self._is_type('instance', 'object'),
+            '    for prop in %s:' % self._const(value),
+            '        if prop not in instance:',
+            '            ' + self._emit_error(
+                "'%r is a required property' % prop", keyword, self._const(value), schema_name),
+        ])
+
+    def _emit_additionalProperties(self, lines, keyword, value, schema, schema_name):
+        if self._is_schema_object(value):
+            func = self._compile(value)
+            if func is _noop:
+                return
+        elif value:
+            return
+
+        properties = schema.get('properties', {})
+        patterns = '|'.join(schema.get('patternProperties', {}))
+        lines.append('if %s:' % self._is_type('instance', 'object'))
+        if patterns:
+            lines.append('    extras = set([p for p in instance if p not in %s and not %s(p)])' % (
+                self._const(properties), self._const(re.compile(patterns).search)))
+        else:
+            lines.append('    extras = set([p for p in instance if p not in %s])' % (
+                self._const(properties), ))
+
+        if self._is_schema_object(value):
+            lines.append('    for extra in extras:')
+            lines.extend(self._indent(self._emit_call(
+                func, 'instance[extra]', 'extra', (keyword, )), 2))
+        else:
+            lines.append('    if extras:')
+            lines.append('        ' + self._emit_error(
+                'additional_properties_msg(extras, %s)' % schema_name,
+                keyword, self._const(value), schema_name))
+
+    def _emit_patternProperties(self, lines, keyword, value, schema, schema_name):
+        body = []
+        for pattern, subschema in six.iteritems(value):
+            call = self._emit_call(self._compile(subschema), 'v', 'k', (pattern, keyword))
+            if not call:
+                continue
+            body.append('for k, v in iteritems(instance):')
+            body.append('    if %s(k):' % self._const(re.compile(pattern).search))
+            body.extend(self._indent(call, 2))
+
+        if body:
+            self._globals['iteritems'] = six.iteritems
+            lines.append('if %s:' % self._is_type('instance', 'object'))
+            lines.extend(self._indent(body))
+
+    def _emit_items(self, lines, keyword, value, schema, schema_name):
+        if self._is_schema_object(value):
+            call = self._emit_call(self._compile(value), 'item', 'index', (keyword, ))
+            if call:
+                lines.append('if %s:' % self._is_type('instance', 'array'))
+                lines.append('    for index, item in enumerate(instance):')
+                lines.extend(self._indent(call, 2))
+            return
+
+        body = []
+        for index, subschema in enumerate(value):
+            call = self._emit_call(
+                self._compile(subschema), 'instance[%d]' % index, str(index), (index, keyword))
+            if call:
+                body.append('if len(instance) > %d:' % index)
+                body.extend(self._indent(call))
+
+        if body:
+            lines.append('if %s:' % self._is_type('instance', 'array'))
+            lines.extend(self._indent(body))
+
+    def _emit_length(self, lines, keyword, value, schema_name, type, op, message):
+        lines.extend([
+            'if %s and len(instance) %s %s:' % (self._is_type('instance', type), op, self._const(value)),
+            '    ' + self._emit_error(
+                "'%%r is too %s' %% (instance, )" % message, keyword, self._const(value), schema_name),
+        ])
+
+    def _emit_minItems(self, lines, keyword, value, schema, schema_name):
+        self._emit_length(lines, keyword, value, schema_name, 'array', '<', 'short')
+
+    def _emit_maxItems(self, lines, keyword, value, schema, schema_name):
+        self._emit_length(lines, keyword, value, schema_name, 'array', '>', 'long')
+
+    def _emit_minLength(self, lines, keyword, value, schema, schema_name):
+        self._emit_length(lines, keyword, value, schema_name, 'string', '<', 'short')
+
+    def _emit_maxLength(self, lines, keyword, value, schema, schema_name):
+        self._emit_length(lines, keyword, value, schema_name, 'string', '>', 'long')
+
+    def _emit_pattern(self, lines, keyword, value, schema, schema_name):
+        lines.extend([
+            'if %s and not %s(instance):' % (
+                self._is_type('instance', 'string'), self._const(re.compile(value).search)),
+            '    ' + self._emit_error(
+                "'%%r does not match %%r' %% (instance, %s)" % self._const(value),
+                keyword, self._const(value), schema_name),
+        ])
+
+    def _emit_format(self, lines, keyword, value, schema, schema_name):
+        # Like ``Draft4Validator`` without a ``format_checker``, formats are
+        # not enforced.
+        pass
+
+    def _emit_enum(self, lines, keyword, value, schema, schema_name):
+        lines.extend([
+            'if instance not in %s:' % self._const(value),
+            '    ' + self._emit_error(
+                "'%%r is not one of %%r' %% (instance, %s)" % self._const(value),
+                keyword, self._const(value), schema_name),
+        ])
+
+    def _emit_minimum(self, lines, keyword, value, schema, schema_name):
+        if schema.get('exclusiveMinimum', False):
+            op, cmp = '<=', 'less than or equal to'
+        else:
+            op, cmp = '<', 'less than'
+        lines.extend([
+            'if %s and instance %s %s:' % (self._is_type('instance', 'number'), op, self._const(value)),
+            '    ' + self._emit_error(
+                "'%%r is %s the minimum of %%r' %% (instance, %s)" % (cmp, self._const(value)),
+                keyword, self._const(value), schema_name),
+        ])
+
+    def _emit_maximum(self, lines, keyword, value, schema, schema_name):
+        if schema.get('exclusiveMaximum', False):
+            op, cmp = '>=', 'greater than or equal to'
+        else:
+            op, cmp = '>', 'greater than'
+        lines.extend([
+            'if %s and instance %s %s:' % (self._is_type('instance', 'number'), op, self._const(value)),
+            '    ' + self._emit_error(
+                "'%%r is %s the maximum of %%r' %% (instance, %s)" % (cmp, self._const(value)),
+                keyword, self._const(value), schema_name),
+        ])
+
+    def _emit_allOf(self, lines, keyword, value, schema, schema_name):
+        for index, subschema in enumerate(value):
+            lines.extend(self._emit_call(
+                self._compile(subschema), 'instance', 'None', (index, keyword)))
+
+    def _emit_anyOf(self, lines, keyword, value, schema, schema_name):
+        funcs = [self._compile(subschema) for subschema in value]
+        if any(func is _noop for func in funcs[:1]):
+            return
+
+        lines.append('all_errors = []')
+        lines.append('for index, func in enumerate(%s):' % self._const(funcs))
+        lines.extend([
+            '    errs = []',
+            '    func(instance, errs)',
+            '    if not errs:',
+            '        break',
+            '    descend(errs, 0, None, (index, ))',
+            '    all_errors.extend(errs)',
+            'else:',
+            '    ' + self._emit_error(
+                "'%r is not valid under any of the given schemas' % (instance, )",
+                keyword, self._const(value), schema_name, ', all_errors'),
+        ])
+
+    def _emit_not(self, lines, keyword, value, schema, schema_name):
+        message = "'%%r is not allowed for %%r' %% (%s, instance)" % self._const(value)
+        func = self._compile(value)
+        if func is _noop:
+            lines.append(self._emit_error(message, keyword, self._const(value), schema_name))
+            return
+
+        lines.extend([
+            'errs = []',
+            '%s(instance, errs)' % self._const(func),
+            'if not errs:',
+            '    ' + self._emit_error(message, keyword, self._const(value), schema_name),
+        ])
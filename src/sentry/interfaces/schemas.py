@@ -23,6 +23,7 @@ from sentry.constants import (
     VERSION_LENGTH,
 )
 from sentry.interfaces.base import InterfaceValidationError
+from sentry.interfaces.schema_compiler import CompiledValidator
 from sentry.models import EventError
 from sentry.tagstore.base import INTERNAL_TAG_KEYS
 
@@ -429,11 +430,37 @@ INTERFACE_SCHEMAS = {
 }
 
 
+SCHEMA_TYPES = {'array': (list, tuple)}
+
+
 @lru_cache(maxsize=100)
 def validator_for_interface(name):
     if name not in INTERFACE_SCHEMAS:
         return None
-    return jsonschema.Draft4Validator(INTERFACE_SCHEMAS[name], types={'array': (list, tuple)})
+    schema = INTERFACE_SCHEMAS[name]
+    try:
+        return CompiledValidator(schema, types=SCHEMA_TYPES)
+    except NotImplementedError:
+        return jsonschema.Draft4Validator(schema, types=SCHEMA_TYPES)
+
+
+@lru_cache(maxsize=100)
+def defaults_for_interface(name):
+    """
+    Returns a list of ``(property, has_default, default)`` for each property
+    required by the named interface's schema, in the order they are required.
+    """
+    schema = INTERFACE_SCHEMAS.get(name)
+    if not schema or 'properties' not in schema or 'required' not in schema:
+        return []
+
+    result = []
+    for p in schema['required']:
+        if p in schema['properties'] and 'default' in schema['properties'][p]:
+            result.append((p, True, schema['properties'][p]['default']))
+        else:
+            result.append((p, False, None))
+    return result
 
 
 def validate_and_default_interface(data, interface, name=None,
@@ -456,7 +483,6 @@ def validate_and_default_interface(data, interface, name=None,
     validator = validator_for_interface(interface)
     if validator is None:
         return (True, [])
-    schema = validator.schema
 
     # Strip Nones so we don't have to take null into account for all schemas.
     if strip_nones and isinstance(data, dict):
@@ -465,11 +491,10 @@ def validate_and_default_interface(data, interface, name=None,
                 del data[k]
 
     # Values that are missing entirely, but are required and should be defaulted
-    if 'properties' in schema and 'required' in schema and isinstance(data, dict):
-        for p in schema['required']:
+    if isinstance(data, dict):
+        for p, has_default, default in defaults_for_interface(interface):
             if p not in data:
-                if p in schema['properties'] and 'default' in schema['properties'][p]:
-                    default = schema['properties'][p]['default']
+                if has_default:
                     data[p] = default() if callable(default) else default
                 else:
                     # TODO raise as shortcut?
@@ -252,119 +252,19 @@ def handle_nan(value):
     return value
 
 
-class Frame(Interface):
-
-    path = 'frame'
-
-    @classmethod
-    def to_python(cls, data, raw=False):
-        is_valid, errors = validate_and_default_interface(data, cls.path)
-        if not is_valid:
-            raise InterfaceValidationError("Invalid stack frame data.")
-
-        abs_path = data.get('abs_path')
-        filename = data.get('filename')
-        symbol = data.get('symbol')
-        function = data.get('function')
-        module = data.get('module')
-        package = data.get('package')
-
-        # For legacy reasons
-        if function == '?':
-            function = None
-
-        # For consistency reasons
-        if symbol == '?':
-            symbol = None
-
-        # Some of this processing should only be done for non raw frames
-        if not raw:
-            # absolute path takes priority over filename
-            # (in the end both will get set)
-            if not abs_path:
-                abs_path = filename
-                filename = None
-
-            if not filename and abs_path:
-                if is_url(abs_path):
-                    urlparts = urlparse(abs_path)
-                    if urlparts.path:
-                        filename = urlparts.path
-                    else:
-                        filename = abs_path
-                else:
-                    filename = abs_path
-
-        if not (filename or function or module or package):
-            raise InterfaceValidationError(
-                "No 'filename' or 'function' or 'module' or 'package'"
-            )
-
-        platform = data.get('platform')
-
-        context_locals = data.get('vars') or {}
-        if isinstance(context_locals, (list, tuple)):
-            context_locals = dict(enumerate(context_locals))
-        elif not isinstance(context_locals, dict):
-            context_locals = {}
-        context_locals = trim_dict(context_locals, object_hook=handle_nan)
-
-        # extra data is used purely by internal systems,
-        # so we dont trim it
-        extra_data = data.get('data') or {}
-        if isinstance(extra_data, (list, tuple)):
-            extra_data = dict(enumerate(extra_data))
-
-        # XXX: handle lines which were sent as 'null'
-        context_line = trim(data.get('context_line'), 256)
-        if context_line is not None:
-            pre_context = data.get('pre_context', None)
-            if pre_context:
-                pre_context = [c or '' for c in pre_context]
-
-            post_context = data.get('post_context', None)
-            if post_context:
-                post_context = [c or '' for c in post_context]
-        else:
-            pre_context, post_context = None, None
-
-        in_app = validate_bool(data.get('in_app'), False)
-
-        kwargs = {
-            'abs_path': trim(abs_path, 2048),
-            'filename': trim(filename, 256),
-            'platform': platform,
-            'module': trim(module, 256),
-            'function': trim(function, 256),
-            'package': package,
-            'image_addr': to_hex_addr(data.get('image_addr')),
-            'symbol': trim(symbol, 256),
-            'symbol_addr': to_hex_addr(data.get('symbol_addr')),
-            'instruction_addr': to_hex_addr(data.get('instruction_addr')),
-            'in_app': in_app,
-            'context_line': context_line,
-            # TODO(dcramer): trim pre/post_context
-            'pre_context': pre_context,
-            'post_context': post_context,
-            'vars': context_locals,
-            'data': extra_data,
-            'errors': data.get('errors'),
-        }
-
-        if data.get('lineno') is not None:
-            lineno = int(data['lineno'])
-            if lineno < 0:
-                lineno = None
-            kwargs['lineno'] = lineno
-        else:
-            kwargs['lineno'] = None
+FRAME_ATTRIBUTES = (
+    'abs_path', 'filename', 'platform', 'module', 'function', 'package', 'image_addr',
+    'symbol', 'symbol_addr', 'instruction_addr', 'in_app', 'context_line', 'pre_context',
+    'post_context', 'vars', 'data', 'errors', 'lineno', 'colno',
+)
 
-        if data.get('colno') is not None:
-            kwargs['colno'] = int(data['colno'])
-        else:
-            kwargs['colno'] = None
 
-        return cls(**kwargs)
+class FrameMixin(object):
+    """
+    Behavior shared by ``Frame`` and ``CompactFrame``, which only differ in
+    how the frame attributes are stored.
+    """
+    __slots__ = ()
 
     def get_hash(self, platform=None):
         """
@@ -544,139 +444,142 @@ class Frame(Interface):
         return '%s in %s' % (fileloc, self.function or '?', )
 
 
-class Stacktrace(Interface):
-    """
-    A stacktrace contains a list of frames, each with various bits (most optional)
-    describing the context of that frame. Frames should be sorted from oldest
-    to newest.
-
-    The stacktrace contains an element, ``frames``, which is a list of hashes. Each
-    hash must contain **at least** the ``filename`` attribute. The rest of the values
-    are optional, but recommended.
-
-    Additionally, if the list of frames is large, you can explicitly tell the
-    system that you've omitted a range of frames. The ``frames_omitted`` must
-    be a single tuple two values: start and end. For example, if you only
-    removed the 8th frame, the value would be (8, 9), meaning it started at the
-    8th frame, and went until the 9th (the number of frames omitted is
-    end-start). The values should be based on a one-index.
+class Frame(FrameMixin, Interface):
 
-    The list of frames should be ordered by the oldest call first.
+    path = 'frame'
 
-    Each frame must contain the following attributes:
+    @classmethod
+    def to_python(cls, data, raw=False):
+        is_valid, errors = validate_and_default_interface(data, cls.path)
+        if not is_valid:
+            raise InterfaceValidationError("Invalid stack frame data.")
 
-    ``filename``
-      The relative filepath to the call
+        abs_path = data.get('abs_path')
+        filename = data.get('filename')
+        symbol = data.get('symbol')
+        function = data.get('function')
+        module = data.get('module')
+        package = data.get('package')
 
-    OR
+        # For legacy reasons
+        if function == '?':
+            function = None
 
-    ``function``
-      The name of the function being called
+        # For consistency reasons
+        if symbol == '?':
+            symbol = None
 
-    OR
+        # Some of this processing should only be done for non raw frames
+        if not raw:
+            # absolute path takes priority over filename
+            # (in the end both will get set)
+            if not abs_path:
+                abs_path = filename
+                filename = None
 
-    ``module``
-      Platform-specific module path (e.g. sentry.interfaces.Stacktrace)
+            if not filename and abs_path:
+                if is_url(abs_path):
+                    urlparts = urlparse(abs_path)
+                    if urlparts.path:
+                        filename = urlparts.path
+                    else:
+                        filename = abs_path
+                else:
+                    filename = abs_path
 
-    The following additional attributes are supported:
+        if not (filename or function or module or package):
+            raise InterfaceValidationError(
+                "No 'filename' or 'function' or 'module' or 'package'"
+            )
 
-    ``lineno``
-      The line number of the call
-    ``colno``
-      The column number of the call
-    ``abs_path``
-      The absolute path to filename
-    ``context_line``
-      Source code in filename at lineno
-    ``pre_context``
-      A list of source code lines before context_line (in order) -- usually [lineno - 5:lineno]
-    ``post_context``
-      A list of source code lines after context_line (in order) -- usually [lineno + 1:lineno + 5]
-    ``in_app``
-      Signifies whether this frame is related to the execution of the relevant
-      code in this stacktrace. For example, the frames that might power the
-      framework's webserver of your app are probably not relevant, however calls
-      to the framework's library once you start handling code likely are. See
-      notes below on implicity ``in_app`` behavior.
-    ``vars``
-      A mapping of variables which were available within this frame (usually context-locals).
-    ``package``
-      Name of the package or object file that the frame is contained in.  This
-      for instance can be the name of a DLL, .NET Assembly, jar file, object
-      file etc.
+        platform = data.get('platform')
 
-    >>> {
-    >>>     "frames": [{
-    >>>         "abs_path": "/real/file/name.py"
-    >>>         "filename": "file/name.py",
-    >>>         "function": "myfunction",
-    >>>         "vars": {
-    >>>             "key": "value"
-    >>>         },
-    >>>         "pre_context": [
-    >>>             "line1",
-    >>>             "line2"
-    >>>         ],
-    >>>         "context_line": "line3",
-    >>>         "lineno": 3,
-    >>>         "in_app": true,
-    >>>         "post_context": [
-    >>>             "line4",
-    >>>             "line5"
-    >>>         ],
-    >>>     }],
-    >>>     "frames_omitted": [13, 56]
-    >>> }
+        context_locals = data.get('vars') or {}
+        if isinstance(context_locals, (list, tuple)):
+            context_locals = dict(enumerate(context_locals))
+        elif not isinstance(context_locals, dict):
+            context_locals = {}
+        context_locals = trim_dict(context_locals, object_hook=handle_nan)
 
-    Implicity ``in_app`` behavior exists when the value is not specified on all
-    frames within a stacktrace (or collectively within an exception if this is
-    part of a chain).
+        # extra data is used purely by internal systems,
+        # so we dont trim it
+        extra_data = data.get('data') or {}
+        if isinstance(extra_data, (list, tuple)):
+            extra_data = dict(enumerate(extra_data))
 
-    If **any frame** is marked with ``in_app=True`` or ``in_app=False``:
+        # XXX: handle lines which were sent as 'null'
+        context_line = trim(data.get('context_line'), 256)
+        if context_line is not None:
+            pre_context = data.get('pre_context', None)
+            if pre_context:
+                pre_context = [c or '' for c in pre_context]
 
-    - Set ``in_app=False`` where ``in_app is None``
+            post_context = data.get('post_context', None)
+            if post_context:
+                post_context = [c or '' for c in post_context]
+        else:
+            pre_context, post_context = None, None
 
-    If **all frames** are marked identical values for ``in_app``:
+        in_app = validate_bool(data.get('in_app'), False)
 
-    - Set ``in_app=False`` on all frames
+        kwargs = {
+            'abs_path': trim(abs_path, 2048),
+            'filename': trim(filename, 256),
+            'platform': platform,
+            'module': trim(module, 256),
+            'function': trim(function, 256),
+            'package': package,
+            'image_addr': to_hex_addr(data.get('image_addr')),
+            'symbol': trim(symbol, 256),
+            'symbol_addr': to_hex_addr(data.get('symbol_addr')),
+            'instruction_addr': to_hex_addr(data.get('instruction_addr')),
+            'in_app': in_app,
+            'context_line': context_line,
+            # TODO(dcramer): trim pre/post_context
+            'pre_context': pre_context,
+            'post_context': post_context,
+            'vars': context_locals,
+            'data': extra_data,
+            'errors': data.get('errors'),
+        }
 
-    .. note:: This interface can be passed as the 'stacktrace' key in addition
-              to the full interface path.
-    """
-    score = 2000
-    path = 'sentry.interfaces.Stacktrace'
+        if data.get('lineno') is not None:
+            lineno = int(data['lineno'])
+            if lineno < 0:
+                lineno = None
+            kwargs['lineno'] = lineno
+        else:
+            kwargs['lineno'] = None
 
-    def __iter__(self):
-        return iter(self.frames)
+        if data.get('colno') is not None:
+            kwargs['colno'] = int(data['colno'])
+        else:
+            kwargs['colno'] = None
 
-    @classmethod
-    def to_python(cls, data, slim_frames=True, raw=False):
-        is_valid, errors = validate_and_default_interface(data, cls.path)
-        if not is_valid:
-            raise InterfaceValidationError("Invalid stack frame data.")
+        return cls(**kwargs)
 
-        frame_list = [
-            # XXX(dcramer): handle PHP sending an empty array for a frame
-            Frame.to_python(f or {}, raw=raw) for f in data['frames']
-        ]
 
-        kwargs = {
-            'frames': frame_list,
-        }
+class CompactFrame(FrameMixin):
+    """
+    A read-only frame with slotted attributes instead of the dict-backed
+    attribute lookups of ``Frame``. Built from a normalized ``Frame``.
+    """
+    __slots__ = FRAME_ATTRIBUTES
 
-        kwargs['registers'] = None
-        if data.get('registers') and isinstance(data['registers'], dict):
-            kwargs['registers'] = data.get('registers')
+    @classmethod
+    def from_frame(cls, frame):
+        rv = cls.__new__(cls)
+        data = frame._data
+        for name in FRAME_ATTRIBUTES:
+            setattr(rv, name, data.get(name))
+        return rv
 
-        if data.get('frames_omitted'):
-            kwargs['frames_omitted'] = data['frames_omitted']
-        else:
-            kwargs['frames_omitted'] = None
 
-        instance = cls(**kwargs)
-        if slim_frames:
-            slim_frame_data(instance)
-        return instance
+class StacktraceMixin(object):
+    """
+    Behavior shared by ``Stacktrace`` and ``CompactStacktrace``.
+    """
+    __slots__ = ()
 
     def get_has_system_frames(self):
         # This is a simplified logic from how the normalizer works.
@@ -706,16 +609,6 @@ class Stacktrace(Interface):
             'hasSystemFrames': self.get_has_system_frames(),
         }
 
-    def to_json(self):
-        return {
-            'frames': [f.to_json() for f in self.frames],
-            'frames_omitted': self.frames_omitted,
-            'registers': self.registers,
-        }
-
-    def get_path(self):
-        return self.path
-
     def compute_hashes(self, platform):
         system_hash = self.get_hash(platform, system_frames=True)
         if not system_hash:
@@ -836,3 +729,200 @@ class Stacktrace(Interface):
             elif default is None:
                 default = frame.get_culprit_string(platform=platform)
         return default
+
+
+class CompactStacktrace(StacktraceMixin):
+    """
+    A read-only stacktrace of ``CompactFrame`` objects. Hashing, rendering
+    and similarity walk every frame, possibly several times per event, so
+    ``Stacktrace`` builds this once and delegates to it.
+    """
+    __slots__ = ('frames', 'frames_omitted', 'registers')
+
+    def __init__(self, frames, frames_omitted=None, registers=None):
+        self.frames = frames
+        self.frames_omitted = frames_omitted
+        self.registers = registers
+
+    def __iter__(self):
+        return iter(self.frames)
+
+    @classmethod
+    def from_stacktrace(cls, stacktrace):
+        data = stacktrace._data
+        return cls(
+            frames=[CompactFrame.from_frame(f) for f in data['frames']],
+            frames_omitted=data.get('frames_omitted'),
+            registers=data.get('registers'),
+        )
+
+
+class Stacktrace(StacktraceMixin, Interface):
+    """
+    A stacktrace contains a list of frames, each with various bits (most optional)
+    describing the context of that frame. Frames should be sorted from oldest
+    to newest.
+
+    The stacktrace contains an element, ``frames``, which is a list of hashes. Each
+    hash must contain **at least** the ``filename`` attribute. The rest of the values
+    are optional, but recommended.
+
+    Additionally, if the list of frames is large, you can explicitly tell the
+    system that you've omitted a range of frames. The ``frames_omitted`` must
+    be a single tuple two values: start and end. For example, if you only
+    removed the 8th frame, the value would be (8, 9), meaning it started at the
+    8th frame, and went until the 9th (the number of frames omitted is
+    end-start). The values should be based on a one-index.
+
+    The list of frames should be ordered by the oldest call first.
+
+    Each frame must contain the following attributes:
+
+    ``filename``
+      The relative filepath to the call
+
+    OR
+
+    ``function``
+      The name of the function being called
+
+    OR
+
+    ``module``
+      Platform-specific module path (e.g. sentry.interfaces.Stacktrace)
+
+    The following additional attributes are supported:
+
+    ``lineno``
+      The line number of the call
+    ``colno``
+      The column number of the call
+    ``abs_path``
+      The absolute path to filename
+    ``context_line``
+      Source code in filename at lineno
+    ``pre_context``
+      A list of source code lines before context_line (in order) -- usually [lineno - 5:lineno]
+    ``post_context``
+      A list of source code lines after context_line (in order) -- usually [lineno + 1:lineno + 5]
+    ``in_app``
+      Signifies whether this frame is related to the execution of the relevant
+      code in this stacktrace. For example, the frames that might power the
+      framework's webserver of your app are probably not relevant, however calls
+      to the framework's library once you start handling code likely are. See
+      notes below on implicity ``in_app`` behavior.
+    ``vars``
+      A mapping of variables which were available within this frame (usually context-locals).
+    ``package``
+      Name of the package or object file that the frame is contained in.  This
+      for instance can be the name of a DLL, .NET Assembly, jar file, object
+      file etc.
+
+    >>> {
+    >>>     "frames": [{
+    >>>         "abs_path": "/real/file/name.py"
+    >>>         "filename": "file/name.py",
+    >>>         "function": "myfunction",
+    >>>         "vars": {
+    >>>             "key": "value"
+    >>>         },
+    >>>         "pre_context": [
+    >>>             "line1",
+    >>>             "line2"
+    >>>         ],
+    >>>         "context_line": "line3",
+    >>>         "lineno": 3,
+    >>>         "in_app": true,
+    >>>         "post_context": [
+    >>>             "line4",
+    >>>             "line5"
+    >>>         ],
+    >>>     }],
+    >>>     "frames_omitted": [13, 56]
+    >>> }
+
+    Implicity ``in_app`` behavior exists when the value is not specified on all
+    frames within a stacktrace (or collectively within an exception if this is
+    part of a chain).
+
+    If **any frame** is marked with ``in_app=True`` or ``in_app=False``:
+
+    - Set ``in_app=False`` where ``in_app is None``
+
+    If **all frames** are marked identical values for ``in_app``:
+
+    - Set ``in_app=False`` on all frames
+
+    .. note:: This interface can be passed as the 'stacktrace' key in addition
+              to the full interface path.
+    """
+    score = 2000
+    path = 'sentry.interfaces.Stacktrace'
+
+    def __iter__(self):
+        return iter(self.frames)
+
+    @classmethod
+    def to_python(cls, data, slim_frames=True, raw=False):
+        is_valid, errors = validate_and_default_interface(data, cls.path)
+        if not is_valid:
+            raise InterfaceValidationError("Invalid stack frame data.")
+
+        frame_list = [
+            # XXX(dcramer): handle PHP sending an empty array for a frame
+            Frame.to_python(f or {}, raw=raw) for f in data['frames']
+        ]
+
+        kwargs = {
+            'frames': frame_list,
+        }
+
+        kwargs['registers'] = None
+        if data.get('registers') and isinstance(data['registers'], dict):
+            kwargs['registers'] = data.get('registers')
+
+        if data.get('frames_omitted'):
+            kwargs['frames_omitted'] = data['frames_omitted']
+        else:
+            kwargs['frames_omitted'] = None
+
+        instance = cls(**kwargs)
+        if slim_frames:
+            slim_frame_data(instance)
+        return instance
+
+    def to_json(self):
+        return {
+            'frames': [f.to_json() for f in self.frames],
+            'frames_omitted': self.frames_omitted,
+            'registers': self.registers,
+        }
+
+    def get_path(self):
+        return self.path
+
+    def get_compact(self):
+        """
+        Returns the ``CompactStacktrace`` for this stacktrace. It is built on
+        first use and cached on the instance, so it lives as long as the
+        interface (e.g. as long as ``Event.interfaces``).
+        """
+        compact = self.__dict__.get('_compact')
+        if compact is None:
+            compact = self.__dict__['_compact'] = CompactStacktrace.from_stacktrace(self)
+        return compact
+
+    def get_api_context(self, is_public=False):
+        return self.get_compact().get_api_context(is_public=is_public)
+
+    def compute_hashes(self, platform):
+        return self.get_compact().compute_hashes(platform)
+
+    def get_hash(self, platform=None, system_frames=True):
+        return self.get_compact().get_hash(platform=platform, system_frames=system_frames)
+
+    def get_stacktrace(self, *args, **kwargs):
+        return self.get_compact().get_stacktrace(*args, **kwargs)
+
+    def get_culprit_string(self, platform=None):
+        return self.get_compact().get_culprit_string(platform=platform)
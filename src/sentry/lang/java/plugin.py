@@ -3,7 +3,6 @@ from __future__ import absolute_import
 import six
 import uuid
 
-from symbolic import ProguardMappingView
 from sentry.plugins import Plugin2
 from sentry.stacktraces import StacktraceProcessor
 from sentry.models import ProjectDSymFile, EventError
@@ -42,21 +41,19 @@ class JavaStacktraceProcessor(StacktraceProcessor):
         if not self.available:
             return False
 
-        dsym_paths = ProjectDSymFile.dsymcache.fetch_dsyms(self.project, self.images)
+        views = ProjectDSymFile.dsymcache.get_proguard_mappings(self.project, self.images)
         self.mapping_views = []
 
         for image_uuid in self.images:
             error_type = None
 
-            dsym_path = dsym_paths.get(image_uuid)
-            if dsym_path is None:
+            view = views.get(image_uuid)
+            if view is None:
                 error_type = EventError.PROGUARD_MISSING_MAPPING
+            elif not view.has_line_info:
+                error_type = EventError.PROGUARD_MISSING_LINENO
             else:
-                view = ProguardMappingView.from_path(dsym_path)
-                if not view.has_line_info:
-                    error_type = EventError.PROGUARD_MISSING_LINENO
-                else:
-                    self.mapping_views.append(view)
+                self.mapping_views.append(view)
 
             if error_type is None:
                 continue
@@ -1,10 +1,17 @@
 from __future__ import absolute_import, print_function
 
+import re
+
 from six import text_type
+from six.moves import xrange
 from symbolic import SourceView
 from sentry.utils.strings import codec_lookup
 
-__all__ = ['SourceCache', 'SourceMapCache']
+__all__ = ['SourceCache', 'SourceIndex', 'SourceMapCache']
+
+# Lines are split the same way as by ``SourceView``.
+_line_end_re = re.compile(br'\r\n|\r|\n')
+_non_ascii_re = re.compile(br'[\x80-\xff]')
 
 
 def is_utf8(codec):
@@ -12,15 +19,82 @@ def is_utf8(codec):
     return name in ('utf-8', 'ascii')
 
 
+class SourceIndex(object):
+    """
+    The line offsets of a UTF-8 encoded source, so that (parts of) lines can
+    be read without decoding or copying the rest of the source.  Minified
+    sources often consist of a single line of several megabytes.
+
+    Lines are read like from a ``SourceView``, and columns are counted in
+    characters.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.starts = [0]
+        self.ends = []
+        for match in _line_end_re.finditer(source):
+            self.ends.append(match.start())
+            self.starts.append(match.end())
+        self.ends.append(len(source))
+        # Byte offsets are character offsets in ASCII sources.  Otherwise
+        # the last line that was needed is kept decoded.
+        self.is_ascii = _non_ascii_re.search(source) is None
+        self._decoded = (None, None)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in xrange(*idx.indices(len(self)))]
+        if not 0 <= idx < len(self):
+            raise IndexError('No such line')
+        if self.is_ascii:
+            return self._decode(self.starts[idx], self.ends[idx])
+        return self._get_decoded_line(idx)
+
+    def _decode(self, start, end):
+        return self.source[start:end].decode('utf-8', 'replace')
+
+    def _get_decoded_line(self, idx):
+        if self._decoded[0] != idx:
+            self._decoded = (idx, self._decode(self.starts[idx], self.ends[idx]))
+        return self._decoded[1]
+
+    def get_line_length(self, idx):
+        if not 0 <= idx < len(self):
+            raise IndexError('No such line')
+        if self.is_ascii:
+            return self.ends[idx] - self.starts[idx]
+        return len(self._get_decoded_line(idx))
+
+    def get_line_slice(self, idx, start, end):
+        """Returns the characters ``start`` to ``end`` of a line."""
+        if not 0 <= idx < len(self):
+            raise IndexError('No such line')
+        if self.is_ascii:
+            line_start = self.starts[idx]
+            return self._decode(
+                line_start + start,
+                min(line_start + end, self.ends[idx]),
+            )
+        return self._get_decoded_line(idx)[start:end]
+
+
 class SourceCache(object):
+    # Sources that were added as bytes are only kept as bytes, which their
+    # index shares, and their ``SourceView`` is built when it is needed.
     def __init__(self):
         self._cache = {}
+        self._sources = {}
+        self._indexes = {}
         self._errors = {}
         self._aliases = {}
 
     def __contains__(self, url):
         url = self._get_canonical_url(url)
-        return url in self._cache
+        return url in self._cache or url in self._sources
 
     def _get_canonical_url(self, url):
         if url in self._aliases:
@@ -28,7 +102,28 @@ class SourceCache(object):
         return url
 
     def get(self, url):
-        return self._cache.get(self._get_canonical_url(url))
+        url = self._get_canonical_url(url)
+        view = self._cache.get(url)
+        if view is None and url in self._sources:
+            view = self._cache[url] = SourceView.from_bytes(self._sources[url])
+        return view
+
+    def get_index(self, url):
+        """
+        Returns the ``SourceIndex`` of a source, which is built when it is
+        needed first.
+        """
+        url = self._get_canonical_url(url)
+        index = self._indexes.get(url)
+        if index is None:
+            source = self._sources.get(url)
+            if source is None:
+                view = self._cache.get(url)
+                if view is None:
+                    return None
+                source = view.get_source().encode('utf-8')
+            index = self._indexes[url] = SourceIndex(source)
+        return index
 
     def get_errors(self, url):
         url = self._get_canonical_url(url)
@@ -45,15 +140,19 @@ class SourceCache(object):
             if isinstance(source, text_type):
                 source = source.encode('utf-8')
             # If an encoding is provided and it's not utf-8 compatible
-            # we try to re-encoding the source and create a source view
-            # from it.
+            # we try to re-encode the source, since source views are
+            # created from utf-8.
             elif encoding is not None and not is_utf8(encoding):
                 try:
                     source = source.decode(encoding).encode('utf-8')
                 except UnicodeError:
                     pass
-            source = SourceView.from_bytes(source)
-        self._cache[url] = source
+            self._sources[url] = source
+            self._cache.pop(url, None)
+        else:
+            self._sources.pop(url, None)
+            self._cache[url] = source
+        self._indexes.pop(url, None)
 
     def add_error(self, url, error):
         url = self._get_canonical_url(url)
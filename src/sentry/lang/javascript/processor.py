@@ -25,7 +25,7 @@ except ImportError:
 
 from sentry import http
 from sentry.interfaces.stacktrace import Stacktrace
-from sentry.models import EventError, ReleaseFile
+from sentry.models import EventError, File, ReleaseFile
 from sentry.utils.cache import cache
 from sentry.utils.files import compress_file
 from sentry.utils.hashlib import md5_text
@@ -67,32 +67,56 @@ class UnparseableSourcemap(http.BadSource):
     error_type = EventError.JS_INVALID_SOURCEMAP
 
 
-def trim_line(line, column=0):
+def get_trim_bounds(length, column=0):
     """
-    Trims a line down to a goal of 140 characters, with a little
-    wiggle room to be sensible and tries to trim around the given
-    `column`. So it tries to extract 60 characters before and after
-    the provided `column` and yield a better context.
+    Returns the start and end of the part of a line of ``length`` that
+    `trim_line` keeps, given the `column` it trims around.
     """
-    line = line.strip(u'\n')
-    ll = len(line)
-    if ll <= 150:
-        return line
-    if column > ll:
-        column = ll
+    if length <= 150:
+        return 0, length
+    if column > length:
+        column = length
     start = max(column - 60, 0)
     # Round down if it brings us close to the edge
     if start < 5:
         start = 0
-    end = min(start + 140, ll)
+    end = min(start + 140, length)
     # Round up to the end if it's close
-    if end > ll - 5:
-        end = ll
+    if end > length - 5:
+        end = length
     # If we are bumped all the way to the end,
     # make sure we still get a full 140 characters in the line
-    if end == ll:
+    if end == length:
         start = max(end - 140, 0)
-    line = line[start:end]
+    return start, end
+
+
+def trim_line(line, column=0):
+    """
+    Trims a line down to a goal of 140 characters, with a little
+    wiggle room to be sensible and tries to trim around the given
+    `column`. So it tries to extract 60 characters before and after
+    the provided `column` and yield a better context.
+    """
+    line = line.strip(u'\n')
+    ll = len(line)
+    start, end = get_trim_bounds(ll, column)
+    if start == 0 and end == ll:
+        return line
+    return _snip(line[start:end], start, end, ll)
+
+
+def trim_source_line(source, lineno, column=0):
+    """
+    Like `trim_line` for a line of a `SourceIndex`, but only reads the part
+    of the line that is kept.
+    """
+    ll = source.get_line_length(lineno)
+    start, end = get_trim_bounds(ll, column)
+    return _snip(source.get_line_slice(lineno, start, end), start, end, ll)
+
+
+def _snip(line, start, end, ll):
     if end < ll:
         # we've snipped from the end
         line += u' {snip}'
@@ -103,6 +127,10 @@ def trim_line(line, column=0):
 
 
 def get_source_context(source, lineno, colno, context=LINES_OF_CONTEXT):
+    """
+    Returns the pre-context, context line and post-context of a line in a
+    `SourceIndex`, trimmed around `colno` in the case of the context line.
+    """
     if not source:
         return None, None, None
 
@@ -114,20 +142,16 @@ def get_source_context(source, lineno, colno, context=LINES_OF_CONTEXT):
     lower_bound = max(0, lineno - context)
     upper_bound = min(lineno + 1 + context, len(source))
 
-    try:
-        pre_context = [trim_line(x) for x in source[lower_bound:lineno]]
-    except IndexError:
-        pre_context = []
+    pre_context = [
+        trim_source_line(source, x) for x in range(lower_bound, min(lineno, len(source)))
+    ]
 
     try:
-        context_line = trim_line(source[lineno], colno)
+        context_line = trim_source_line(source, lineno, colno)
     except IndexError:
         context_line = ''
 
-    try:
-        post_context = [trim_line(x) for x in source[(lineno + 1):upper_bound]]
-    except IndexError:
-        post_context = []
+    post_context = [trim_source_line(source, x) for x in range(lineno + 1, upper_bound)]
 
     return pre_context or None, context_line, post_context or None
 
@@ -195,81 +219,64 @@ def discover_sourcemap(result):
 
 
 def fetch_release_file(filename, release, dist=None):
-    cache_key = 'releasefile:v1:%s:%s' % (release.id, md5_text(filename).hexdigest(), )
-
-    logger.debug('Checking cache for release artifact %r (release_id=%s)', filename, release.id)
-    result = cache.get(cache_key)
-
     dist_name = dist and dist.name or None
+    dist_id = dist and dist.id or None
 
-    if result is None:
-        filename_choices = ReleaseFile.normalize(filename)
-        filename_idents = [ReleaseFile.get_ident(f, dist_name) for f in filename_choices]
+    # The artifacts of a release are looked up in its manifest, which is
+    # cached along with the release, so that missing files cost nothing.
+    manifest = ReleaseFile.objects.get_manifest(release)
 
+    # Pick first one that matches in priority order.
+    releasefile = None
+    for filename_choice in ReleaseFile.normalize(filename):
+        entry = manifest.get(ReleaseFile.get_ident(filename_choice, dist_name))
+        if entry is not None and entry.dist_id == dist_id:
+            releasefile = entry
+            break
+
+    if releasefile is None:
         logger.debug(
-            'Checking database for release artifact %r (release_id=%s)', filename, release.id
+            'Release artifact %r not found in manifest (release_id=%s)', filename, release.id
         )
+        return None
 
-        possible_files = list(
-            ReleaseFile.objects.filter(
-                release=release,
-                dist=dist,
-                ident__in=filename_idents,
-            ).select_related('file')
-        )
+    encoding = get_encoding_from_headers(releasefile.headers)
 
-        if len(possible_files) == 0:
-            logger.debug(
-                'Release artifact %r not found in database (release_id=%s)', filename, release.id
-            )
-            cache.set(cache_key, -1, 60)
+    # Contents are cached by checksum, so that identical artifacts of several
+    # releases are only stored once.  Read errors are cached per file, so
+    # that they don't affect other files with the same contents.
+    cache_key = 'releasefile:v2:%s' % (releasefile.checksum or 'id:%s' % releasefile.file_id, )
+    error_cache_key = 'releasefile:v2:error:%s' % (releasefile.file_id, )
+
+    logger.debug('Checking cache for release artifact %r (release_id=%s)', filename, release.id)
+    cached = cache.get_many([cache_key, error_cache_key])
+    z_body = cached.get(cache_key)
+
+    if z_body is None:
+        if cached.get(error_cache_key) is not None:
             return None
-        elif len(possible_files) == 1:
-            releasefile = possible_files[0]
-        else:
-            # Pick first one that matches in priority order.
-            # This is O(N*M) but there are only ever at most 4 things here
-            # so not really worth optimizing.
-            releasefile = next((
-                rf
-                for ident in filename_idents
-                for rf in possible_files
-                if rf.ident == ident
-            ))
 
         logger.debug(
             'Found release artifact %r (id=%s, release_id=%s)', filename, releasefile.id, release.id
         )
         try:
             with metrics.timer('sourcemaps.release_file_read'):
-                with releasefile.file.getfile() as fp:
+                file = File.objects.get(id=releasefile.file_id)
+                with file.getfile() as fp:
                     z_body, body = compress_file(fp)
+        except File.DoesNotExist:
+            # The artifact was deleted since the manifest was cached.
+            ReleaseFile.objects.clear_manifest(release.id)
+            return None
         except Exception as e:
             logger.exception(six.text_type(e))
-            cache.set(cache_key, -1, 3600)
-            result = None
-        else:
-            headers = {k.lower(): v for k, v in releasefile.file.headers.items()}
-            encoding = get_encoding_from_headers(headers)
-            result = http.UrlResult(filename, headers, body, 200, encoding)
-            cache.set(cache_key, (headers, z_body, 200, encoding), 3600)
-
-    elif result == -1:
-        # We cached an error, so normalize
-        # it down to None
-        result = None
+            cache.set(error_cache_key, 1, 3600)
+            return None
+        cache.set(cache_key, z_body, 3600)
     else:
-        # Previous caches would be a 3-tuple instead of a 4-tuple,
-        # so this is being maintained for backwards compatibility
-        try:
-            encoding = result[3]
-        except IndexError:
-            encoding = None
-        result = http.UrlResult(
-            filename, result[0], zlib.decompress(result[1]), result[2], encoding
-        )
+        body = zlib.decompress(z_body)
 
-    return result
+    return http.UrlResult(filename, dict(releasefile.headers), body, 200, encoding)
 
 
 def fetch_file(url, project=None, release=None, dist=None, allow_scraping=True):
@@ -526,7 +533,7 @@ class JavaScriptStacktraceProcessor(StacktraceProcessor):
 
         # This might fail but that's okay, we try with a different path a
         # bit later down the road.
-        source = self.get_sourceview(frame['abs_path'])
+        source = self.get_source_index(frame['abs_path'])
 
         in_app = None
         new_frame = dict(frame)
@@ -589,7 +596,7 @@ class JavaScriptStacktraceProcessor(StacktraceProcessor):
                 logger.debug(
                     'Mapping compressed source %r to mapping in %r', frame['abs_path'], abs_path
                 )
-                source = self.get_sourceview(abs_path)
+                source = self.get_source_index(abs_path)
 
             if not source:
                 errors = cache.get_errors(abs_path)
@@ -700,7 +707,7 @@ class JavaScriptStacktraceProcessor(StacktraceProcessor):
     def expand_frame(self, frame, source=None):
         if frame.get('lineno') is not None:
             if source is None:
-                source = self.get_sourceview(frame['abs_path'])
+                source = self.get_source_index(frame['abs_path'])
                 if source is None:
                     logger.debug('No source found for %s', frame['abs_path'])
                     return False
@@ -716,6 +723,11 @@ class JavaScriptStacktraceProcessor(StacktraceProcessor):
             self.cache_source(filename)
         return self.cache.get(filename)
 
+    def get_source_index(self, filename):
+        if filename not in self.cache:
+            self.cache_source(filename)
+        return self.cache.get_index(filename)
+
     def cache_source(self, filename):
         sourcemaps = self.sourcemaps
         cache = self.cache
@@ -252,7 +252,7 @@ class NativeStacktraceProcessor(StacktraceProcessor):
                 # do not want to report some processing issues (eg:
                 # optional dsyms)
                 errors = []
-                if e.is_user_fixable or e.is_sdk_failure:
+                if e.is_user_fixable or e.is_sdk_failure or e.is_transient:
                     errors.append({
                         'type': e.type,
                         'image_uuid': e.image_uuid,
@@ -2,6 +2,7 @@ from __future__ import absolute_import
 
 import re
 import six
+import uuid
 
 from symbolic import SymbolicError, ObjectLookup, Symbol, parse_addr
 
@@ -12,6 +13,7 @@ from sentry.lang.native.utils import rebase_addr
 from sentry.constants import MAX_SYM, NATIVE_UNKNOWN_STRING
 
 FATAL_ERRORS = (EventError.NATIVE_MISSING_DSYM, EventError.NATIVE_BAD_DSYM, )
+TRANSIENT_ERRORS = (EventError.NATIVE_SYMCACHE_PENDING, )
 USER_FIXABLE_ERRORS = (
     EventError.NATIVE_MISSING_DSYM, EventError.NATIVE_MISSING_OPTIONALLY_BUNDLED_DSYM,
     EventError.NATIVE_BAD_DSYM, EventError.NATIVE_MISSING_SYMBOL,
@@ -72,6 +74,12 @@ class SymbolicationFailed(Exception):
         """If this is true then a processing issues has to be reported."""
         return self.type in FATAL_ERRORS
 
+    @property
+    def is_transient(self):
+        """An error that goes away by itself (eg: once a debug symbol file
+        has been processed)."""
+        return self.type in TRANSIENT_ERRORS
+
     @property
     def is_sdk_failure(self):
         """An error that most likely happened because of a bad SDK."""
@@ -111,9 +119,14 @@ class Symbolizer(object):
             object_lookup = ObjectLookup(object_lookup)
         self.object_lookup = object_lookup
 
+        self.pending_symcaches = set()
         self.symcaches = ProjectDSymFile.dsymcache.get_symcaches(
             project, referenced_images,
-            on_dsym_file_referenced=on_dsym_file_referenced)
+            on_dsym_file_referenced=on_dsym_file_referenced,
+            on_symcache_pending=self._on_symcache_pending)
+
+    def _on_symcache_pending(self, dsym_file):
+        self.pending_symcaches.add(uuid.UUID(dsym_file.uuid))
 
     def _process_frame(self, sym, obj, package=None, addr_off=0):
         frame = {
@@ -204,7 +217,9 @@ class Symbolizer(object):
     def _symbolize_app_frame(self, instruction_addr, obj, sdk_info=None):
         symcache = self.symcaches.get(obj.uuid)
         if symcache is None:
-            if self._is_optional_dsym(obj, sdk_info=sdk_info):
+            if obj.uuid in self.pending_symcaches:
+                type = EventError.NATIVE_SYMCACHE_PENDING
+            elif self._is_optional_dsym(obj, sdk_info=sdk_info):
                 type = EventError.NATIVE_MISSING_OPTIONALLY_BUNDLED_DSYM
             else:
                 type = EventError.NATIVE_MISSING_DSYM
@@ -1,5 +1,6 @@
 from __future__ import absolute_import
 
+import six
 import logging
 
 from requests.exceptions import RequestException
@@ -7,30 +8,121 @@ from requests.exceptions import RequestException
 from sentry import options
 from sentry.http import Session
 from sentry.lang.native.utils import sdk_info_to_sdk_id
+from sentry.utils import metrics
+from sentry.utils.cache import default_cache
+from sentry.utils.datastructures import LRUCache
+from sentry.utils.hashlib import hash_values
 
 MAX_ATTEMPTS = 3
 
+# System symbols never change for an object, so found symbols are kept for
+# long.  Symbols that were not found are looked up again after a while, in
+# case the symbol server learned about the SDK in the meantime.
+SYMBOL_CACHE_TIMEOUT = 60 * 60 * 24
+MISSING_SYMBOL_CACHE_TIMEOUT = 60 * 60
+LOCAL_SYMBOL_CACHE_TTL = 60 * 5
+
+# Stored in the caches for symbols that the symbol server does not know.
+NOT_FOUND = 0
+
 logger = logging.getLogger(__name__)
 
+_local_cache = LRUCache(50000, ttl=LOCAL_SYMBOL_CACHE_TTL)
+
 
 def lookup_system_symbols(symbols, sdk_info=None, cpu_name=None):
     """Looks for system symbols in the configured system server if
     enabled.  If this failes or the server is disabled, `None` is
     returned.
+
+    Results are cached per symbol, both in the process and in the shared
+    cache, so that only unknown symbols are sent to the server.
     """
     if not options.get('symbolserver.enabled'):
         return
 
+    sdk_id = sdk_info_to_sdk_id(sdk_info)
+    keys = [get_symbol_cache_key(sdk_id, cpu_name, s) for s in symbols]
+
+    results = {}
+    for key in keys:
+        value = _local_cache.get(key)
+        if value is not None:
+            results[key] = value
+
+    missing = [key for key in keys if key not in results]
+    if missing:
+        for key, value in six.iteritems(default_cache.get_many(missing)):
+            _local_cache.set(key, value)
+            results[key] = value
+
+    metrics.incr(
+        'symbolserver.cache',
+        amount=len(results),
+        tags={'result': 'hit'},
+        skip_internal=True,
+    )
+    metrics.incr(
+        'symbolserver.cache',
+        amount=len(keys) - len(results),
+        tags={'result': 'miss'},
+        skip_internal=True,
+    )
+
+    to_lookup = {}
+    for key, symbol in zip(keys, symbols):
+        if key not in results:
+            to_lookup[key] = symbol
+
+    if to_lookup:
+        to_lookup = list(to_lookup.items())
+        rv = _query_system_symbols([s for _, s in to_lookup], sdk_id, cpu_name)
+        if rv is None:
+            return None
+
+        found = {}
+        not_found = {}
+        for (key, _), value in zip(to_lookup, rv):
+            if value is None:
+                not_found[key] = results[key] = NOT_FOUND
+            else:
+                found[key] = results[key] = value
+            _local_cache.set(key, results[key])
+
+        if found:
+            default_cache.set_many(found, SYMBOL_CACHE_TIMEOUT)
+        if not_found:
+            default_cache.set_many(not_found, MISSING_SYMBOL_CACHE_TIMEOUT)
+
+    return [results[key] or None for key in keys]
+
+
+def clear_local_cache():
+    _local_cache.clear()
+
+
+def get_symbol_cache_key(sdk_id, cpu_name, symbol):
+    return 'sysym:1:%s' % (hash_values([
+        sdk_id,
+        cpu_name,
+        symbol['object_uuid'],
+        symbol['addr'],
+    ]), )
+
+
+def _query_system_symbols(symbols, sdk_id, cpu_name):
     url = '%s/lookup' % options.get('symbolserver.options')['url'].rstrip('/')
     sess = Session()
     symbol_query = {
-        'sdk_id': sdk_info_to_sdk_id(sdk_info),
+        'sdk_id': sdk_id,
         'cpu_name': cpu_name,
         'symbols': symbols,
     }
 
     attempts = 0
 
+    metrics.timing('symbolserver.batch_size', len(symbols))
+
     with sess:
         while 1:
             try:
@@ -39,7 +131,7 @@ def lookup_system_symbols(symbols, sdk_info=None, cpu_name=None):
                 # it will report a 404 here.  In that case just assume
                 # that we did not find a match and do not retry.
                 if rv.status_code == 404:
-                    return None
+                    return [None] * len(symbols)
                 rv.raise_for_status()
                 return rv.json()['symbols']
             except (IOError, RequestException):
@@ -13,11 +13,14 @@ import os
 import six
 import uuid
 import time
+import fcntl
 import errno
 import shutil
 import hashlib
 import logging
+import operator
 import tempfile
+import functools
 from requests.exceptions import RequestException
 
 from jsonfield import JSONField
@@ -26,12 +29,16 @@ from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 
 from symbolic import FatObject, SymbolicError, UnsupportedObjectFile, \
-    SymCache, SYMCACHE_LATEST_VERSION
+    SymCache, ProguardMappingView, SYMCACHE_LATEST_VERSION
 
 from sentry import options
 from sentry.db.models import FlexibleForeignKey, Model, \
     sane_repr, BaseManager, BoundedPositiveIntegerField
 from sentry.models.file import File
+from sentry.utils import metrics
+from sentry.utils.cache import default_cache, memoize
+from sentry.utils.datastructures import LRUCache
+from sentry.utils.threadpool import BoundedThreadPool
 from sentry.utils.zip import safe_extract_zip
 from sentry.constants import KNOWN_DSYM_TYPES
 from sentry.reprocessing import resolve_processing_issue
@@ -42,6 +49,23 @@ logger = logging.getLogger(__name__)
 
 ONE_DAY = 60 * 60 * 24
 ONE_DAY_AND_A_HALF = int(ONE_DAY * 1.5)
+
+# Files in the local cache are only touched on use if they were not touched
+# within this many seconds, which is precise enough for the eviction order.
+FILE_TOUCH_INTERVAL = 60
+
+_checksum_re = re.compile(r'^[0-9a-f]{40}$')
+
+# How long the results of debug file lookups are remembered by every
+# process.  This also bounds how long a process might not see a newly
+# uploaded debug file.
+METADATA_CACHE_TTL = 30
+
+# The number of threads building the symcaches of a fat file at once, and
+# for how long an enqueued symcache build keeps events from enqueueing
+# another one.
+SYMCACHE_BUILD_WORKERS = 4
+SYMCACHE_UPDATE_TIMEOUT = 60 * 10
 DSYM_MIMETYPES = dict((v, k) for k, v in KNOWN_DSYM_TYPES.items())
 
 _proguard_file_re = re.compile(r'/proguard/(?:mapping-)?(.*?)\.txt$')
@@ -274,6 +298,8 @@ def _create_dsym_from_uuid(project, dsym_type, cpu_name, uuid, fileobj, basename
         file.delete()
         rv = ProjectDSymFile.objects.get(uuid=uuid, project=project)
 
+    ProjectDSymFile.dsymcache.forget(project, uuid)
+
     resolve_processing_issue(
         project=project,
         scope='native',
@@ -342,15 +368,14 @@ def create_files_from_dsym_zip(fileobj, project,
                 if created:
                     rv.append(dsym)
 
-        # By default we trigger the symcache generation on upload to avoid
-        # some obvious dogpiling.
+        # By default we trigger the symcache generation on upload, as
+        # symcaches are never built while processing events.
         if update_symcaches:
-            from sentry.tasks.symcache_update import symcache_update
             uuids_to_update = [six.text_type(x.uuid) for x in rv
                                if x.supports_symcache]
             if uuids_to_update:
-                symcache_update.delay(project_id=project.id,
-                                      uuids=uuids_to_update)
+                ProjectDSymFile.dsymcache.schedule_symcache_update(
+                    project, uuids_to_update, force=True)
 
         return rv
     finally:
@@ -368,26 +393,124 @@ def find_dsym_file(project, image_uuid):
         pass
 
 
+_missing = object()
+
+
 class DSymCache(object):
     @property
     def cache_path(self):
         return options.get('dsym.cache-path')
 
-    def get_project_path(self, project):
-        return os.path.join(self.cache_path, six.text_type(project.id))
+    @memoize
+    def _handles(self):
+        # Opened (memory mapped) symcaches and proguard mappings by project,
+        # uuid and checksum of the file.  Entries are ``(handle, size)``.
+        return LRUCache(
+            options.get('dsym.handle-pool-entries'),
+            max_size=options.get('dsym.handle-pool-size'),
+            sizeof=operator.itemgetter(1),
+        )
+
+    @memoize
+    def _build_pool(self):
+        return BoundedThreadPool(workers=SYMCACHE_BUILD_WORKERS, name='symcache')
+
+    @memoize
+    def _metadata(self):
+        # The results of the database lookups for debug files by project
+        # and uuid, including the lack of any.
+        return LRUCache(10000, ttl=METADATA_CACHE_TTL)
+
+    def get_file_path(self, checksum):
+        return os.path.join(self.cache_path, 'objects', checksum[:2], checksum)
+
+    def forget(self, project, image_uuid):
+        """Drops the cached lookups for a debug file of this process."""
+        image_uuid = six.text_type(image_uuid).lower()
+        self._metadata.delete(('dsym', project.id, image_uuid))
+        self._metadata.delete(('symcache', project.id, image_uuid))
+
+    def clear_local_cache(self):
+        self._handles.clear()
+        self._metadata.clear()
 
     def update_symcaches(self, project, uuids):
         """Given some uuids of dsyms this will update the symcaches for
         all of these if a symcache is supported for that symbol.
         """
-        self._get_symcaches_impl(project, uuids)
+        self._load_symcache_metadata(project, list(map(six.text_type, uuids)))
 
-    def get_symcaches(self, project, uuids, on_dsym_file_referenced=None):
-        """Given some uuids returns the symcaches loaded for these uuids."""
+    def schedule_symcache_update(self, project, uuids, force=False):
+        """Enqueues building the symcaches for the given uuids, unless that
+        already happened recently (or `force` is set.)
+        """
+        from sentry.tasks.symcache_update import symcache_update
+        to_update = []
+        for dsym_uuid in map(six.text_type, uuids):
+            key = 'symcache-update:%s:%s' % (project.id, dsym_uuid)
+            if force:
+                default_cache.set(key, 1, SYMCACHE_UPDATE_TIMEOUT)
+            elif not default_cache.add(key, 1, SYMCACHE_UPDATE_TIMEOUT):
+                continue
+            to_update.append(dsym_uuid)
+
+        if to_update:
+            symcache_update.delay(project_id=project.id, uuids=to_update)
+
+    def get_symcaches(self, project, uuids, on_dsym_file_referenced=None,
+                      on_symcache_pending=None):
+        """Given some uuids returns the symcaches loaded for these uuids.
+
+        Symcaches are never built here.  If one is missing (or outdated),
+        building it is enqueued and `on_symcache_pending` is invoked with
+        the dsym file instead.
+        """
         cachefiles = self._get_symcaches_impl(project, uuids,
-                                              on_dsym_file_referenced)
+                                              on_dsym_file_referenced,
+                                              on_symcache_pending)
         return self._load_cachefiles_via_fs(project, cachefiles)
 
+    def get_proguard_mappings(self, project, uuids):
+        """Given some uuids returns the proguard mapping views loaded for
+        these uuids.
+        """
+        rv = {}
+        for image_uuid in uuids:
+            image_uuid = six.text_type(image_uuid).lower()
+            dsym_file = self._find_dsym_file(project, image_uuid)
+            if dsym_file is None:
+                continue
+
+            rv[uuid.UUID(image_uuid)] = self._get_handle(
+                ('proguard', project.id, image_uuid, dsym_file.file.checksum),
+                functools.partial(self._open_proguard_mapping, dsym_file),
+            )
+        return rv
+
+    def _find_dsym_file(self, project, image_uuid):
+        key = ('dsym', project.id, image_uuid)
+        dsym_file = self._metadata.get(key, _missing)
+        if dsym_file is _missing:
+            dsym_file = find_dsym_file(project, image_uuid)
+            self._metadata.set(key, dsym_file)
+        return dsym_file
+
+    def _open_proguard_mapping(self, dsym_file):
+        dsym_path = self._fetch_file(dsym_file.file)
+        return ProguardMappingView.from_path(dsym_path), os.path.getsize(dsym_path)
+
+    def _get_handle(self, key, open_handle):
+        entry = self._handles.get(key)
+        metrics.incr(
+            'dsymcache.handle',
+            tags={'result': 'miss' if entry is None else 'hit'},
+            skip_internal=True,
+        )
+        if entry is None:
+            entry = open_handle()
+            self._handles.set(key, entry)
+        return entry[0]
+
     def fetch_dsyms(self, project, uuids):
         """Given some uuids returns a uuid to path mapping for where the
         debug symbol files are on the FS.
@@ -395,30 +518,96 @@ class DSymCache(object):
         rv = {}
         for image_uuid in uuids:
             image_uuid = six.text_type(image_uuid).lower()
-            dsym_path = os.path.join(self.get_project_path(project), image_uuid)
+            dsym_file = self._find_dsym_file(project, image_uuid)
+            if dsym_file is None:
+                continue
+            rv[uuid.UUID(image_uuid)] = self._fetch_file(dsym_file.file)
 
+        return rv
+
+    def _fetch_file(self, file):
+        """Returns the path of the local copy of a file, downloading it
+        first if it is not in the cache yet.  Files are stored by checksum,
+        so identical files of different projects are only stored once.
+        """
+        path = self.get_file_path(file.checksum)
+        hit = self._touch_file(path)
+        if not hit:
+            hit = self._fill_file(path, file)
+        metrics.incr(
+            'dsymcache.file',
+            tags={'result': 'hit' if hit else 'miss'},
+            skip_internal=True,
+        )
+        return path
+
+    def _touch_file(self, path):
+        # Bumps the mtime of a cached file, which is what it is evicted by.
+        try:
+            stat = os.stat(path)
+            now = int(time.time())
+            if stat.st_mtime < now - FILE_TOUCH_INTERVAL:
+                os.utime(path, (now, now))
+        except OSError as e:
+            if e.errno != errno.ENOENT:
+                raise
+            return False
+        return True
+
+    def _fill_file(self, path, file):
+        # Only one process downloads a file at a time; everybody else waits
+        # for the lock and then finds the file in place.  The file itself is
+        # moved into place atomically by ``save_to``.
+        try:
+            os.makedirs(os.path.dirname(path))
+        except OSError:
+            pass
+        with open(path + '.lock', 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
             try:
-                os.stat(dsym_path)
-            except OSError as e:
-                if e.errno != errno.ENOENT:
-                    raise
-                dsym_file = find_dsym_file(project, image_uuid)
-                if dsym_file is None:
-                    continue
-                dsym_file.file.save_to(dsym_path)
-            rv[uuid.UUID(image_uuid)] = dsym_path
+                if self._touch_file(path):
+                    return True
+                file.save_to(path)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+        return False
+
+    def _get_symcaches_impl(self, project, uuids, on_dsym_file_referenced=None,
+                            on_symcache_pending=None):
+        cachefiles = []
+        uncached = []
+        for dsym_uuid in map(six.text_type, uuids):
+            entry = self._metadata.get(('symcache', project.id, dsym_uuid), _missing)
+            if entry is _missing:
+                uncached.append(dsym_uuid)
+            elif entry is not None:
+                dsym_file, cache_file = entry
+                if on_dsym_file_referenced is not None:
+                    on_dsym_file_referenced(dsym_file)
+                cachefiles.append((dsym_uuid, cache_file))
 
-        return rv
+        if uncached:
+            cachefiles.extend(self._load_symcache_metadata(
+                project, uncached, on_dsym_file_referenced,
+                on_symcache_pending=on_symcache_pending, build=False))
+        return cachefiles
 
-    def _get_symcaches_impl(self, project, uuids, on_dsym_file_referenced=None):
+    def _load_symcache_metadata(self, project, uuid_strings, on_dsym_file_referenced=None,
+                                on_symcache_pending=None, build=True):
         # Fetch dsym files first and invoke the callback if we need
-        uuid_strings = list(map(six.text_type, uuids))
         dsym_files = [x for x in ProjectDSymFile.objects.filter(
             project=project,
             uuid__in=uuid_strings,
         ).select_related('file') if x.supports_symcache]
+
+        # Remember which of the uuids do not have a dsym file at all.
+        found = set(x.uuid for x in dsym_files)
+        for dsym_uuid in uuid_strings:
+            if dsym_uuid not in found:
+                self._metadata.set(('symcache', project.id, dsym_uuid), None)
+
         if not dsym_files:
-            return {}
+            return []
 
         dsym_files_by_uuid = {}
         for dsym_file in dsym_files:
@@ -445,8 +634,14 @@ class DSymCache(object):
                 cachefiles_to_update[dsym_uuid] = \
                     (cache_file, dsym_file)
 
-        # if any cache files need to be updated, do that now.
-        if cachefiles_to_update:
+        # if any cache files need to be updated, do that now (or leave it
+        # to the symcache queue if we're not supposed to build them.)
+        if cachefiles_to_update and not build:
+            self.schedule_symcache_update(project, list(cachefiles_to_update))
+            if on_symcache_pending is not None:
+                for dsym_uuid in cachefiles_to_update:
+                    on_symcache_pending(dsym_files_by_uuid[dsym_uuid])
+        elif cachefiles_to_update:
             to_update = []
             for dsym_uuid, it in six.iteritems(cachefiles_to_update):
                 if it is None:
@@ -457,96 +652,134 @@ class DSymCache(object):
                 to_update.append(dsym_file)
             cachefiles.extend(self._update_cachefiles(project, to_update))
 
+        for dsym_uuid, cache_file in cachefiles:
+            self._metadata.set(
+                ('symcache', project.id, dsym_uuid),
+                (dsym_files_by_uuid[dsym_uuid], cache_file),
+            )
+
         return cachefiles
 
     def _update_cachefiles(self, project, dsym_files):
         rv = []
 
+        # The objects of a fat file are all stored as the same file, so
+        # fetch and parse it once, and build the symcaches of the objects
+        # in parallel.
+        dsym_files_by_checksum = {}
         for dsym_file in dsym_files:
-            dsym_uuid = dsym_file.uuid
+            dsym_files_by_checksum.setdefault(
+                dsym_file.file.checksum, []).append(dsym_file)
+
+        for dsym_files in six.itervalues(dsym_files_by_checksum):
             try:
-                with dsym_file.file.getfile(as_tempfile=True) as tf:
+                with dsym_files[0].file.getfile(as_tempfile=True) as tf:
                     fo = FatObject.from_path(tf.name)
-                    o = fo.get_object(uuid=dsym_file.uuid)
-                    if o is None:
-                        continue
-                    cache = o.make_symcache()
+                    futures = [(dsym_file, self._build_pool.submit(
+                        self._make_symcache, fo, dsym_file)) for dsym_file in dsym_files]
+                    caches = [(dsym_file, f.result()) for dsym_file, f in futures]
             except SymbolicError:
-                logger.error('dsymfile.symcache-build-error',
-                             exc_info=True, extra=dict(dsym_uuid=dsym_uuid))
+                logger.error('dsymfile.symcache-build-error', exc_info=True,
+                             extra=dict(dsym_uuid=dsym_files[0].uuid))
                 continue
 
-            file = File.objects.create(
-                name=dsym_file.uuid,
-                type='project.symcache',
-            )
-            file.putfile(cache.open_stream())
-            try:
-                with transaction.atomic():
-                    rv.append((dsym_uuid, ProjectSymCacheFile.objects.get_or_create(
-                        project=project,
-                        cache_file=file,
-                        dsym_file=dsym_file,
-                        defaults=dict(
-                            checksum=dsym_file.file.checksum,
-                            version=cache.file_format_version,
-                        )
-                    )[0]))
-            except IntegrityError:
-                file.delete()
-                rv.append((dsym_uuid, ProjectSymCacheFile.objects.get(
-                    project=project,
-                    dsym_file=dsym_file,
-                )))
+            for dsym_file, cache in caches:
+                if cache is not None:
+                    rv.append((dsym_file.uuid, self._store_symcache(
+                        project, dsym_file, cache)))
 
         return rv
 
+    def _make_symcache(self, fo, dsym_file):
+        o = fo.get_object(uuid=dsym_file.uuid)
+        if o is None:
+            return None
+        try:
+            return o.make_symcache()
+        except SymbolicError:
+            logger.error('dsymfile.symcache-build-error',
+                         exc_info=True, extra=dict(dsym_uuid=dsym_file.uuid))
+
+    def _store_symcache(self, project, dsym_file, cache):
+        file = File.objects.create(
+            name=dsym_file.uuid,
+            type='project.symcache',
+        )
+        file.putfile(cache.open_stream())
+        try:
+            with transaction.atomic():
+                return ProjectSymCacheFile.objects.get_or_create(
+                    project=project,
+                    cache_file=file,
+                    dsym_file=dsym_file,
+                    defaults=dict(
+                        checksum=dsym_file.file.checksum,
+                        version=cache.file_format_version,
+                    )
+                )[0]
+        except IntegrityError:
+            file.delete()
+            return ProjectSymCacheFile.objects.get(
+                project=project,
+                dsym_file=dsym_file,
+            )
+
     def _load_cachefiles_via_fs(self, project, cachefiles):
         rv = {}
-        base = self.get_project_path(project)
         for dsym_uuid, symcache_file in cachefiles:
-            cachefile_path = os.path.join(base, dsym_uuid + '.symcache')
-            try:
-                stat = os.stat(cachefile_path)
-            except OSError as e:
-                if e.errno != errno.ENOENT:
-                    raise
-                symcache_file.cache_file.save_to(cachefile_path)
-            else:
-                self._try_bump_timestamp(cachefile_path, stat)
-            rv[uuid.UUID(dsym_uuid)] = SymCache.from_path(cachefile_path)
+            rv[uuid.UUID(dsym_uuid)] = self._get_handle(
+                ('symcache', project.id, dsym_uuid, symcache_file.cache_file.checksum),
+                functools.partial(self._open_symcache, symcache_file),
+            )
         return rv
 
-    def _try_bump_timestamp(self, path, old_stat):
-        now = int(time.time())
-        if old_stat.st_ctime < now - ONE_DAY:
-            os.utime(path, (now, now))
+    def _open_symcache(self, symcache_file):
+        cachefile_path = self._fetch_file(symcache_file.cache_file)
+        return SymCache.from_path(cachefile_path), os.path.getsize(cachefile_path)
 
     def clear_old_entries(self):
-        try:
-            cache_folders = os.listdir(self.cache_path)
-        except OSError:
-            return
-
+        """Removes files that were not used for a day and a half, and then
+        the least recently used files until the cache fits into
+        ``dsym.cache-size`` bytes.
+        """
         cutoff = int(time.time()) - ONE_DAY_AND_A_HALF
-
-        for cache_folder in cache_folders:
-            cache_folder = os.path.join(self.cache_path, cache_folder)
-            try:
-                items = os.listdir(cache_folder)
-            except OSError:
-                continue
-            for cached_file in items:
-                cached_file = os.path.join(cache_folder, cached_file)
+        objects_path = os.path.join(self.cache_path, 'objects')
+
+        # This also walks the per project folders of older versions, which
+        # are removed once they are old enough.
+        files = []
+        evicted = 0
+        for folder, subfolders, names in os.walk(self.cache_path):
+            for name in names:
+                path = os.path.join(folder, name)
                 try:
-                    mtime = os.path.getmtime(cached_file)
+                    stat = os.stat(path)
                 except OSError:
                     continue
-                if mtime < cutoff:
-                    try:
-                        os.remove(cached_file)
-                    except OSError:
-                        pass
+                if stat.st_mtime < cutoff:
+                    evicted += self._remove_file(path)
+                elif _checksum_re.match(name) and \
+                        os.path.dirname(folder) == objects_path:
+                    # Lock files and downloads in progress are left alone.
+                    files.append((stat.st_mtime, stat.st_size, path))
+
+        size = sum(x[1] for x in files)
+        max_size = options.get('dsym.cache-size')
+        for mtime, file_size, path in sorted(files):
+            if size <= max_size:
+                break
+            evicted += self._remove_file(path)
+            size -= file_size
+
+        metrics.timing('dsymcache.size', size)
+        metrics.incr('dsymcache.evicted', amount=evicted, skip_internal=True)
+
+    def _remove_file(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            return 0
+        return 1
 
 
 ProjectDSymFile.dsymcache = DSymCache()
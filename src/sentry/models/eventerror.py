@@ -52,6 +52,7 @@ class EventError(object):
     NATIVE_MISSING_SYMBOL = 'native_missing_symbol'
     NATIVE_SIMULATOR_FRAME = 'native_simulator_frame'
     NATIVE_UNKNOWN_IMAGE = 'native_unknown_image'
+    NATIVE_SYMCACHE_PENDING = 'native_symcache_pending'
     PROGUARD_MISSING_MAPPING = 'proguard_missing_mapping'
     PROGUARD_MISSING_LINENO = 'proguard_missing_lineno'
 
@@ -92,6 +93,7 @@ class EventError(object):
         NATIVE_MISSING_SYMBOL: u'Unable to resolve a symbol.',
         NATIVE_SIMULATOR_FRAME: u'Encountered an unprocessable simulator frame.',
         NATIVE_UNKNOWN_IMAGE: u'An binary image is referenced that is unknown.',
+        NATIVE_SYMCACHE_PENDING: u'A debug symbol file is still being processed.',
         PROGUARD_MISSING_MAPPING: u'A proguard mapping file was missing.',
         PROGUARD_MISSING_LINENO: u'A proguard mapping file does not contain line info.',
     }
@@ -20,7 +20,7 @@ from django.db import models
 from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 
-from sentry import eventtypes, tagstore
+from sentry import eventtypes, tagindex, tagstore
 from sentry.constants import (
     DEFAULT_LOGGER_NAME, EVENT_ORDERING_KEY, LOG_LEVELS, MAX_CULPRIT_LENGTH
 )
@@ -150,25 +150,26 @@ class GroupManager(BaseManager):
 
         return Group.objects.get(id=group_id)
 
-    def add_tags(self, group, environment, tags):
-        project_id = group.project_id
-        date = group.last_seen
-
+    def add_tags(self, group, environment, tags, count=1):
+        normalized_tags = []
         for tag_item in tags:
             if len(tag_item) == 2:
                 (key, value), data = tag_item, None
             else:
                 key, value, data = tag_item
+            normalized_tags.append((key, value, data))
+
+        if not normalized_tags:
+            return
 
-            tagstore.incr_tag_value_times_seen(project_id, environment.id, key, value, {
-                'last_seen': date,
-                'data': data,
-            })
+        tagstore.incr_times_seen_for_tags(
+            group.project_id, group.id, environment.id, normalized_tags, group.last_seen,
+            count=count,
+        )
 
-            tagstore.incr_group_tag_value_times_seen(project_id, group.id, environment.id, key, value, {
-                'project_id': project_id,
-                'last_seen': date,
-            })
+        tagindex.index_group_tags(
+            group.project_id, group.id, [(k, v) for k, v, _ in normalized_tags],
+        )
 
 
 class Group(Model):
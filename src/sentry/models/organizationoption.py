@@ -7,6 +7,8 @@ sentry.models.organizationoption
 """
 from __future__ import absolute_import, print_function
 
+import six
+
 from celery.signals import task_postrun
 from django.core.signals import request_finished
 from django.db import models
@@ -15,12 +17,22 @@ from sentry.db.models import Model, FlexibleForeignKey, sane_repr
 from sentry.db.models.fields import EncryptedPickledObjectField
 from sentry.db.models.manager import BaseManager
 from sentry.utils.cache import cache
+from sentry.utils.datastructures import LRUCache
 
 
 class OrganizationOptionManager(BaseManager):
+    # Values are only kept locally for ``local_cache_ttl`` seconds, which
+    # bounds how stale they can be in processes that aren't cleared by the
+    # request and task signals (see ``contribute_to_class``.)
+    local_cache_ttl = 60
+    local_cache_size = 10000
+
     def __init__(self, *args, **kwargs):
         super(OrganizationOptionManager, self).__init__(*args, **kwargs)
-        self.__cache = {}
+        self.__cache = self._make_local_cache()
+
+    def _make_local_cache(self):
+        return LRUCache(self.local_cache_size, ttl=self.local_cache_ttl)
 
     def __getstate__(self):
         d = self.__dict__.copy()
@@ -30,22 +42,15 @@ class OrganizationOptionManager(BaseManager):
 
     def __setstate__(self, state):
         self.__dict__.update(state)
-        self.__cache = {}
+        self.__cache = self._make_local_cache()
 
     def _make_key(self, instance_id):
         assert instance_id
         return '%s:%s' % (self.model._meta.db_table, instance_id)
 
     def get_value_bulk(self, instances, key):
-        instance_map = dict((i.id, i) for i in instances)
-        queryset = self.filter(
-            organization__in=instances,
-            key=key,
-        )
-        result = dict((i, None) for i in instances)
-        for obj in queryset:
-            result[instance_map[obj.organization_id]] = obj.value
-        return result
+        values = self.get_all_values_bulk(instances)
+        return dict((i, values[i.id].get(key)) for i in instances)
 
     def get_value(self, organization, key, default=None):
         result = self.get_all_values(organization)
@@ -75,24 +80,58 @@ class OrganizationOptionManager(BaseManager):
         else:
             organization_id = organization
 
-        if organization_id not in self.__cache:
-            cache_key = self._make_key(organization_id)
-            result = cache.get(cache_key)
-            if result is None:
-                result = self.reload_cache(organization_id)
-            else:
-                self.__cache[organization_id] = result
-        return self.__cache.get(organization_id, {})
+        return self.get_all_values_bulk([organization_id])[organization_id]
+
+    def get_all_values_bulk(self, organizations):
+        """
+        Returns a mapping of organization ID to all of the option values of
+        the organization. Values that aren't available locally are fetched
+        with a single cache multi-get, and those that aren't cached at all
+        with a single query.
+        """
+        organization_ids = set(
+            organization.id if isinstance(organization, models.Model) else organization
+            for organization in organizations
+        )
+
+        results = {}
+        for organization_id in organization_ids:
+            result = self.__cache.get(organization_id)
+            if result is not None:
+                results[organization_id] = result
+
+        missing = [i for i in organization_ids if i not in results]
+        if missing:
+            cache_keys = dict((self._make_key(i), i) for i in missing)
+            for cache_key, result in six.iteritems(cache.get_many(list(cache_keys))):
+                if result is None:
+                    continue
+                results[cache_keys[cache_key]] = result
+                self.__cache.set(cache_keys[cache_key], result)
+
+            missing = [i for i in missing if i not in results]
+            if missing:
+                results.update(self.reload_cache_bulk(missing))
+
+        return results
 
     def clear_local_cache(self, **kwargs):
-        self.__cache = {}
+        self.__cache.clear()
 
     def reload_cache(self, organization_id):
-        cache_key = self._make_key(organization_id)
-        result = dict((i.key, i.value) for i in self.filter(organization=organization_id))
-        cache.set(cache_key, result)
-        self.__cache[organization_id] = result
-        return result
+        return self.reload_cache_bulk([organization_id])[organization_id]
+
+    def reload_cache_bulk(self, organization_ids):
+        results = dict((organization_id, {}) for organization_id in organization_ids)
+        for i in self.filter(organization__in=organization_ids):
+            results[i.organization_id][i.key] = i.value
+
+        cache.set_many(
+            dict((self._make_key(i), result) for i, result in six.iteritems(results))
+        )
+        for organization_id, result in six.iteritems(results):
+            self.__cache.set(organization_id, result)
+        return results
 
     def post_save(self, instance, **kwargs):
         self.reload_cache(instance.organization_id)
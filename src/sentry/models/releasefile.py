@@ -8,12 +8,108 @@ sentry.models.releasefile
 
 from __future__ import absolute_import
 
+import six
+
+from collections import namedtuple
 from django.db import models
 from six.moves.urllib.parse import urlsplit, urlunsplit
 
 from sentry.db.models import BoundedPositiveIntegerField, FlexibleForeignKey, Model, sane_repr
+from sentry.db.models.manager import BaseManager
+from sentry.utils.cache import cache
+from sentry.utils.datastructures import LRUCache
 from sentry.utils.hashlib import sha1_text
 
+ReleaseFileManifestEntry = namedtuple(
+    'ReleaseFileManifestEntry', ['id', 'dist_id', 'file_id', 'checksum', 'headers']
+)
+
+
+class ReleaseFileManager(BaseManager):
+    # Manifests are only kept locally for ``local_cache_ttl`` seconds, which
+    # bounds how long other processes might not see a new artifact.
+    local_cache_ttl = 60
+    local_cache_size = 1000
+    # The combined number of artifacts of the locally cached manifests.
+    local_cache_max_artifacts = 100000
+    # Manifests are invalidated when an artifact is saved, which happens
+    # before the transaction commits.  If a manifest is loaded in between,
+    # the new artifact is missing from it until it expires.
+    cache_ttl = 300
+
+    def __init__(self, *args, **kwargs):
+        super(ReleaseFileManager, self).__init__(*args, **kwargs)
+        self.__cache = self._make_local_cache()
+
+    def _make_local_cache(self):
+        return LRUCache(
+            self.local_cache_size,
+            max_size=self.local_cache_max_artifacts,
+            ttl=self.local_cache_ttl,
+        )
+
+    def __getstate__(self):
+        d = self.__dict__.copy()
+        # we cant serialize weakrefs
+        d.pop('_ReleaseFileManager__cache', None)
+        return d
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__cache = self._make_local_cache()
+
+    def _make_key(self, release_id):
+        return 'releasefile:manifest:v1:%s' % (release_id, )
+
+    def get_manifest(self, release):
+        """
+        Returns a mapping of ident to ``ReleaseFileManifestEntry`` for all
+        of the artifacts of a release (of every distribution.)
+        """
+        if isinstance(release, models.Model):
+            release_id = release.id
+        else:
+            release_id = release
+
+        manifest = self.__cache.get(release_id)
+        if manifest is None:
+            manifest = cache.get(self._make_key(release_id))
+            if manifest is None:
+                manifest = self.reload_manifest(release_id)
+            else:
+                self.__cache.set(release_id, manifest)
+        return manifest
+
+    def reload_manifest(self, release_id):
+        manifest = {}
+        for releasefile in self.filter(release=release_id).select_related('file'):
+            manifest[releasefile.ident] = ReleaseFileManifestEntry(
+                id=releasefile.id,
+                dist_id=releasefile.dist_id,
+                file_id=releasefile.file_id,
+                checksum=releasefile.file.checksum,
+                headers={k.lower(): v for k, v in six.iteritems(releasefile.file.headers)},
+            )
+
+        cache.set(self._make_key(release_id), manifest, self.cache_ttl)
+        self.__cache.set(release_id, manifest)
+        return manifest
+
+    def clear_manifest(self, release_id):
+        cache.delete(self._make_key(release_id))
+        self.__cache.delete(release_id)
+
+    def clear_local_cache(self, **kwargs):
+        self.__cache.clear()
+
+    def post_save(self, instance, **kwargs):
+        # The manifest is only loaded again once it is needed, since
+        # artifacts are usually uploaded many at a time.
+        self.clear_manifest(instance.release_id)
+
+    def post_delete(self, instance, **kwargs):
+        self.clear_manifest(instance.release_id)
+
 
 class ReleaseFile(Model):
     r"""
@@ -33,6 +129,8 @@ class ReleaseFile(Model):
     name = models.TextField()
     dist = FlexibleForeignKey('sentry.Distribution', null=True)
 
+    objects = ReleaseFileManager()
+
     __repr__ = sane_repr('release', 'ident')
 
     class Meta:
@@ -55,6 +55,13 @@ register('redis.options', type=Dict, flags=FLAG_NOSTORE)
 
 # symbolizer specifics
 register('dsym.cache-path', type=String, default='/tmp/sentry-dsym-cache')
+# The number of bytes that the debug files in the cache path may take up
+# before the least recently used ones are removed.
+register('dsym.cache-size', default=10 * 1024 * 1024 * 1024, flags=FLAG_NOSTORE)
+# The number of opened symbol files (symcaches and proguard mappings) that
+# every process keeps around, and the combined size that they may have.
+register('dsym.handle-pool-entries', default=100, flags=FLAG_NOSTORE)
+register('dsym.handle-pool-size', default=1024 * 1024 * 1024, flags=FLAG_NOSTORE)
 
 # Mail
 register('mail.backend', default='smtp', flags=FLAG_NOSTORE)
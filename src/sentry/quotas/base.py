@@ -46,15 +46,57 @@ class Quota(Service):
     """
     __all__ = (
         'get_maximum_quota', 'get_organization_quota', 'get_project_quota', 'is_rate_limited',
-        'translate_quota', 'validate', 'refund',
+        'translate_quota', 'validate', 'refund', 'admit_event', 'forget_event_id',
     )
 
+    #: The number of seconds an admitted event ID is remembered for, during
+    #: which events with the same ID are considered duplicates.
+    event_id_ttl = 60 * 5
+
     def __init__(self, **options):
         pass
 
     def is_rate_limited(self, project, key=None):
         return NotRateLimited()
 
+    def get_event_id_key(self, project, event_id):
+        return 'ev:{}:{}'.format(project.id, event_id)
+
+    def admit_event(self, project, event_id, key=None, timestamp=None):
+        """
+        Check whether an incoming event is rate limited and, if it isn't,
+        whether an event with the same ID has recently been admitted for the
+        project. Returns a ``(rate_limit, is_duplicate)`` tuple.
+
+        If the event is not rate limited its ID is remembered for
+        ``event_id_ttl`` seconds. Backends may implement this check as a
+        single round trip.
+        """
+        from django.core.cache import cache
+
+        rate_limit = self.is_rate_limited(project, key=key)
+        if isinstance(rate_limit, bool):
+            rate_limit = RateLimit(is_limited=rate_limit, retry_after=None)
+
+        if rate_limit.is_limited:
+            return rate_limit, False
+
+        cache_key = self.get_event_id_key(project, event_id)
+        if cache.get(cache_key) is not None:
+            return rate_limit, True
+
+        cache.set(cache_key, '', self.event_id_ttl)
+        return rate_limit, False
+
+    def forget_event_id(self, project, event_id):
+        """
+        Forget an event ID remembered by ``admit_event``, so that an event
+        which could not be stored can be resubmitted.
+        """
+        from django.core.cache import cache
+
+        cache.delete(self.get_event_id_key(project, event_id))
+
     def refund(self, project, key=None, timestamp=None):
         raise NotImplementedError
 
@@ -17,6 +17,7 @@ from sentry.quotas.base import NotRateLimited, Quota, RateLimited
 from sentry.utils.redis import get_cluster_from_options, load_script
 
 is_rate_limited = load_script('quotas/is_rate_limited.lua')
+admit_event = load_script('quotas/admit_event.lua')
 
 
 class BasicRedisQuota(object):
@@ -145,8 +146,7 @@ class RedisQuota(Quota):
         if not quotas:
             return
 
-        client = self.cluster.get_local_client_for_key(six.text_type(project.organization_id))
-        pipe = client.pipeline()
+        pipe = self._get_client(project).pipeline()
 
         for quota in quotas:
             shift = project.organization_id % quota.window
@@ -165,28 +165,16 @@ class RedisQuota(Quota):
         """Return the timestamp when the next rate limit period begins for an interval."""
         return (((timestamp - shift) // interval) + 1) * interval + shift
 
-    def is_rate_limited(self, project, key=None, timestamp=None):
-        if timestamp is None:
-            timestamp = time()
+    def _get_client(self, project):
+        return self.cluster.get_local_client_for_key(six.text_type(project.organization_id))
 
-        quotas = self.get_quotas_with_limits(project, key=key)
-
-        # If there are no quotas to actually check, skip the trip to the database.
-        if not quotas:
-            return NotRateLimited()
-
-        keys = []
-        args = []
-        for quota in quotas:
-            shift = project.organization_id % quota.window
-            key = self.__get_redis_key(quota.key, timestamp, quota.window, shift)
-            return_key = self.get_refunded_quota_key(key)
-            keys.extend((key, return_key))
-            expiry = self.get_next_period_start(quota.window, shift, timestamp) + self.grace
-            args.extend((quota.limit, int(expiry)))
+    def _get_quota_keys(self, project, quota, timestamp):
+        shift = project.organization_id % quota.window
+        key = self.__get_redis_key(quota.key, timestamp, quota.window, shift)
+        expiry = self.get_next_period_start(quota.window, shift, timestamp) + self.grace
+        return key, self.get_refunded_quota_key(key), int(expiry)
 
-        client = self.cluster.get_local_client_for_key(six.text_type(project.organization_id))
-        rejections = is_rate_limited(client, keys, args)
+    def _get_rate_limit(self, project, quotas, rejections, timestamp):
         if any(rejections):
             enforce = False
             worst_case = (0, None)
@@ -205,3 +193,54 @@ class RedisQuota(Quota):
                     reason_code=worst_case[1],
                 )
         return NotRateLimited()
+
+    def is_rate_limited(self, project, key=None, timestamp=None):
+        if timestamp is None:
+            timestamp = time()
+
+        quotas = self.get_quotas_with_limits(project, key=key)
+
+        # If there are no quotas to actually check, skip the trip to the database.
+        if not quotas:
+            return NotRateLimited()
+
+        keys = []
+        args = []
+        for quota in quotas:
+            key, return_key, expiry = self._get_quota_keys(project, quota, timestamp)
+            keys.extend((key, return_key))
+            args.extend((quota.limit, expiry))
+
+        rejections = is_rate_limited(self._get_client(project), keys, args)
+        return self._get_rate_limit(project, quotas, rejections, timestamp)
+
+    def admit_event(self, project, event_id, key=None, timestamp=None):
+        """
+        Checks the quotas and the event ID with a single script call on the
+        organization's Redis host. The event ID is remembered on that host
+        rather than in the Django cache.
+        """
+        if timestamp is None:
+            timestamp = time()
+
+        quotas = self.get_quotas_with_limits(project, key=key)
+
+        keys = []
+        args = []
+        for quota in quotas:
+            key, return_key, expiry = self._get_quota_keys(project, quota, timestamp)
+            keys.extend((key, return_key))
+            args.extend((quota.limit, expiry, 1 if quota.enforce else 0))
+        keys.append(self.get_event_id_key(project, event_id))
+        args.append(self.event_id_ttl)
+
+        result = admit_event(self._get_client(project), keys, args)
+        rejections, is_duplicate = result[:-1], bool(result[-1])
+
+        rate_limit = self._get_rate_limit(project, quotas, rejections, timestamp)
+        if rate_limit.is_limited:
+            return rate_limit, False
+        return rate_limit, is_duplicate
+
+    def forget_event_id(self, project, event_id):
+        self._get_client(project).delete(self.get_event_id_key(project, event_id))
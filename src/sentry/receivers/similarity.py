@@ -2,7 +2,7 @@ from __future__ import absolute_import
 
 from sentry import features as feature_flags
 from sentry.signals import event_processed
-from sentry.similarity import features as similarity_features
+from sentry.similarity import record_buffer
 
 
 @event_processed.connect(weak=False)
@@ -10,4 +10,4 @@ def record(project, group, event, **kwargs):
     if not feature_flags.has('projects:similarity-indexing', project):
         return
 
-    similarity_features.record([event])
+    record_buffer.add(event)
@@ -8,7 +8,9 @@ sentry.runner.commands.cleanup
 from __future__ import absolute_import, print_function
 
 import six
+from collections import defaultdict
 from datetime import timedelta
+from functools import partial
 from uuid import uuid4
 
 import click
@@ -81,6 +83,45 @@ def cleanup_chunk(days, project_id, model, dtfield, order_by, num_shards, shard_
         t.join()
 
 
+def get_tag_index_fields(model):
+    # The v2 models refer to their keys and values by id.
+    if '_key' in model._meta.get_all_field_names():
+        return ('project_id', 'group_id', '_key', '_value')
+    return ('project_id', 'group_id', 'key', 'value')
+
+
+def remove_from_tag_index(model, rows):
+    """
+    Removes deleted group tag values from the tag index, given the values of
+    their ``get_tag_index_fields``.
+    """
+    from sentry import tagindex
+
+    if '_key' in model._meta.get_all_field_names():
+        keys = dict(
+            model._meta.get_field('_key').rel.to.objects.filter(
+                id__in=set(row[2] for row in rows),
+            ).values_list('id', 'key')
+        )
+        values = dict(
+            model._meta.get_field('_value').rel.to.objects.filter(
+                id__in=set(row[3] for row in rows),
+            ).values_list('id', 'value')
+        )
+        rows = [
+            (project_id, group_id, keys.get(key_id), values.get(value_id))
+            for project_id, group_id, key_id, value_id in rows
+        ]
+
+    tags = defaultdict(list)
+    for project_id, group_id, key, value in rows:
+        if key is not None and value is not None:
+            tags[(project_id, group_id)].append((key, value))
+
+    for (project_id, group_id), group_tags in six.iteritems(tags):
+        tagindex.remove_group_tags(project_id, group_id, group_tags)
+
+
 def create_deletion_task(days, project_id, model, dtfield, order_by):
     from sentry import models
     from sentry import deletions
@@ -178,6 +219,7 @@ def cleanup(days, project, concurrency, max_procs, silent, model, router, timed)
     from sentry.app import nodestore
     from sentry.db.deletion import BulkDeleteQuery
     from sentry import models
+    from sentry.tagstore.models import GroupTagValue
 
     if timed:
         import time
@@ -261,13 +303,21 @@ def cleanup(days, project, concurrency, max_procs, silent, model, router, timed)
             if not silent:
                 click.echo('>> Skipping %s' % model.__name__)
         else:
-            BulkDeleteQuery(
+            query = BulkDeleteQuery(
                 model=model,
                 dtfield=dtfield,
                 days=days,
                 project_id=project_id,
                 order_by=order_by,
-            ).execute()
+            )
+            if model is GroupTagValue:
+                # The deleted rows are removed from the tag index as well.
+                query.execute(
+                    returning=get_tag_index_fields(model),
+                    callback=partial(remove_from_tag_index, model),
+                )
+            else:
+                query.execute()
 
     for model, dtfield, order_by in DELETES:
         if not silent:
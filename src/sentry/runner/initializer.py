@@ -318,13 +318,15 @@ def initialize_app(config, skip_service_validation=False):
 
 def setup_services(validate=True):
     from sentry import (
-        analytics, buffer, digests, newsletter, nodestore, quotas, ratelimits, search, tagstore, tsdb
+        analytics, buffer, digests, newsletter, nodestore, quotas, ratelimits, search, tagindex,
+        tagstore, tsdb
     )
     from .importer import ConfigurationError
     from sentry.utils.settings import reraise_as
 
     service_list = (
-        analytics, buffer, digests, newsletter, nodestore, quotas, ratelimits, search, tagstore, tsdb,
+        analytics, buffer, digests, newsletter, nodestore, quotas, ratelimits, search, tagindex,
+        tagstore, tsdb,
     )
 
     for service in service_list:
@@ -0,0 +1,65 @@
+-- Admit an event for ingestion by checking its quotas and its ID in a single
+-- round trip.
+--
+-- The quotas are checked exactly as in ``is_rate_limited.lua``: values
+-- provided as ``KEYS`` specify pairs of counter and refund counter keys, and
+-- values provided as ``ARGV`` specify the limit, the expiration time and
+-- whether the quota is enforced (``1`` or ``0``) for each pair. The last
+-- ``KEYS`` value is the key used to deduplicate the event ID, and the last
+-- ``ARGV`` value is the number of seconds the event ID is remembered for.
+--
+-- For example, to check an enforced quota ``foo`` (refund counter ``r:foo``)
+-- with a limit of 10 items expiring at the Unix timestamp ``100``, and
+-- remember the event ID for 300 seconds, the ``KEYS`` and ``ARGV`` values
+-- would be as follows:
+--
+--   KEYS = {"foo", "r:foo", "ev:1:abc"}
+--   ARGV = {10, 100, 1, 300}
+--
+-- If all checks pass, the counters for all quotas are incremented. If any
+-- check fails, the counters for all quotas are unaffected. Unless an enforced
+-- quota rejected the event, the event ID key is set if it did not yet exist.
+--
+-- The result is a Lua table/array (Redis multi bulk reply) containing
+-- whether or not the item was *rejected* by each quota, followed by ``1`` if
+-- the event ID had already been seen or ``0`` if it had not.
+assert((#KEYS - 1) % 2 == 0, "there must be an even number of quota keys")
+assert((#KEYS - 1) / 2 * 3 == #ARGV - 1, "incorrect number of keys and arguments provided")
+
+local quota_count = (#KEYS - 1) / 2
+local event_key = KEYS[#KEYS]
+local event_ttl = ARGV[#ARGV]
+
+local results = {}
+local failed = false
+local enforced = false
+for i=1, quota_count do
+    local counter_key = KEYS[i * 2 - 1]
+    local refund_key = KEYS[i * 2]
+    local limit = tonumber(ARGV[i * 3 - 2])
+    local rejected = (redis.call('GET', counter_key) or 0) - (redis.call('GET', refund_key) or 0) + 1 > limit
+    if rejected then
+        failed = true
+        if ARGV[i * 3] == '1' then
+            enforced = true
+        end
+    end
+    results[i] = rejected
+end
+
+if not failed then
+    for i=1, quota_count do
+        redis.call('INCR', KEYS[i * 2 - 1])
+        redis.call('EXPIREAT', KEYS[i * 2 - 1], ARGV[i * 3 - 1])
+    end
+end
+
+local duplicate = 0
+if not enforced then
+    if not redis.call('SET', event_key, '1', 'EX', event_ttl, 'NX') then
+        duplicate = 1
+    end
+end
+results[quota_count + 1] = duplicate
+
+return results
@@ -0,0 +1,31 @@
+-- Removes up to `limit` members from the pending set, along with their
+-- buffered feature counts, timestamps and data, returning a table of
+-- `{member, counts, timestamps, data}` entries (where `counts`,
+-- `timestamps` and `data` are in the flattened `HGETALL` response format.)
+--
+-- KEYS[1]: pending set key
+-- ARGV[1]: key prefix
+-- ARGV[2]: limit
+
+local pending_key = KEYS[1]
+local prefix = ARGV[1]
+local limit = tonumber(ARGV[2])
+
+local members = redis.call('ZRANGE', pending_key, 0, limit - 1)
+
+local results = {}
+for _, member in ipairs(members) do
+    local counts_key = prefix .. ':c:' .. member
+    local timestamps_key = prefix .. ':t:' .. member
+    local data_key = prefix .. ':d:' .. member
+    table.insert(results, {
+        member,
+        redis.call('HGETALL', counts_key),
+        redis.call('HGETALL', timestamps_key),
+        redis.call('HGETALL', data_key),
+    })
+    redis.call('DEL', counts_key, timestamps_key, data_key)
+    redis.call('ZREM', pending_key, member)
+end
+
+return results
@@ -0,0 +1,56 @@
+-- Buffers the encoded features of an event, incrementing the count of the
+-- feature set for the interval that the event occurred in and marking the
+-- member as pending if it was not already. All of the keys are updated
+-- atomically, so that the buffer can't be popped between any of the writes.
+--
+-- The count, timestamp and data fields are set as follows:
+--
+--   counts[field] += 1
+--   timestamps[field] = max(timestamps[field], timestamp)
+--   data[digest] = data (if not already set)
+--
+-- where `field` identifies the feature set (by `digest`) within an interval.
+-- The member is added to the pending set with the timestamp of the first
+-- event buffered for it, so that the oldest members are flushed first.
+--
+-- KEYS[1]: pending set key
+-- KEYS[2]: counts hash key
+-- KEYS[3]: timestamps hash key
+-- KEYS[4]: data hash key
+-- ARGV[1]: member
+-- ARGV[2]: field
+-- ARGV[3]: digest
+-- ARGV[4]: data
+-- ARGV[5]: timestamp
+-- ARGV[6]: time-to-live (in seconds)
+--
+-- Returns the count of the feature set after it was incremented.
+
+local pending_key = KEYS[1]
+local counts_key = KEYS[2]
+local timestamps_key = KEYS[3]
+local data_key = KEYS[4]
+
+local member = ARGV[1]
+local field = ARGV[2]
+local digest = ARGV[3]
+local data = ARGV[4]
+local timestamp = tonumber(ARGV[5])
+local ttl = tonumber(ARGV[6])
+
+local count = redis.call('HINCRBY', counts_key, field, 1)
+local latest = tonumber(redis.call('HGET', timestamps_key, field))
+if latest == nil or timestamp > latest then
+    redis.call('HSET', timestamps_key, field, timestamp)
+end
+redis.call('HSETNX', data_key, digest, data)
+
+for _, key in ipairs({counts_key, timestamps_key, data_key}) do
+    redis.call('EXPIRE', key, ttl)
+end
+
+if not redis.call('ZSCORE', pending_key, member) then
+    redis.call('ZADD', pending_key, timestamp, member)
+end
+
+return count
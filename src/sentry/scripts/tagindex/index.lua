@@ -0,0 +1,203 @@
+--[[
+
+Maintains the tag index sets of a project (see ``sentry.tagindex.redis``.)
+
+The index sets are stored per generation. The live generation (if any) is
+stored at the ready key, and the generation that is being rebuilt (if any) at
+the rebuild key. Every change is applied to both of them, and since scripts
+are executed atomically, a change is either included in a rebuilt
+generation or applied to it before it is swapped into place.
+
+The keys of a generation are prefixed by ``{prefix}{generation}:``:
+
+- ``v:{key hash}:{value hash}``: groups which have seen the value for the key
+- ``a:{key hash}``: groups which have seen any value for the key
+- ``g:{group}``: every value and key set the group is a member of
+- ``k``: every key of the generation
+
+KEYS[1]: ready key
+KEYS[2]: rebuild key
+ARGV[1]: command
+ARGV[2]: key prefix
+ARGV[3...]: command arguments
+
+]]--
+
+local ready_key = KEYS[1]
+local rebuild_key = KEYS[2]
+local prefix = ARGV[2]
+
+local function get_generations()
+    local generations = {}
+    for _, generation in ipairs(redis.call('MGET', ready_key, rebuild_key)) do
+        if generation and generation ~= generations[1] then
+            table.insert(generations, generation)
+        end
+    end
+    return generations
+end
+
+local function value_key(generation, key_hash, value_hash)
+    return prefix .. generation .. ':v:' .. key_hash .. ':' .. value_hash
+end
+
+local function any_key(generation, key_hash)
+    return prefix .. generation .. ':a:' .. key_hash
+end
+
+local function group_key(generation, group_id)
+    return prefix .. generation .. ':g:' .. group_id
+end
+
+local function keys_key(generation)
+    return prefix .. generation .. ':k'
+end
+
+local function starts_with(value, start)
+    return string.sub(value, 1, string.len(start)) == start
+end
+
+local function remove_group(generation, group_id)
+    local key = group_key(generation, group_id)
+    for _, member in ipairs(redis.call('SMEMBERS', key)) do
+        redis.call('SREM', member, group_id)
+    end
+    redis.call('DEL', key)
+    redis.call('SREM', keys_key(generation), key)
+end
+
+local commands = {
+    -- ARGV: group id, followed by pairs of key and value hashes
+    ADD = function (arguments)
+        local group_id = arguments[1]
+        for _, generation in ipairs(get_generations()) do
+            local group = group_key(generation, group_id)
+            for i = 2, #arguments, 2 do
+                local value = value_key(generation, arguments[i], arguments[i + 1])
+                local any = any_key(generation, arguments[i])
+                redis.call('SADD', value, group_id)
+                redis.call('SADD', any, group_id)
+                redis.call('SADD', group, value, any)
+                redis.call('SADD', keys_key(generation), value, any, group)
+            end
+        end
+    end,
+    -- ARGV: group id, followed by pairs of key and value hashes
+    REMOVE = function (arguments)
+        local group_id = arguments[1]
+        for _, generation in ipairs(get_generations()) do
+            local group = group_key(generation, group_id)
+            local key_hashes = {}
+            for i = 2, #arguments, 2 do
+                local value = value_key(generation, arguments[i], arguments[i + 1])
+                redis.call('SREM', value, group_id)
+                redis.call('SREM', group, value)
+                key_hashes[arguments[i]] = true
+            end
+
+            -- The group is only removed from the sets of the keys it no
+            -- longer has any values for.
+            local remaining = {}
+            for _, member in ipairs(redis.call('SMEMBERS', group)) do
+                for key_hash in pairs(key_hashes) do
+                    if starts_with(member, prefix .. generation .. ':v:' .. key_hash .. ':') then
+                        remaining[key_hash] = true
+                    end
+                end
+            end
+            for key_hash in pairs(key_hashes) do
+                if not remaining[key_hash] then
+                    local any = any_key(generation, key_hash)
+                    redis.call('SREM', any, group_id)
+                    redis.call('SREM', group, any)
+                end
+            end
+
+            if redis.call('EXISTS', group) == 0 then
+                redis.call('SREM', keys_key(generation), group)
+            end
+        end
+    end,
+    -- ARGV: source group id, destination group id
+    MERGE = function (arguments)
+        local source_id, destination_id = arguments[1], arguments[2]
+        for _, generation in ipairs(get_generations()) do
+            local source = group_key(generation, source_id)
+            local destination = group_key(generation, destination_id)
+            for _, member in ipairs(redis.call('SMEMBERS', source)) do
+                -- Sets that no longer exist (e.g. of deleted tag keys) are
+                -- not recreated.
+                if redis.call('SREM', member, source_id) == 1 then
+                    redis.call('SADD', member, destination_id)
+                    redis.call('SADD', destination, member)
+                    redis.call('SADD', keys_key(generation), destination)
+                end
+            end
+            redis.call('DEL', source)
+            redis.call('SREM', keys_key(generation), source)
+        end
+    end,
+    -- ARGV: group ids
+    DELETE_GROUPS = function (arguments)
+        for _, generation in ipairs(get_generations()) do
+            for _, group_id in ipairs(arguments) do
+                remove_group(generation, group_id)
+            end
+        end
+    end,
+    -- ARGV: maximum number of results, followed by key suffixes (``v:...``
+    -- or ``a:...``) to intersect
+    --
+    -- Returns nil if there is no live generation, the number of results if
+    -- it exceeds the maximum, or the group ids otherwise.
+    QUERY = function (arguments)
+        local generation = redis.call('GET', ready_key)
+        if not generation then
+            return nil
+        end
+
+        local limit = tonumber(arguments[1])
+        local keys = {}
+        for i = 2, #arguments do
+            table.insert(keys, prefix .. generation .. ':' .. arguments[i])
+        end
+
+        -- The intersection is stored so that it is not copied into the
+        -- script unless it is small enough to return.
+        local result_key = prefix .. 'q'
+        local count = redis.call('SINTERSTORE', result_key, unpack(keys))
+        if count > limit then
+            redis.call('DEL', result_key)
+            return count
+        end
+
+        local group_ids = redis.call('SMEMBERS', result_key)
+        redis.call('DEL', result_key)
+        return group_ids
+    end,
+    -- ARGV: rebuilt generation
+    --
+    -- Makes the generation live if it is still the one being rebuilt,
+    -- returning the previous live generation (or 0), or -1 otherwise.
+    SWAP = function (arguments)
+        local generation = arguments[1]
+        if redis.call('GET', rebuild_key) ~= generation then
+            return -1
+        end
+
+        local previous = redis.call('GET', ready_key)
+        redis.call('SET', ready_key, generation)
+        redis.call('DEL', rebuild_key)
+        return tonumber(previous) or 0
+    end,
+}
+
+local command = commands[ARGV[1]]
+assert(command ~= nil, 'unknown command')
+
+local arguments = {}
+for i = 3, #ARGV do
+    table.insert(arguments, ARGV[i])
+end
+
+return command(arguments)
@@ -11,7 +11,7 @@ from __future__ import absolute_import
 from django.db import router
 from django.db.models import Q
 
-from sentry import tagstore
+from sentry import tagindex, tagstore
 from sentry.api.paginator import DateTimePaginator, Paginator
 from sentry.search.base import EMPTY, SearchBackend
 from sentry.search.django.constants import (
@@ -115,7 +115,9 @@ class DjangoSearchBackend(SearchBackend):
             )
 
         if tags:
-            matches = tagstore.get_tags_for_search_filter(project.id, tags)
+            matches = tagindex.get_group_ids(project.id, tags)
+            if matches is None:
+                matches = tagstore.get_tags_for_search_filter(project.id, tags)
             if not matches:
                 return queryset.none()
             queryset = queryset.filter(
@@ -5,10 +5,11 @@ import logging
 
 from django.conf import settings
 
-from sentry.interfaces.stacktrace import Frame
+from sentry.interfaces.stacktrace import FrameMixin
 from sentry.similarity.backends.dummy import DummyIndexBackend
 from sentry.similarity.backends.metrics import MetricsWrapper
 from sentry.similarity.backends.redis import RedisScriptMinHashIndexBackend
+from sentry.similarity.buffer import FeatureRecordBuffer, ImmediateRecordBuffer
 from sentry.similarity.encoder import Encoder
 from sentry.similarity.features import (
     ExceptionFeature,
@@ -19,7 +20,7 @@ from sentry.similarity.features import (
 )
 from sentry.similarity.signatures import MinHashSignatureBuilder
 from sentry.utils import redis
-from sentry.utils.datastructures import BidirectionalMapping
+from sentry.utils.datastructures import BidirectionalMapping, LRUCache
 from sentry.utils.iterators import shingle
 
 logger = logging.getLogger(__name__)
@@ -62,17 +63,23 @@ def get_frame_attributes(frame):
     return attributes
 
 
+def _get_cluster():
+    cluster_id = getattr(
+        settings,
+        'SENTRY_SIMILARITY_INDEX_REDIS_CLUSTER',
+        'similarity',
+    )
+
+    try:
+        return redis.redis_clusters.get(cluster_id)
+    except KeyError:
+        return None
+
+
 def _make_index_backend(cluster=None):
     if not cluster:
-        cluster_id = getattr(
-            settings,
-            'SENTRY_SIMILARITY_INDEX_REDIS_CLUSTER',
-            'similarity',
-        )
-
-        try:
-            cluster = redis.redis_clusters.get(cluster_id)
-        except KeyError:
+        cluster = _get_cluster()
+        if cluster is None:
             index = DummyIndexBackend()
             logger.info('No redis cluster provided for similarity, using {!r}.'.format(index))
             return index
@@ -86,6 +93,9 @@ def _make_index_backend(cluster=None):
             60 * 60 * 24 * 30,
             3,
             5000,
+            # Signatures are a fixed number of integers, so the number of
+            # entries is enough to bound the memory used.
+            signature_cache=LRUCache(10000),
         ),
         scope_tag_name='project_id',
     )
@@ -94,7 +104,7 @@ def _make_index_backend(cluster=None):
 features = FeatureSet(
     _make_index_backend(),
     Encoder({
-        Frame: get_frame_attributes,
+        FrameMixin: get_frame_attributes,
     }),
     BidirectionalMapping({
         'exception:message:character-shingles': 'a',
@@ -115,7 +125,7 @@ features = FeatureSet(
         'exception:stacktrace:pairs': ExceptionFeature(
             lambda exception: shingle(
                 2,
-                exception.stacktrace.frames,
+                exception.stacktrace.get_compact().frames,
             ),
         ),
         'message:message:character-shingles': MessageFeature(
@@ -131,4 +141,21 @@ features = FeatureSet(
     expected_encoding_errors=(
         FrameEncodingError,
     ),
+    cache=LRUCache(
+        10000,
+        max_size=16 * 1024 * 1024,
+        sizeof=lambda features: sum(map(len, features)),
+    ),
 )
+
+
+def _make_record_buffer(features, cluster=None):
+    if not cluster:
+        cluster = _get_cluster()
+        if cluster is None:
+            return ImmediateRecordBuffer(features)
+
+    return FeatureRecordBuffer(features, cluster)
+
+
+record_buffer = _make_record_buffer(features)
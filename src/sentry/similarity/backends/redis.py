@@ -4,6 +4,8 @@ import itertools
 import time
 
 from sentry.similarity.backends.abstract import AbstractIndexBackend
+from sentry.utils import metrics
+from sentry.utils.hashlib import hash_values
 from sentry.utils.iterators import chunked
 from sentry.utils.redis import load_script
 
@@ -22,7 +24,7 @@ def flatten(value):
 
 class RedisScriptMinHashIndexBackend(AbstractIndexBackend):
     def __init__(self, cluster, namespace, signature_builder,
-                 bands, interval, retention, candidate_set_limit):
+                 bands, interval, retention, candidate_set_limit, signature_cache=None):
         self.cluster = cluster
         self.namespace = namespace
         self.signature_builder = signature_builder
@@ -30,14 +32,33 @@ class RedisScriptMinHashIndexBackend(AbstractIndexBackend):
         self.interval = interval
         self.retention = retention
         self.candidate_set_limit = candidate_set_limit
+        # An optional ``LRUCache`` of signatures, keyed by a digest of the
+        # features they were built from.
+        self.signature_cache = signature_cache
+
+    def _get_signature(self, features):
+        if self.signature_cache is None:
+            return self.signature_builder(features)
+
+        key = hash_values(features)
+        signature = self.signature_cache.get(key)
+        metrics.incr(
+            'similarity.signature_cache',
+            tags={'result': 'miss' if signature is None else 'hit'},
+            skip_internal=True,
+        )
+        if signature is None:
+            signature = tuple(self.signature_builder(features))
+            self.signature_cache.set(key, signature)
+        return signature
 
-    def _build_signature_arguments(self, features):
+    def _build_signature_arguments(self, features, count=1):
         if not features:
             return [0] * self.bands
 
         arguments = []
-        for bucket in band(self.bands, self.signature_builder(features)):
-            arguments.extend([1, ','.join(map('{}'.format, bucket)), 1])
+        for bucket in band(self.bands, self._get_signature(features)):
+            arguments.extend([1, ','.join(map('{}'.format, bucket)), count])
         return arguments
 
     def __index(self, scope, args):
@@ -145,9 +166,11 @@ class RedisScriptMinHashIndexBackend(AbstractIndexBackend):
             key,
         ]
 
-        for idx, features in items:
-            arguments.append(idx)
-            arguments.extend(self._build_signature_arguments(features))
+        # Items may optionally include the number of times the features were
+        # seen, which is used to weight the recorded frequencies.
+        for item in items:
+            arguments.append(item[0])
+            arguments.extend(self._build_signature_arguments(*item[1:]))
 
         return self.__index(scope, arguments)
 
@@ -0,0 +1,191 @@
+from __future__ import absolute_import
+
+import logging
+
+from sentry.utils import metrics
+from sentry.utils.compat import pickle
+from sentry.utils.dates import to_timestamp
+from sentry.utils.hashlib import md5_text
+from sentry.utils.redis import load_script
+
+logger = logging.getLogger('sentry.similarity')
+
+push = load_script('similarity/buffer_push.lua')
+pop = load_script('similarity/buffer_pop.lua')
+
+
+def pairs(values):
+    return dict(zip(values[::2], values[1::2]))
+
+
+class FeatureRecordBuffer(object):
+    """
+    Collects the encoded features of events in Redis so that they can be
+    recorded in the similarity index in periodic batches, rather than once
+    per event.
+
+    Events are buffered per (scope, key) -- i.e. per (project, group) -- and
+    identical feature sets are stored once along with the number of times
+    they were seen in each index interval, since most events within a group
+    share the same stack traces and messages. Flushing records every
+    distinct feature set with its count in the interval its events occurred
+    in, at the timestamp of the latest event buffered in that interval. This
+    results in the same frequencies as recording each event individually.
+    (Only the expiration of the frequencies may differ, if events were not
+    buffered in the order that they occurred.)
+
+    .. code::
+
+        redis:6379> ZRANGE "{sim:b}:p" 0 -1 WITHSCORES
+        1) "1:1"
+        2) "1444847625"
+
+        redis:6379> HGETALL "{sim:b}:c:1:1"
+        1) "5c5b1e4e7c1ef5f5d1c9dbd0e2d23a5c:557"
+        2) "42"
+
+        redis:6379> HGETALL "{sim:b}:t:1:1"
+        1) "5c5b1e4e7c1ef5f5d1c9dbd0e2d23a5c:557"
+        2) "1444847658"
+
+    All of the keys share the namespace as a hash tag, so that they are
+    stored together and can be updated, read and cleared atomically by a
+    script.
+
+    """
+
+    def __init__(self, features, cluster, namespace='sim:b', batch_size=100, ttl=60 * 60,
+                 interval=None):
+        self.features = features
+        self.cluster = cluster
+        self.prefix = '{%s}' % (namespace, )
+        self.batch_size = batch_size
+
+        # Sets the time-to-live (in seconds) for buffered features. This only
+        # serves to avoid leaking memory if the buffer isn't being flushed.
+        self.ttl = ttl
+
+        # The interval (in seconds) that the index buckets frequencies by,
+        # which defaults to the interval of the feature set's index.
+        self.interval = interval if interval is not None else features.index.interval
+
+    def _get_pending_key(self):
+        return '{}:p'.format(self.prefix)
+
+    def _get_counts_key(self, member):
+        return '{}:c:{}'.format(self.prefix, member)
+
+    def _get_timestamps_key(self, member):
+        return '{}:t:{}'.format(self.prefix, member)
+
+    def _get_data_key(self, member):
+        return '{}:d:{}'.format(self.prefix, member)
+
+    def add(self, event):
+        items = self.features.encode(event)
+        if not items:
+            return
+
+        scope, key = self.features.get_record_key(event)
+        member = '{}:{}'.format(scope, key)
+        data = pickle.dumps(sorted(items), protocol=2)
+        digest = md5_text(data).hexdigest()
+        timestamp = int(to_timestamp(event.datetime))
+
+        count = push(
+            self.cluster,
+            [
+                self._get_pending_key(),
+                self._get_counts_key(member),
+                self._get_timestamps_key(member),
+                self._get_data_key(member),
+            ],
+            [
+                member,
+                '{}:{}'.format(digest, timestamp // self.interval),
+                digest,
+                data,
+                timestamp,
+                self.ttl,
+            ],
+        )
+
+        metrics.incr(
+            'similarity.buffer.add',
+            tags={'duplicate': 'true' if count > 1 else 'false'},
+            skip_internal=True,
+        )
+
+    def flush(self):
+        """
+        Records all of the buffered features in the index, returning the
+        number of (scope, key) pairs that were flushed.
+        """
+        pending_key = self._get_pending_key()
+
+        metrics.timing('similarity.buffer.pending', self.cluster.zcard(pending_key))
+
+        flushed = 0
+        while True:
+            entries = pop(self.cluster, [pending_key], [self.prefix, self.batch_size])
+            for member, counts, timestamps, data in entries:
+                self._record(member, pairs(counts), pairs(timestamps), pairs(data))
+
+            flushed += len(entries)
+            if len(entries) < self.batch_size:
+                break
+
+        return flushed
+
+    def _record(self, member, counts, timestamps, data):
+        scope, key = member.split(':', 1)
+
+        # Feature sets are recorded together per interval, at the timestamp
+        # of the latest event that was buffered in that interval.
+        intervals = {}
+        events = 0
+        for field, count in counts.items():
+            digest, interval = field.rsplit(':', 1)
+            if digest not in data or field not in timestamps:
+                continue
+
+            count = int(count)
+            events += count
+            entry = intervals.setdefault(int(interval), [0, []])
+            entry[0] = max(entry[0], int(timestamps[field]))
+            for label, features in pickle.loads(data[digest]):
+                entry[1].append((label, features, count))
+
+        if not intervals:
+            return
+
+        # The ratio of events to distinct feature sets that were recorded.
+        metrics.timing('similarity.buffer.dedupe_ratio', events / float(len(counts)))
+
+        for interval in sorted(intervals):
+            timestamp, items = intervals[interval]
+            try:
+                self.features.record_encoded(scope, key, items, timestamp=timestamp)
+            except Exception as error:
+                logger.warning(
+                    'Could not record buffered features for %r due to error: %r',
+                    member,
+                    error,
+                    exc_info=True,
+                )
+
+
+class ImmediateRecordBuffer(object):
+    """
+    Records features as soon as they are added, for use when no Redis
+    cluster is configured for the similarity index.
+    """
+
+    def __init__(self, features):
+        self.features = features
+
+    def add(self, event):
+        self.features.record([event])
+
+    def flush(self):
+        return 0
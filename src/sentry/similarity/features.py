@@ -4,7 +4,9 @@ import functools
 import itertools
 import logging
 
+from sentry.utils import metrics
 from sentry.utils.dates import to_timestamp
+from sentry.utils.hashlib import hash_values
 
 logger = logging.getLogger('sentry.similarity')
 
@@ -20,7 +22,7 @@ def get_application_chunks(exception):
         itertools.ifilter(
             lambda in_app__frames: in_app__frames[0],
             itertools.groupby(
-                exception.stacktrace.frames,
+                exception.stacktrace.get_compact().frames,
                 key=lambda frame: frame.in_app,
             )
         )
@@ -31,34 +33,73 @@ class InterfaceDoesNotExist(KeyError):
     pass
 
 
+def get_frame_values(frame):
+    # Everything that the feature functions and frame encoder may read from a
+    # frame (see ``get_frame_attributes``.)
+    return itertools.chain(
+        (
+            frame.function,
+            frame.module,
+            frame.filename,
+            frame.in_app,
+            frame.context_line,
+        ),
+        (frame.pre_context or [])[-5:],
+        ['|'],
+        (frame.post_context or [])[:5],
+        ['|'],
+    )
+
+
 class ExceptionFeature(object):
     def __init__(self, function):
         self.function = function
 
-    def extract(self, event):
+    def __get_interface(self, event):
         try:
             interface = event.interfaces['sentry.interfaces.Exception']
         except KeyError:
             raise InterfaceDoesNotExist()
-        return self.function(interface.values[0])
+        return interface.values[0]
+
+    def extract(self, event):
+        return self.function(self.__get_interface(event))
+
+    def get_cache_key(self, event):
+        """
+        Returns a digest of the parts of the exception that features are
+        extracted from, so that events with identical exceptions can share
+        the same extracted features.
+        """
+        exception = self.__get_interface(event)
+        values = [exception.type, exception.value]
+        if exception.stacktrace is not None:
+            for frame in exception.stacktrace.get_compact().frames:
+                values.extend(get_frame_values(frame))
+        return hash_values(values)
 
 
 class MessageFeature(object):
     def __init__(self, function):
         self.function = function
 
-    def extract(self, event):
+    def __get_interface(self, event):
         try:
-            interface = event.interfaces['sentry.interfaces.Message']
+            return event.interfaces['sentry.interfaces.Message']
         except KeyError:
             raise InterfaceDoesNotExist()
-        return self.function(interface)
+
+    def extract(self, event):
+        return self.function(self.__get_interface(event))
+
+    def get_cache_key(self, event):
+        return hash_values([self.__get_interface(event).message])
 
 
 class FeatureSet(object):
     def __init__(
         self, index, encoder, aliases, features, expected_extraction_errors,
-        expected_encoding_errors
+        expected_encoding_errors, cache=None
     ):
         self.index = index
         self.encoder = encoder
@@ -66,6 +107,9 @@ class FeatureSet(object):
         self.features = features
         self.expected_extraction_errors = expected_extraction_errors
         self.expected_encoding_errors = expected_encoding_errors
+        # An optional ``LRUCache`` of encoded features, keyed by the digest
+        # returned by each feature's ``get_cache_key``.
+        self.cache = cache
         assert set(self.aliases) == set(self.features)
 
     def __get_scope(self, project):
@@ -74,25 +118,97 @@ class FeatureSet(object):
     def __get_key(self, group):
         return '{}'.format(group.id)
 
+    def __extract(self, label, strategy, event):
+        try:
+            return strategy.extract(event)
+        except Exception as error:
+            log = (
+                logger.debug if isinstance(error, self.expected_extraction_errors) else
+                functools.partial(logger.warning, exc_info=True)
+            )
+            log(
+                'Could not extract features from %r for %r due to error: %r',
+                event,
+                label,
+                error,
+                exc_info=True,
+            )
+
+    def __encode(self, label, strategy, event):
+        features = self.__extract(label, strategy, event)
+        if features is None:
+            return []
+
+        try:
+            return map(self.encoder.dumps, features)
+        except Exception as error:
+            log = (
+                logger.debug if isinstance(error, self.expected_encoding_errors) else
+                functools.partial(logger.warning, exc_info=True)
+            )
+            log(
+                'Could not encode features from %r for %r due to error: %r',
+                event,
+                label,
+                error,
+            )
+            return []
+
+    def __get_cache_key(self, label, strategy, event):
+        if self.cache is None or not hasattr(strategy, 'get_cache_key'):
+            return None
+
+        try:
+            return (label, strategy.get_cache_key(event))
+        except Exception:
+            # Missing interfaces (and anything else) will be reported by
+            # extraction if necessary.
+            return None
+
     def extract(self, event):
         results = {}
         for label, strategy in self.features.items():
-            try:
-                results[label] = strategy.extract(event)
-            except Exception as error:
-                log = (
-                    logger.debug if isinstance(error, self.expected_extraction_errors) else
-                    functools.partial(logger.warning, exc_info=True)
-                )
-                log(
-                    'Could not extract features from %r for %r due to error: %r',
-                    event,
-                    label,
-                    error,
-                    exc_info=True,
+            features = self.__extract(label, strategy, event)
+            if features is not None:
+                results[label] = features
+        return results
+
+    def encode(self, event):
+        """
+        Extracts and encodes the features of an event, returning a list of
+        ``(label, features)`` pairs for the features that could be encoded.
+
+        Since extraction is deterministic, the encoded features (including
+        the lack of any, if they could not be extracted or encoded) are
+        cached for events with the same cache key when a cache is configured.
+        """
+        results = []
+        for label, strategy in self.features.items():
+            cache_key = self.__get_cache_key(label, strategy, event)
+            features = self.cache.get(cache_key) if cache_key is not None else None
+            if cache_key is not None:
+                metrics.incr(
+                    'similarity.feature_cache',
+                    tags={'result': 'miss' if features is None else 'hit'},
+                    skip_internal=True,
                 )
+
+            if features is None:
+                features = self.__encode(label, strategy, event)
+                if cache_key is not None:
+                    self.cache.set(cache_key, features)
+
+            if features:
+                results.append((label, features))
         return results
 
+    def get_record_key(self, event):
+        """
+        Returns the ``(scope, key)`` pair that the features of an event are
+        recorded under.
+        """
+        return self.__get_scope(event.project), self.__get_key(event.group)
+
     def record(self, events):
         if not events:
             return []
@@ -102,7 +218,7 @@ class FeatureSet(object):
 
         items = []
         for event in events:
-            for label, features in self.extract(event).items():
+            for label, features in self.encode(event):
                 if scope is None:
                     scope = self.__get_scope(event.project)
                 else:
@@ -117,22 +233,7 @@ class FeatureSet(object):
                         event.group
                     ) == key, 'all events must be associated with the same group'
 
-                try:
-                    features = map(self.encoder.dumps, features)
-                except Exception as error:
-                    log = (
-                        logger.debug if isinstance(error, self.expected_encoding_errors) else
-                        functools.partial(logger.warning, exc_info=True)
-                    )
-                    log(
-                        'Could not encode features from %r for %r due to error: %r',
-                        event,
-                        label,
-                        error,
-                    )
-                else:
-                    if features:
-                        items.append((self.aliases[label], features, ))
+                items.append((self.aliases[label], features, ))
 
         return self.index.record(
             scope,
@@ -141,6 +242,19 @@ class FeatureSet(object):
             timestamp=int(to_timestamp(event.datetime)),
         )
 
+    def record_encoded(self, scope, key, items, timestamp=None):
+        """
+        Records previously encoded features. ``items`` is a sequence of
+        ``(label, features, count)`` tuples, where ``count`` is the number of
+        times that the features were seen.
+        """
+        return self.index.record(
+            scope,
+            key,
+            [(self.aliases[label], features, count) for label, features, count in items],
+            timestamp=timestamp,
+        )
+
     def classify(self, events, limit=None, thresholds=None):
         if not events:
             return []
@@ -153,7 +267,7 @@ class FeatureSet(object):
         labels = []
         items = []
         for event in events:
-            for label, features in self.extract(event).items():
+            for label, features in self.encode(event):
                 if scope is None:
                     scope = self.__get_scope(event.project)
                 else:
@@ -161,23 +275,8 @@ class FeatureSet(object):
                         event.project
                     ) == scope, 'all events must be associated with the same project'
 
-                try:
-                    features = map(self.encoder.dumps, features)
-                except Exception as error:
-                    log = (
-                        logger.debug if isinstance(error, self.expected_encoding_errors) else
-                        functools.partial(logger.warning, exc_info=True)
-                    )
-                    log(
-                        'Could not encode features from %r for %r due to error: %r',
-                        event,
-                        label,
-                        error,
-                    )
-                else:
-                    if features:
-                        items.append((self.aliases[label], thresholds.get(label, 0), features))
-                        labels.append(label)
+                items.append((self.aliases[label], thresholds.get(label, 0), features))
+                labels.append(label)
 
         return map(
             lambda key__scores: (
@@ -0,0 +1,12 @@
+from __future__ import absolute_import
+
+from django.conf import settings
+
+from sentry.utils.services import LazyServiceWrapper
+
+from .base import TagIndex  # NOQA
+
+backend = LazyServiceWrapper(
+    TagIndex, settings.SENTRY_TAGINDEX, settings.SENTRY_TAGINDEX_OPTIONS
+)
+backend.expose(locals())
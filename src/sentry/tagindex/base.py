@@ -0,0 +1,98 @@
+"""
+sentry.tagindex.base
+~~~~~~~~~~~~~~~~~~~~
+
+:copyright: (c) 2010-2017 by the Sentry Team, see AUTHORS for more details.
+:license: BSD, see LICENSE for more details.
+"""
+
+from __future__ import absolute_import
+
+from sentry.utils.services import Service
+
+
+class TagIndex(Service):
+    """
+    A tag index maintains an inverted index of ``(project, key, value)`` to
+    the set of groups which have seen that tag, so that issue search can
+    resolve any number of tag filters with an exact set intersection instead
+    of successive ``GroupTagValue`` queries.
+
+    The default implementation does not index anything. ``get_group_ids``
+    returns ``None`` when the index cannot answer a query, in which case the
+    caller should fall back to ``tagstore.get_tags_for_search_filter``.
+    """
+    __all__ = (
+        'index_group_tags', 'remove_group_tags', 'get_group_ids', 'merge_groups',
+        'delete_groups', 'delete_tag_key', 'rebuild', 'invalidate', 'delete_project',
+    )
+
+    def index_group_tags(self, project_id, group_id, tags):
+        """
+        Record that the group has seen each ``(key, value)`` pair in ``tags``.
+
+        >>> index_group_tags(1, 2, [('environment', 'production')])
+        """
+
+    def remove_group_tags(self, project_id, group_id, tags):
+        """
+        Record that the group no longer has each ``(key, value)`` pair in
+        ``tags``, e.g. because its ``GroupTagValue`` rows were removed.
+
+        >>> remove_group_tags(1, 2, [('environment', 'production')])
+        """
+
+    def get_group_ids(self, project_id, tags):
+        """
+        Return the set of group IDs matching every tag filter in ``tags``, a
+        mapping of key to either a value or ``ANY``, or ``None`` if the index
+        is unable to answer the query (e.g. if it is incomplete, or too many
+        groups match to filter by them.)
+
+        >>> get_group_ids(1, {'environment': 'production', 'browser': ANY})
+        """
+        return None
+
+    def merge_groups(self, project_id, from_group_id, to_group_id):
+        """
+        Move every tag of the group ``from_group_id`` to ``to_group_id``.
+
+        >>> merge_groups(1, 2, 3)
+        """
+
+    def delete_groups(self, project_id, group_ids):
+        """
+        Remove the groups from the index.
+
+        >>> delete_groups(1, [2, 3])
+        """
+
+    def delete_tag_key(self, project_id, key):
+        """
+        Remove every value of the tag key from the index.
+
+        >>> delete_tag_key(1, 'environment')
+        """
+
+    def rebuild(self, project_id, generation=None):
+        """
+        Rebuild the index for the project from the tag store. ``generation``
+        identifies a rebuild that was scheduled by the backend itself.
+
+        >>> rebuild(1)
+        """
+
+    def invalidate(self, project_id):
+        """
+        Stop answering queries for the project until the index has been
+        rebuilt.
+
+        >>> invalidate(1)
+        """
+
+    def delete_project(self, project_id):
+        """
+        Remove all index data for the project.
+
+        >>> delete_project(1)
+        """
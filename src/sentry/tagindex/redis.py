@@ -0,0 +1,307 @@
+"""
+sentry.tagindex.redis
+~~~~~~~~~~~~~~~~~~~~~
+
+:copyright: (c) 2010-2017 by the Sentry Team, see AUTHORS for more details.
+:license: BSD, see LICENSE for more details.
+"""
+
+from __future__ import absolute_import
+
+import logging
+import six
+
+from sentry.exceptions import InvalidConfiguration
+from sentry.tagindex.base import TagIndex
+from sentry.utils import metrics
+from sentry.utils.hashlib import md5_text
+from sentry.utils.iterators import chunked
+from sentry.utils.redis import get_cluster_from_options, load_script
+
+logger = logging.getLogger(__name__)
+
+index = load_script('tagindex/index.lua')
+
+
+class RedisTagIndex(TagIndex):
+    """
+    Stores the tag index as Redis sets of group IDs.
+
+    All keys for a project are routed to the same host so that tag filters
+    can be intersected server-side with a single ``SINTERSTORE``. Small sets
+    of integers are stored using Redis' compact ``intset`` encoding.
+
+    The sets are stored per generation, so that a rebuilt index can replace
+    the previous one at once. Keys have the following structure:
+
+    - ``ti:{project}:{generation}:v:{key hash}:{value hash}``: groups which
+      have seen the value for the key
+    - ``ti:{project}:{generation}:a:{key hash}``: groups which have seen any
+      value for the key
+    - ``ti:{project}:{generation}:g:{group}``: every value and key set the
+      group is a member of, used for merging and removing groups
+    - ``ti:{project}:{generation}:k``: every key of the generation, used for
+      deletion
+    - ``ti:r:{project}``: the generation that answers queries, which is
+      present if the index is complete for the project
+    - ``ti:b:{project}``: the generation that is being rebuilt, if any
+    - ``ti:n:{project}``: the last generation that was started
+    - ``ti:s:{project}``: the generations that may have keys, used to remove
+      them once they have been replaced
+
+    Changes are applied to both the live generation and the one being
+    rebuilt by a script (``scripts/tagindex/index.lua``), so that none of
+    them are lost when the rebuilt generation is swapped into place.
+
+    Queries for a project are only answered by the index once it has been
+    built from the tag store with ``rebuild``, and the first query before
+    then schedules the rebuild. Queries which match more than
+    ``max_results`` groups aren't answered either, since the results would
+    be too large to filter by in the database.
+    """
+
+    def __init__(self, rebuild_batch_size=1000, rebuild_timeout=60 * 60, rebuild_delay=60,
+                 max_results=10000, **options):
+        self.cluster, options = get_cluster_from_options('SENTRY_TAGINDEX_OPTIONS', options)
+        self.rebuild_batch_size = rebuild_batch_size
+        self.rebuild_timeout = rebuild_timeout
+        # Changes are recorded in a generation as soon as its rebuild is
+        # scheduled, but the tag store buffers its writes. Waiting before
+        # reading the tag store lets the changes made before then reach it.
+        self.rebuild_delay = rebuild_delay
+        self.max_results = max_results
+
+    def validate(self):
+        try:
+            with self.cluster.all() as client:
+                client.ping()
+        except Exception as e:
+            raise InvalidConfiguration(six.text_type(e))
+
+    def _get_client(self, project_id):
+        return self.cluster.get_local_client_for_key(self._make_ready_key(project_id))
+
+    def _make_prefix(self, project_id):
+        return 'ti:%s:' % (project_id, )
+
+    def _make_generation_prefix(self, project_id, generation):
+        return 'ti:%s:%s:' % (project_id, generation)
+
+    def _make_ready_key(self, project_id):
+        return 'ti:r:%s' % (project_id, )
+
+    def _make_rebuild_key(self, project_id):
+        return 'ti:b:%s' % (project_id, )
+
+    def _make_generation_key(self, project_id):
+        return 'ti:n:%s' % (project_id, )
+
+    def _make_generations_key(self, project_id):
+        return 'ti:s:%s' % (project_id, )
+
+    def _hash(self, value):
+        return md5_text(value).hexdigest()
+
+    def _get_tag_arguments(self, tags):
+        arguments = []
+        for key, value in tags:
+            arguments.extend([self._hash(key), self._hash(value)])
+        return arguments
+
+    def _call(self, client, project_id, command, arguments):
+        return index(
+            client,
+            [self._make_ready_key(project_id), self._make_rebuild_key(project_id)],
+            [command, self._make_prefix(project_id)] + list(arguments),
+        )
+
+    def index_group_tags(self, project_id, group_id, tags):
+        if not tags:
+            return
+
+        self._call(
+            self._get_client(project_id),
+            project_id,
+            'ADD',
+            [group_id] + self._get_tag_arguments(tags),
+        )
+
+    def remove_group_tags(self, project_id, group_id, tags):
+        if not tags:
+            return
+
+        self._call(
+            self._get_client(project_id),
+            project_id,
+            'REMOVE',
+            [group_id] + self._get_tag_arguments(tags),
+        )
+
+    def get_group_ids(self, project_id, tags):
+        from sentry.search.base import ANY, EMPTY
+
+        keys = []
+        for key, value in six.iteritems(tags):
+            if value is EMPTY:
+                return set()
+            elif value == ANY:
+                keys.append('a:%s' % (self._hash(key), ))
+            else:
+                keys.append('v:%s:%s' % (self._hash(key), self._hash(value)))
+
+        client = self._get_client(project_id)
+        result = self._call(client, project_id, 'QUERY', [self.max_results] + keys)
+
+        if result is None:
+            metrics.incr('tagindex.query', tags={'result': 'not-ready'})
+            self._schedule_rebuild(client, project_id)
+            return None
+
+        if isinstance(result, six.integer_types):
+            metrics.incr('tagindex.query', tags={'result': 'too-many'})
+            return None
+
+        metrics.incr('tagindex.query', tags={'result': 'hit'})
+        metrics.timing('tagindex.query.size', len(result))
+        return set(int(group_id) for group_id in result)
+
+    def _start_rebuild(self, client, project_id, nx=False):
+        """
+        Starts recording changes in a new generation, returning it, or
+        ``None`` if another generation is already being rebuilt and ``nx``
+        is set.
+        """
+        generation = client.incr(self._make_generation_key(project_id))
+        if not client.set(self._make_rebuild_key(project_id), generation,
+                          nx=nx, ex=self.rebuild_timeout):
+            return None
+        client.sadd(self._make_generations_key(project_id), generation)
+        return generation
+
+    def _schedule_rebuild(self, client, project_id):
+        from sentry.tasks.tagindex import rebuild_tag_index
+
+        generation = self._start_rebuild(client, project_id, nx=True)
+        if generation is not None:
+            rebuild_tag_index.apply_async(
+                kwargs={
+                    'project_id': project_id,
+                    'generation': generation,
+                },
+                countdown=self.rebuild_delay,
+            )
+
+    def merge_groups(self, project_id, from_group_id, to_group_id):
+        self._call(
+            self._get_client(project_id),
+            project_id,
+            'MERGE',
+            [from_group_id, to_group_id],
+        )
+
+    def delete_groups(self, project_id, group_ids):
+        client = self._get_client(project_id)
+        for batch in chunked(group_ids, 100):
+            self._call(client, project_id, 'DELETE_GROUPS', batch)
+
+    def _get_generations(self, client, project_id):
+        return set(
+            generation for generation in client.mget(
+                self._make_ready_key(project_id),
+                self._make_rebuild_key(project_id),
+            ) if generation is not None
+        )
+
+    def delete_tag_key(self, project_id, key):
+        client = self._get_client(project_id)
+        for generation in self._get_generations(client, project_id):
+            prefix = self._make_generation_prefix(project_id, generation)
+            keys_key = prefix + 'k'
+            keys = list(client.sscan_iter(
+                keys_key,
+                match='%sv:%s:*' % (prefix, self._hash(key)),
+            ))
+            keys.append('%sa:%s' % (prefix, self._hash(key)))
+            for batch in chunked(keys, 1000):
+                client.delete(*batch)
+                client.srem(keys_key, *batch)
+
+    def _delete_generation(self, client, project_id, generation):
+        keys_key = self._make_generation_prefix(project_id, generation) + 'k'
+        for keys in chunked(client.sscan_iter(keys_key), 1000):
+            client.delete(*keys)
+        client.delete(keys_key)
+        client.srem(self._make_generations_key(project_id), generation)
+
+    def _add_to_pipeline(self, pipe, prefix, group_id, tags):
+        keys_key = prefix + 'k'
+        group_key = '%sg:%s' % (prefix, group_id)
+        for key, value in tags:
+            value_key = '%sv:%s:%s' % (prefix, self._hash(key), self._hash(value))
+            any_key = '%sa:%s' % (prefix, self._hash(key))
+            pipe.sadd(value_key, group_id)
+            pipe.sadd(any_key, group_id)
+            pipe.sadd(group_key, value_key, any_key)
+            pipe.sadd(keys_key, value_key, any_key, group_key)
+
+    def rebuild(self, project_id, generation=None):
+        from sentry.tagstore.models import GroupTagValue
+        from sentry.utils.query import RangeQuerySetWrapper
+
+        client = self._get_client(project_id)
+        rebuild_key = self._make_rebuild_key(project_id)
+
+        if generation is None:
+            generation = self._start_rebuild(client, project_id)
+        elif client.get(rebuild_key) != six.binary_type(generation):
+            logger.info('tagindex.rebuild.superseded', extra={
+                'project_id': project_id,
+                'generation': generation,
+            })
+            return
+
+        prefix = self._make_generation_prefix(project_id, generation)
+        queryset = GroupTagValue.objects.filter(project_id=project_id)
+        rows = 0
+        for batch in chunked(RangeQuerySetWrapper(queryset, step=self.rebuild_batch_size),
+                             self.rebuild_batch_size):
+            pipe = client.pipeline(transaction=False)
+            for gtv in batch:
+                self._add_to_pipeline(pipe, prefix, gtv.group_id, [(gtv.key, gtv.value)])
+            pipe.expire(rebuild_key, self.rebuild_timeout)
+            pipe.execute()
+            rows += len(batch)
+
+        # The generation only replaces the live one if no other rebuild has
+        # been started since (or the project has been deleted.)
+        if self._call(client, project_id, 'SWAP', [generation]) == -1:
+            logger.info('tagindex.rebuild.superseded', extra={
+                'project_id': project_id,
+                'generation': generation,
+            })
+            self._delete_generation(client, project_id, generation)
+            return
+
+        current = self._get_generations(client, project_id)
+        for previous in client.smembers(self._make_generations_key(project_id)):
+            if previous not in current:
+                self._delete_generation(client, project_id, previous)
+
+        logger.info('tagindex.rebuild', extra={
+            'project_id': project_id,
+            'generation': generation,
+            'rows': rows,
+        })
+
+    def invalidate(self, project_id):
+        self._get_client(project_id).delete(self._make_ready_key(project_id))
+
+    def delete_project(self, project_id):
+        client = self._get_client(project_id)
+        client.delete(
+            self._make_ready_key(project_id),
+            self._make_rebuild_key(project_id),
+            self._make_generation_key(project_id),
+        )
+        for generation in client.smembers(self._make_generations_key(project_id)):
+            self._delete_generation(client, project_id, generation)
@@ -73,6 +73,7 @@ class TagStorage(Service):
         'incr_tag_value_times_seen',
         'incr_group_tag_key_values_seen',
         'incr_group_tag_value_times_seen',
+        'incr_times_seen_for_tags',
         'get_group_ids_for_users',
         'get_group_tag_values_for_users',
         'get_tags_for_search_filter',
@@ -102,6 +103,13 @@ class TagStorage(Service):
                 ]
                 return relations
 
+            def delete_instance(self, instance):
+                from sentry import tagindex
+
+                tagindex.delete_tag_key(instance.project_id, instance.key)
+
+                return super(TagKeyDeletionTask, self).delete_instance(instance)
+
             def mark_deletion_in_progress(self, instance_list):
                 for instance in instance_list:
                     if instance.status != TagKeyStatus.DELETION_IN_PROGRESS:
@@ -347,6 +355,16 @@ class TagStorage(Service):
         """
         raise NotImplementedError
 
+    def incr_times_seen_for_tags(self, project_id, group_id, environment_id,
+                                 tags, last_seen, count=1):
+        """
+        Increment ``times_seen`` of the project-wide and group tag values
+        for every ``(key, value, data)`` item in ``tags`` in a single batch.
+
+        >>> incr_times_seen_for_tags(1, 2, 3, [("key1", "value1", None)], timezone.now())
+        """
+        raise NotImplementedError
+
     def get_group_event_ids(self, project_id, group_id, environment_id, tags):
         """
         >>> get_group_event_ids(1, 2, 3, {'key1': 'value1', 'key2': 'value2'})
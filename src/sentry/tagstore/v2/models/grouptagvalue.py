@@ -9,13 +9,14 @@ from __future__ import absolute_import
 
 import six
 
-from django.db import models, router, transaction, DataError
+from django.db import connections, models, router, transaction, DataError
 from django.utils import timezone
 
 from sentry.api.serializers import Serializer, register
 from sentry.db.models import (
     Model, BoundedPositiveIntegerField, BaseManager, FlexibleForeignKey, sane_repr
 )
+from sentry.utils import db
 
 
 class GroupTagValue(Model):
@@ -77,6 +78,40 @@ class GroupTagValue(Model):
             # it's possible to hit an out of range value for counters
             pass
 
+    @classmethod
+    def merge_counts_bulk(cls, ids, new_group):
+        """
+        Merges the counts of the given rows into their counterparts in
+        ``new_group`` with a single statement.
+        """
+        using = router.db_for_write(cls)
+        if not db.is_postgres(using):
+            for obj in cls.objects.filter(id__in=ids):
+                obj.merge_counts(new_group)
+            return
+
+        # Counters are clamped rather than failing the statement, which would
+        # lose the counts of every row in the batch.
+        cursor = connections[using].cursor()
+        cursor.execute(
+            """
+        UPDATE %(table)s AS d
+        SET times_seen = LEAST(d.times_seen::bigint + s.times_seen, %(max)d),
+            first_seen = LEAST(d.first_seen, s.first_seen),
+            last_seen = GREATEST(d.last_seen, s.last_seen)
+        FROM %(table)s AS s
+        WHERE s.id IN %%s
+        AND d.group_id = %%s
+        AND d.project_id = s.project_id
+        AND d.environment_id = s.environment_id
+        AND d.key = s.key
+        AND d.value = s.value
+        """ % {
+                'table': cls._meta.db_table,
+                'max': cls._meta.get_field('times_seen').MAX_VALUE,
+            }, [tuple(ids), new_group.id]
+        )
+
 
 @register(GroupTagValue)
 class GroupTagValueSerializer(Serializer):
@@ -9,10 +9,13 @@ sentry.tasks.merge
 from __future__ import absolute_import
 
 import logging
+import six
 
-from django.db import DataError, IntegrityError, router, transaction
+from collections import OrderedDict, defaultdict
+from django.db import DataError, IntegrityError, connections, router, transaction
 from django.db.models import F
 
+from sentry import buffer, tagindex
 from sentry.app import tsdb
 from sentry.similarity import features
 from sentry.tasks.base import instrumented_task, retry
@@ -120,6 +123,7 @@ def merge_group(
         return
 
     features.merge(new_group, [group], allow_unsafe=True)
+    tagindex.merge_groups(group.project_id, group.id, new_group.id)
 
     environment_ids = list(
         Environment.objects.filter(
@@ -250,53 +254,308 @@ def _get_event_environment(event, project, cache):
     return cache[environment_name]
 
 
+def _get_event_fingerprint(event):
+    fingerprint = event.data.get('fingerprint', ['{{ default }}'])
+    if fingerprint and not isinstance(fingerprint, (list, tuple)):
+        fingerprint = [fingerprint]
+    elif not fingerprint:
+        fingerprint = ['{{ default }}']
+    return fingerprint
+
+
+def _get_group_kwargs(event, group):
+    from sentry.event_manager import generate_culprit
+
+    return {
+        'message': event.message,
+        'platform': event.platform,
+        'culprit': generate_culprit(event.data),
+        'logger': event.get_tag('logger') or group.logger,
+        'level': group.level,
+        'last_seen': event.datetime,
+        'first_seen': event.datetime,
+        'data': group.data,
+    }
+
+
+def _get_group_hashes(project, hashes):
+    """
+    Returns a mapping of hash to ``GroupHash`` for the given hashes,
+    creating the ones which don't exist yet.
+    """
+    from sentry.models import GroupHash
+
+    group_hashes = {
+        h.hash: h for h in GroupHash.objects.filter(project=project, hash__in=hashes)
+    }
+    for hash in hashes:
+        if hash not in group_hashes:
+            group_hashes[hash] = GroupHash.objects.get_or_create(
+                project=project,
+                hash=hash,
+            )[0]
+    return group_hashes
+
+
+def _create_groups(project, group_kwargs_list):
+    """
+    Creates one group per item in ``group_kwargs_list``, reserving all of
+    the short ids with a single counter increment.
+    """
+    from sentry.event_manager import ScoreClause
+    from sentry.models import Counter, Group
+
+    if not group_kwargs_list:
+        return []
+
+    groups = []
+    with transaction.atomic():
+        last_short_id = Counter.increment(project, delta=len(group_kwargs_list))
+        short_id = last_short_id - len(group_kwargs_list) + 1
+        for kwargs in group_kwargs_list:
+            groups.append(Group.objects.create(
+                project=project,
+                short_id=short_id,
+                score=ScoreClause.calculate(1, kwargs['last_seen']),
+                **kwargs
+            ))
+            short_id += 1
+    return groups
+
+
 def _rehash_group_events(group, limit=100):
+    """
+    Regroups up to ``limit`` events of ``group`` by their current hashes.
+
+    Hashes for the whole batch are resolved in one query, groups which don't
+    exist yet are created together, and every target group then gets a
+    single UPDATE for its events, a single buffered counter increment and
+    one aggregated increment per distinct tag.
+    """
     from sentry.event_manager import (
-        EventManager, get_hashes_from_fingerprint, generate_culprit, md5_from_hash
+        EventManager, HashDiscarded, ScoreClause, get_hashes_from_fingerprint, md5_from_hash
     )
-    from sentry.models import Event, Group
+    from sentry.models import Event, Group, GroupHash
 
     environment_cache = {}
     project = group.project
     event_list = list(Event.objects.filter(group_id=group.id)[:limit])
     Event.objects.bind_nodes(event_list, 'data')
 
-    for event in event_list:
-        fingerprint = event.data.get('fingerprint', ['{{ default }}'])
-        if fingerprint and not isinstance(fingerprint, (list, tuple)):
-            fingerprint = [fingerprint]
-        elif not fingerprint:
-            fingerprint = ['{{ default }}']
-
-        manager = EventManager({})
-
-        group_kwargs = {
-            'message': event.message,
-            'platform': event.platform,
-            'culprit': generate_culprit(event.data),
-            'logger': event.get_tag('logger') or group.logger,
-            'level': group.level,
-            'last_seen': event.datetime,
-            'first_seen': event.datetime,
-            'data': group.data,
-        }
+    # XXX(dcramer): doesnt support checksums as they're not stored
+    event_hashes = [
+        map(md5_from_hash, get_hashes_from_fingerprint(event, _get_event_fingerprint(event)))
+        for event in event_list
+    ]
+    group_hashes = _get_group_hashes(project, set(h for hashes in event_hashes for h in hashes))
+
+    # Assign every event to a target, which is either the id of an existing
+    # group or the index of a group which has yet to be created. Hashes
+    # claimed by a new group are shared with the rest of the batch.
+    claimed_hashes = {}
+    new_group_kwargs = []
+    targets = []
+    for event, hashes in zip(event_list, event_hashes):
+        target = None
+        for hash in hashes:
+            h = group_hashes[hash]
+            if hash in claimed_hashes:
+                target = claimed_hashes[hash]
+                break
+            if h.group_id is not None:
+                target = h.group_id
+                break
+            if h.group_tombstone_id is not None:
+                raise HashDiscarded('Matches group tombstone %s' % h.group_tombstone_id)
+
+        if target is None:
+            target = ('new', len(new_group_kwargs))
+            new_group_kwargs.append(_get_group_kwargs(event, group))
 
-        # XXX(dcramer): doesnt support checksums as they're not stored
-        hashes = map(md5_from_hash, get_hashes_from_fingerprint(event, fingerprint))
         for hash in hashes:
-            new_group, _, _, _ = manager._save_aggregate(
-                event=event, hashes=hashes, release=None, **group_kwargs
-            )
-            event.update(group_id=new_group.id)
+            if group_hashes[hash].group_id is None:
+                claimed_hashes.setdefault(hash, target)
+        targets.append(target)
+
+    new_groups = _create_groups(project, new_group_kwargs)
+    groups = Group.objects.in_bulk(
+        [t for t in set(targets) if not isinstance(t, tuple)]
+    )
+    for index, new_group in enumerate(new_groups):
+        groups[('new', index)] = new_group
+
+    events_by_target = OrderedDict()
+    for event, hashes, target in zip(event_list, event_hashes, targets):
+        events_by_target.setdefault(target, []).append((event, hashes))
+
+    hashes_by_target = defaultdict(list)
+    for hash, target in six.iteritems(claimed_hashes):
+        hashes_by_target[target].append(group_hashes[hash].id)
+
+    manager = EventManager({})
+    for target, items in six.iteritems(events_by_target):
+        events = [event for event, _ in items]
+        last_event, last_hashes = items[-1]
+        new_group = groups[target]
+        is_new = isinstance(target, tuple)
+
+        if hashes_by_target[target]:
+            GroupHash.objects.filter(
+                id__in=hashes_by_target[target],
+            ).exclude(
+                state=GroupHash.State.LOCKED_IN_MIGRATION,
+            ).update(group=new_group)
+
+        Event.objects.filter(
+            id__in=[e.id for e in events],
+        ).update(group_id=new_group.id)
+
+        last_seen = max(e.datetime for e in events)
+
+        # A newly created group has already seen the event it was created from.
+        times_seen = len(events) - 1 if is_new else len(events)
+        if times_seen:
+            data = _get_group_kwargs(last_event, group)
+            extra = {
+                'last_seen': max(last_seen, new_group.last_seen),
+                'score': ScoreClause(new_group),
+                'data': data['data'],
+            }
+            if last_event.message and last_event.message != new_group.message:
+                extra['message'] = last_event.message
+            if new_group.level != data['level']:
+                extra['level'] = data['level']
+            if new_group.culprit != data['culprit']:
+                extra['culprit'] = data['culprit']
+
+            if not is_new:
+                manager._handle_regression(new_group, last_event, None)
+
+            buffer.incr(Group, {
+                'times_seen': times_seen,
+            }, {
+                'id': new_group.id,
+            }, extra)
+            new_group.last_seen = extra['last_seen']
+
+        GroupHash.record_last_processed_event_id(
+            group_hashes[last_hashes[0]].id,
+            last_event.event_id,
+        )
+
+        tag_counts = defaultdict(lambda: defaultdict(int))
+        for event in events:
             if event.data.get('tags'):
-                Group.objects.add_tags(
-                    new_group,
-                    _get_event_environment(event, project, environment_cache),
-                    event.data['tags'])
+                environment = _get_event_environment(event, project, environment_cache)
+                for key, value in event.data['tags']:
+                    tag_counts[environment][(key, value)] += 1
+
+        for environment, counts in six.iteritems(tag_counts):
+            tags_by_count = defaultdict(list)
+            for tag, count in six.iteritems(counts):
+                tags_by_count[count].append(tag)
+            for count, tags in six.iteritems(tags_by_count):
+                Group.objects.add_tags(new_group, environment, tags, count=count)
 
     return bool(event_list)
 
 
+def _get_group_unique_fields(model, group_field):
+    """
+    Returns the unique constraints of ``model`` that include its group
+    column, as tuples of the remaining field names. Moving a row to another
+    group can only violate one of these.
+    """
+    unique_fields = []
+    if model._meta.get_field(group_field).unique:
+        unique_fields.append(())
+    for fields in model._meta.unique_together:
+        if group_field in fields:
+            unique_fields.append(tuple(f for f in fields if f != group_field))
+    return unique_fields
+
+
+def _get_conflicting_ids(model, group_field, ids, new_group):
+    """
+    Returns the ids of the rows in ``ids`` which would violate a unique
+    constraint if they were moved to ``new_group``.
+    """
+    qn = connections[router.db_for_read(model)].ops.quote_name
+    table = qn(model._meta.db_table)
+    group_column = qn(model._meta.get_field(group_field).column)
+
+    conflicts = set()
+    for fields in _get_group_unique_fields(model, group_field):
+        if not fields:
+            if model.objects.filter(**{group_field: new_group.id}).exists():
+                return set(ids)
+            continue
+
+        # Rows are matched on the whole constraint in the database, so that
+        # only the conflicting rows of ``new_group`` are read. (NULLs never
+        # compare equal, just like within a unique constraint.)
+        conditions = ' AND '.join(
+            'd.{column} = {table}.{column}'.format(
+                column=qn(model._meta.get_field(f).column),
+                table=table,
+            ) for f in fields
+        )
+        conflicts.update(
+            model.objects.filter(id__in=ids).extra(
+                where=[
+                    'EXISTS (SELECT 1 FROM {table} AS d WHERE d.{group} = %s AND {conditions})'.format(
+                        table=table,
+                        group=group_column,
+                        conditions=conditions,
+                    ),
+                ],
+                params=[new_group.id],
+            ).values_list('id', flat=True)
+        )
+    return conflicts
+
+
+def _merge_objects_bulk(model, group_field, ids, new_group, logger=None, transaction_id=None):
+    """
+    Moves the rows in ``ids`` to ``new_group`` with a single UPDATE. Rows
+    which already exist in ``new_group`` have their counts merged in bulk
+    and are deleted instead.
+
+    Returns ``False`` if the rows could not be moved because of a
+    concurrent write, in which case the caller should retry them one by
+    one.
+    """
+    using = router.db_for_write(model)
+    conflicts = _get_conflicting_ids(model, group_field, ids, new_group)
+
+    try:
+        with transaction.atomic(using=using):
+            if conflicts:
+                if hasattr(model, 'merge_counts_bulk'):
+                    model.merge_counts_bulk(conflicts, new_group)
+                elif hasattr(model, 'merge_counts'):
+                    for obj in model.objects.filter(id__in=conflicts):
+                        obj.merge_counts(new_group)
+                model.objects.filter(id__in=conflicts).delete()
+
+            model.objects.filter(
+                id__in=[i for i in ids if i not in conflicts],
+            ).update(**{group_field: new_group if group_field == 'group' else new_group.id})
+    except IntegrityError:
+        return False
+
+    if conflicts and logger is not None:
+        delete_logger.debug(
+            'object.delete.bulk_executed',
+            extra={
+                'object_ids': sorted(conflicts),
+                'transaction_id': transaction_id,
+                'model': model.__name__,
+            }
+        )
+    return True
+
+
 def merge_objects(models, group, new_group, limit=1000, logger=None, transaction_id=None):
     has_more = False
     for model in models:
@@ -306,7 +565,16 @@ def merge_objects(models, group, new_group, limit=1000, logger=None, transaction
             queryset = model.objects.filter(group=group)
         else:
             queryset = model.objects.filter(group_id=group.id)
-        for obj in queryset[:limit]:
+
+        ids = list(queryset.values_list('id', flat=True)[:limit])
+        if not ids:
+            continue
+
+        if _merge_objects_bulk(model, 'group' if has_group else 'group_id', ids, new_group,
+                               logger=logger, transaction_id=transaction_id):
+            return True
+
+        for obj in model.objects.filter(id__in=ids):
             try:
                 with transaction.atomic(using=router.db_for_write(model)):
                     if has_group:
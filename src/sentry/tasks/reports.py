@@ -8,15 +8,16 @@ import math
 import operator
 import zlib
 from calendar import Calendar
-from collections import OrderedDict, namedtuple
+from collections import OrderedDict, defaultdict, namedtuple
 from datetime import datetime, timedelta
 
 import pytz
+import six
 from django.utils import dateformat, timezone
 
 from sentry.app import tsdb
 from sentry.models import (
-    Activity, GroupStatus, Organization, OrganizationStatus, Project, Team, User, UserOption
+    Activity, Group, GroupStatus, Organization, OrganizationStatus, Project, Team, User, UserOption
 )
 from sentry.tasks.base import instrumented_task
 from sentry.utils import json, redis
@@ -411,6 +412,208 @@ Report, prepare_project_report, merge_reports = build(
 )
 
 
+def prepare_organization_series(start__stop, projects, rollup=60 * 60 * 24):
+    start, stop = start__stop
+    resolution, series = tsdb.get_optimal_rollup_series(start, stop, rollup)
+    assert resolution == rollup, 'resolution does not match requested value'
+    clean = functools.partial(clean_series, start, stop, rollup)
+
+    resolved_issue_ids = defaultdict(list)
+    for group_id, project_id in Group.objects.filter(
+        project__in=projects,
+        status=GroupStatus.RESOLVED,
+        resolved_at__gte=start,
+        resolved_at__lt=stop,
+    ).values_list('id', 'project_id'):
+        resolved_issue_ids[project_id].append(group_id)
+
+    group_series = tsdb.get_range(
+        tsdb.models.group,
+        list(itertools.chain.from_iterable(resolved_issue_ids.values())),
+        start,
+        stop,
+        rollup=rollup,
+    )
+    project_series = tsdb.get_range(
+        tsdb.models.project,
+        [project.id for project in projects],
+        start,
+        stop,
+        rollup=rollup,
+    )
+
+    timestamps = [timestamp for timestamp, _ in clean([(timestamp, 0) for timestamp in series])]
+
+    results = {}
+    for project in projects:
+        resolved = [0] * len(timestamps)
+        for group_id in resolved_issue_ids[project.id]:
+            for i, (timestamp, value) in enumerate(clean(group_series[group_id])):
+                resolved[i] += value
+
+        total = clean(project_series[project.id])
+        assert [timestamp for timestamp, _ in total] == timestamps, \
+            'series timestamps must match'
+
+        results[project.id] = [
+            (timestamp, (resolved[i], value - resolved[i]))
+            for i, (timestamp, value) in enumerate(total)
+        ]
+
+    return results
+
+
+def prepare_organization_aggregates(ignore__stop, projects):
+    _, stop = ignore__stop
+    segments = 4
+    period = timedelta(days=7)
+    start = stop - (period * segments)
+
+    project_ids = [project.id for project in projects]
+    sums = [
+        tsdb.get_sums(
+            tsdb.models.project,
+            project_ids,
+            start + (period * i),
+            start + (period * (i + 1) - timedelta(seconds=1)),
+            rollup=60 * 60 * 24,
+        ) for i in range(segments)
+    ]
+
+    return {project_id: [values[project_id] for values in sums] for project_id in project_ids}
+
+
+def prepare_organization_issue_summaries(interval, projects):
+    start, stop = interval
+
+    queryset = Group.objects.filter(
+        project__in=projects,
+    ).exclude(status=GroupStatus.IGNORED)
+
+    new_issue_ids = defaultdict(set)
+    for group_id, project_id in queryset.filter(
+        first_seen__gte=start,
+        first_seen__lt=stop,
+    ).values_list('id', 'project_id'):
+        new_issue_ids[project_id].add(group_id)
+
+    # See ``prepare_project_issue_summaries`` for why this is a subselect.
+    reopened_issue_ids = defaultdict(set)
+    for group_id, project_id in Activity.objects.filter(
+        group__in=queryset.filter(
+            last_seen__gte=start,
+            last_seen__lt=stop,
+            resolved_at__isnull=False,  # signals this has *ever* been resolved
+        ),
+        type__in=(Activity.SET_REGRESSION, Activity.SET_UNRESOLVED, ),
+        datetime__gte=start,
+        datetime__lt=stop,
+    ).distinct().values_list('group_id', 'project_id'):
+        reopened_issue_ids[project_id].add(group_id)
+
+    rollup = 60 * 60 * 24
+
+    event_counts = tsdb.get_sums(
+        tsdb.models.group,
+        set(itertools.chain(
+            itertools.chain.from_iterable(new_issue_ids.values()),
+            itertools.chain.from_iterable(reopened_issue_ids.values()),
+        )),
+        start,
+        stop,
+        rollup=rollup,
+    )
+    project_counts = tsdb.get_sums(
+        tsdb.models.project,
+        [project.id for project in projects],
+        start,
+        stop,
+        rollup=rollup,
+    )
+
+    results = {}
+    for project in projects:
+        new_issue_count = sum(event_counts[id] for id in new_issue_ids[project.id])
+        reopened_issue_count = sum(event_counts[id] for id in reopened_issue_ids[project.id])
+        existing_issue_count = max(
+            project_counts[project.id] - new_issue_count - reopened_issue_count,
+            0,
+        )
+        results[project.id] = [
+            new_issue_count,
+            reopened_issue_count,
+            existing_issue_count,
+        ]
+
+    return results
+
+
+def prepare_organization_usage_summaries(start__stop, projects):
+    start, stop = start__stop
+    project_ids = [project.id for project in projects]
+    blacklisted, rejected = [
+        tsdb.get_sums(
+            model,
+            project_ids,
+            start,
+            stop,
+            rollup=60 * 60 * 24,
+        ) for model in (tsdb.models.project_total_blacklisted, tsdb.models.project_total_rejected)
+    ]
+    return {
+        project_id: (blacklisted[project_id], rejected[project_id]) for project_id in project_ids
+    }
+
+
+def prepare_organization_calendar_series(interval, projects):
+    start, stop = get_calendar_query_range(interval, 3)
+
+    rollup = 60 * 60 * 24
+    series = tsdb.get_range(
+        tsdb.models.project,
+        [project.id for project in projects],
+        start,
+        stop,
+        rollup=rollup,
+    )
+
+    return {
+        project.id: clean_calendar_data(
+            project,
+            series[project.id],
+            start,
+            stop,
+            rollup,
+        ) for project in projects
+    }
+
+
+def prepare_organization_reports(interval, projects):
+    """
+    Build reports for several projects at once, returning a mapping of
+    project ID to ``Report``.
+
+    The reports are the same as the ones built by ``prepare_project_report``,
+    but the data for all of the projects is fetched together, so the number
+    of queries doesn't depend on the number of projects.
+    """
+    projects = list(projects)
+    if not projects:
+        return {}
+
+    fields = [
+        f(interval, projects) for f in (
+            prepare_organization_series,
+            prepare_organization_aggregates,
+            prepare_organization_issue_summaries,
+            prepare_organization_usage_summaries,
+            prepare_organization_calendar_series,
+        )
+    ]
+
+    return {project.id: Report(*[field[project.id] for field in fields]) for project in projects}
+
+
 class ReportBackend(object):
     def build(self, timestamp, duration, project):
         return prepare_project_report(
@@ -418,6 +621,16 @@ class ReportBackend(object):
             project,
         )
 
+    def build_many(self, timestamp, duration, projects):
+        """
+        Build reports for several projects at once, returning a mapping of
+        project ID to report.
+        """
+        return prepare_organization_reports(
+            _to_interval(timestamp, duration),
+            projects,
+        )
+
     def prepare(self, timestamp, duration, organization):
         """
         Build and store reports for all projects in the organization.
@@ -475,11 +688,12 @@ class RedisReportBackend(ReportBackend):
         return Report(*json.loads(zlib.decompress(value)))
 
     def prepare(self, timestamp, duration, organization):
-        reports = {}
-        for project in organization.project_set.all():
-            reports[project.id] = self.__encode(
-                self.build(timestamp, duration, project),
+        reports = {
+            project_id: self.__encode(report)
+            for project_id, report in six.iteritems(
+                self.build_many(timestamp, duration, organization.project_set.all()),
             )
+        }
 
         if not reports:
             # XXX: HMSET requires at least one key/value pair, so we need to
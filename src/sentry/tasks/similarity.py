@@ -0,0 +1,18 @@
+from __future__ import absolute_import
+
+import logging
+
+from sentry.tasks.base import instrumented_task
+
+logger = logging.getLogger(__name__)
+
+
+@instrumented_task(
+    name='sentry.tasks.similarity.flush_buffered_features',
+    queue='similarity',
+)
+def flush_buffered_features():
+    from sentry.similarity import record_buffer
+
+    flushed = record_buffer.flush()
+    logger.debug('Flushed buffered similarity features for %s groups.', flushed)
@@ -7,8 +7,9 @@ from sentry.models import Project, ProjectDSymFile
 
 @instrumented_task(
     name='sentry.tasks.symcache_update',
-    time_limit=65,
-    soft_time_limit=60,
+    queue='symcache',
+    time_limit=60 * 10 + 5,
+    soft_time_limit=60 * 10,
 )
 def symcache_update(project_id, uuids, **kwargs):
     try:
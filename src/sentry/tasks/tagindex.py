@@ -0,0 +1,21 @@
+"""
+sentry.tasks.tagindex
+~~~~~~~~~~~~~~~~~~~~~
+
+:copyright: (c) 2010-2017 by the Sentry Team, see AUTHORS for more details.
+:license: BSD, see LICENSE for more details.
+"""
+
+from __future__ import absolute_import
+
+from sentry.tasks.base import instrumented_task
+
+
+@instrumented_task(
+    name='sentry.tasks.tagindex.rebuild_tag_index',
+    queue='search',
+)
+def rebuild_tag_index(project_id, generation=None, **kwargs):
+    from sentry import tagindex
+
+    tagindex.rebuild(project_id, generation=generation)
@@ -5,7 +5,7 @@ from collections import defaultdict
 
 from django.db import transaction
 
-from sentry import tagstore
+from sentry import tagindex, tagstore
 from sentry.app import tsdb
 from sentry.constants import DEFAULT_LOGGER_NAME, LOG_LEVELS_MAP
 from sentry.event_manager import (
@@ -243,6 +243,7 @@ def migrate_events(caches, project, source_id, destination_id, fingerprints, eve
 def truncate_denormalizations(group):
     tagstore.delete_all_group_tag_keys(group.id)
     tagstore.delete_all_group_tag_values(group.id)
+    tagindex.delete_groups(group.project_id, [group.id])
 
     GroupRelease.objects.filter(
         group_id=group.id,
@@ -333,6 +334,12 @@ def repair_tag_data(caches, project, events):
                         extra={'first_seen': first_seen}
                     )
 
+        tagindex.index_group_tags(
+            project.id,
+            group_id,
+            [(key, value) for key, values in keys.items() for value in values],
+        )
+
 
 def get_environment_name(event):
     return Environment.get_name_or_default(event.get_tag('environment'))
@@ -46,7 +46,9 @@ from sentry.auth.superuser import (
     Superuser, COOKIE_SALT as SU_COOKIE_SALT, COOKIE_NAME as SU_COOKIE_NAME
 )
 from sentry.constants import MODULE_ROOT
-from sentry.models import GroupMeta, ProjectOption, DeletedOrganization
+from sentry.lang.native import systemsymbols
+from sentry.models import GroupMeta, ProjectDSymFile, ProjectOption, ReleaseFile, \
+    DeletedOrganization
 from sentry.plugins import plugins
 from sentry.rules import EventState
 from sentry.utils import json
@@ -171,6 +173,9 @@ class BaseTestCase(Fixtures, Exam):
         cache.clear()
         ProjectOption.objects.clear_local_cache()
         GroupMeta.objects.clear_local_cache()
+        ProjectDSymFile.dsymcache.clear_local_cache()
+        ReleaseFile.objects.clear_local_cache()
+        systemsymbols.clear_local_cache()
 
     def _post_teardown(self):
         super(BaseTestCase, self)._post_teardown()
@@ -0,0 +1,91 @@
+"""
+sentry.tsdb.background
+~~~~~~~~~~~~~~~~~~~~~~
+
+:copyright: (c) 2010-2017 by the Sentry Team, see AUTHORS for more details.
+:license: BSD, see LICENSE for more details.
+"""
+from __future__ import absolute_import
+
+import atexit
+import logging
+import six
+import time
+
+from collections import defaultdict
+from threading import Lock, Thread
+
+from django.conf import settings
+
+from sentry.utils import metrics
+from sentry.utils.dates import to_datetime, to_timestamp
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundIncrementer(object):
+    """
+    Collects TSDB counter increments in process and writes them from a daemon
+    thread every ``interval`` seconds, so that latency sensitive callers
+    don't wait on ``tsdb.incr_multi``.
+
+    Increments are aggregated by the smallest configured rollup, so an
+    interval's worth of increments for the same counter costs a single write.
+    Pending increments are lost if the process is killed before the next
+    flush.
+    """
+
+    def __init__(self, interval=1.0, resolution=None):
+        if resolution is None:
+            resolution = min(rollup for rollup, _ in settings.SENTRY_TSDB_ROLLUPS)
+        self.interval = interval
+        self.resolution = resolution
+        self.__pending = defaultdict(int)
+        self.__lock = Lock()
+        self.__thread = None
+
+    def __start(self):
+        with self.__lock:
+            if self.__thread is not None:
+                return
+            self.__thread = Thread(target=self.__run, name='tsdb-background-incrementer')
+            self.__thread.setDaemon(True)
+            self.__thread.start()
+        atexit.register(self.flush)
+
+    def __run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Unable to flush TSDB increments')
+
+    def incr_multi(self, items, timestamp, count=1):
+        bucket = int(to_timestamp(timestamp) // self.resolution) * self.resolution
+        with self.__lock:
+            for model, key in items:
+                self.__pending[(bucket, model, key)] += count
+
+        if self.__thread is None:
+            self.__start()
+
+    def flush(self):
+        from sentry import tsdb
+
+        with self.__lock:
+            pending, self.__pending = self.__pending, defaultdict(int)
+
+        if not pending:
+            return
+
+        # ``incr_multi`` takes a single timestamp and count, so group the
+        # counters by both of them.
+        batches = defaultdict(list)
+        for (bucket, model, key), count in six.iteritems(pending):
+            batches[(bucket, count)].append((model, key))
+
+        for (bucket, count), items in six.iteritems(batches):
+            tsdb.incr_multi(items, timestamp=to_datetime(bucket), count=count)
+
+        metrics.timing('tsdb.background.flush-size', len(pending))
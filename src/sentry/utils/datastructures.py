@@ -1,6 +1,8 @@
 from __future__ import absolute_import
 
-from collections import Hashable, MutableMapping
+from collections import Hashable, MutableMapping, OrderedDict
+from threading import Lock
+from time import time
 
 __unset__ = object()
 
@@ -61,3 +63,73 @@ class BidirectionalMapping(MutableMapping):
 
     def inverse(self):
         return self.__inverse.copy()
+
+
+class LRUCache(object):
+    """\
+    A thread-safe, in-process cache that evicts the least recently used
+    entries once it holds more than ``max_entries`` values, or (if provided)
+    once the combined ``sizeof`` of its values exceeds ``max_size``. If a
+    ``ttl`` (in seconds) is provided, entries also expire after that long.
+    """
+
+    def __init__(self, max_entries, max_size=None, sizeof=len, ttl=None):
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.sizeof = sizeof
+        self.ttl = ttl
+        self.size = 0
+        self.__data = OrderedDict()
+        self.__lock = Lock()
+
+    def __len__(self):
+        return len(self.__data)
+
+    def __contains__(self, key):
+        return self.get(key, __unset__) is not __unset__
+
+    def get(self, key, default=None):
+        with self.__lock:
+            try:
+                entry = self.__data.pop(key)
+            except KeyError:
+                return default
+
+            if entry[2] is not None and entry[2] <= time():
+                self.size -= entry[1]
+                return default
+
+            self.__data[key] = entry
+            return entry[0]
+
+    def set(self, key, value):
+        size = self.sizeof(value) if self.max_size is not None else 0
+        expires = time() + self.ttl if self.ttl is not None else None
+        with self.__lock:
+            previous = self.__data.pop(key, None)
+            if previous is not None:
+                self.size -= previous[1]
+
+            # Values that could never fit are not worth evicting everything
+            # else for.
+            if self.max_size is not None and size > self.max_size:
+                return
+
+            self.__data[key] = (value, size, expires)
+            self.size += size
+
+            while len(self.__data) > self.max_entries or (
+                self.max_size is not None and self.size > self.max_size
+            ):
+                self.size -= self.__data.popitem(last=False)[1][1]
+
+    def delete(self, key):
+        with self.__lock:
+            previous = self.__data.pop(key, None)
+            if previous is not None:
+                self.size -= previous[1]
+
+    def clear(self):
+        with self.__lock:
+            self.__data.clear()
+            self.size = 0
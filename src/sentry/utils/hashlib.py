@@ -25,3 +25,20 @@ def sha1_text(*args):
     for x in args:
         m.update(force_bytes(x, errors='replace'))
     return m
+
+
+def hash_values(values):
+    """
+    Returns a hex digest identifying a sequence of values. Every value is
+    length prefixed, so that (for example) ``['ab', 'c']`` and ``['a', 'bc']``
+    have different digests, and ``None`` is distinct from the empty string.
+    """
+    m = _md5()
+    for value in values:
+        if value is None:
+            m.update(b'-')
+        else:
+            value = force_bytes(value, errors='replace')
+            m.update(b'%d:' % len(value))
+            m.update(value)
+    return m.hexdigest()
@@ -19,20 +19,44 @@ from django.utils.timezone import is_aware
 from django.utils.html import mark_safe
 
 
+def _encode_datetime(o):
+    return o.strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+
+def _encode_time(o):
+    if is_aware(o):
+        raise ValueError("JSON can't represent timezone-aware times.")
+    r = o.isoformat()
+    if o.microsecond:
+        r = r[:12]
+    return r
+
+
+# Encoders for the exact types that are serialized most, so that they do not
+# need to go through the chain of ``isinstance`` checks.
+_default_encoders = {
+    uuid.UUID: lambda o: o.hex,
+    datetime.datetime: _encode_datetime,
+    datetime.date: lambda o: o.isoformat(),
+    datetime.time: _encode_time,
+    set: list,
+    frozenset: list,
+    decimal.Decimal: six.text_type,
+}
+
+
 def better_default_encoder(o):
+    encoder = _default_encoders.get(type(o))
+    if encoder is not None:
+        return encoder(o)
     if isinstance(o, uuid.UUID):
         return o.hex
     elif isinstance(o, datetime.datetime):
-        return o.strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+        return _encode_datetime(o)
     elif isinstance(o, datetime.date):
         return o.isoformat()
     elif isinstance(o, datetime.time):
-        if is_aware(o):
-            raise ValueError("JSON can't represent timezone-aware times.")
-        r = o.isoformat()
-        if o.microsecond:
-            r = r[:12]
-        return r
+        return _encode_time(o)
     elif isinstance(o, (set, frozenset)):
         return list(o)
     elif isinstance(o, decimal.Decimal):
@@ -42,26 +66,29 @@ def better_default_encoder(o):
     raise TypeError(repr(o) + ' is not JSON serializable')
 
 
+def _escape_htmlsafe(value):
+    return value.replace('&', '\\u0026').replace('<', '\\u003c') \
+        .replace('>', '\\u003e').replace("'", '\\u0027')
+
+
 class JSONEncoderForHTML(JSONEncoder):
     # Our variant of JSONEncoderForHTML that also accounts for apostrophes
     # See: https://github.com/simplejson/simplejson/blob/master/simplejson/encoder.py#L380-L386
     def encode(self, o):
         # Override JSONEncoder.encode because it has hacks for
-        # performance that make things more complicated.
-        chunks = self.iterencode(o, True)
+        # performance that make things more complicated.  The escaped
+        # characters only occur within strings, so the output of the (C
+        # accelerated) one-shot encoder is escaped as a whole.
+        chunks = super(JSONEncoderForHTML, self).iterencode(o, True)
         if self.ensure_ascii:
-            return ''.join(chunks)
+            return _escape_htmlsafe(''.join(chunks))
         else:
-            return u''.join(chunks)
+            return _escape_htmlsafe(u''.join(chunks))
 
     def iterencode(self, o, _one_shot=False):
         chunks = super(JSONEncoderForHTML, self).iterencode(o, _one_shot)
         for chunk in chunks:
-            chunk = chunk.replace('&', '\\u0026')
-            chunk = chunk.replace('<', '\\u003c')
-            chunk = chunk.replace('>', '\\u003e')
-            chunk = chunk.replace("'", '\\u0027')
-            yield chunk
+            yield _escape_htmlsafe(chunk)
 
 
 _default_encoder = JSONEncoder(
@@ -90,8 +117,8 @@ _default_escaped_encoder = JSONEncoderForHTML(
 
 
 def dump(value, fp, **kwargs):
-    for chunk in _default_encoder.iterencode(value):
-        fp.write(chunk)
+    # ``iterencode`` only uses the C encoder when encoding in one shot.
+    fp.write(_default_encoder.encode(value))
 
 
 def dumps(value, escape=False, **kwargs):
@@ -42,50 +42,126 @@ def safe_execute(func, *args, **kwargs):
         return result
 
 
-def trim(
-    value,
-    max_size=settings.SENTRY_MAX_VARIABLE_SIZE,
-    max_depth=3,
-    object_hook=None,
-    _depth=0,
-    _size=0,
-    **kwargs
-):
-    """
-    Truncates a value to ```MAX_VARIABLE_SIZE```.
+_SCALAR_TYPES = six.integer_types + (float, bool, type(None))
 
-    The method of truncation depends on the type of value.
+
+class _ReprLimitReached(Exception):
+    pass
+
+
+def _repr_into(value, pieces, state, active):
+    # Builds ``repr(value)`` piece by piece, like the builtin containers do,
+    # and gives up as soon as more than the requested length is known.
+    value_type = type(value)
+    if value_type in (dict, list, tuple) and value:
+        if id(value) in active:
+            pieces.append({dict: '{...}', list: '[...]', tuple: '(...)'}[value_type])
+            state[0] += 5
+        else:
+            active.add(id(value))
+            opening, closing = {dict: '{}', list: '[]', tuple: '()'}[value_type]
+            pieces.append(opening)
+            state[0] += 1
+            items = six.iteritems(value) if value_type is dict else ((None, v) for v in value)
+            for idx, (k, v) in enumerate(items):
+                if idx:
+                    pieces.append(', ')
+                    state[0] += 2
+                if value_type is dict:
+                    _repr_into(k, pieces, state, active)
+                    pieces.append(': ')
+                    state[0] += 2
+                _repr_into(v, pieces, state, active)
+            if value_type is tuple and len(value) == 1:
+                closing = ',)'
+            pieces.append(closing)
+            state[0] += len(closing)
+            active.discard(id(value))
+    else:
+        piece = repr(value)
+        pieces.append(piece)
+        state[0] += len(piece)
+
+    if state[0] > state[1]:
+        raise _ReprLimitReached
+
+
+def _repr_prefix(value, limit):
+    """
+    Returns ``repr(value)``, or a prefix of it that is longer than ``limit``
+    characters, without stringifying all of a large value.
     """
-    options = {
-        'max_depth': max_depth,
-        'max_size': max_size,
-        'object_hook': object_hook,
-        '_depth': _depth + 1,
-    }
+    pieces = []
+    try:
+        _repr_into(value, pieces, [0, limit], set())
+    except _ReprLimitReached:
+        pass
+    return ''.join(pieces)
+
 
+def _measure(value):
+    """
+    Returns the length of ``force_text(value)`` and the length of ``value``
+    when stringified inside of a container.
+    """
+    if isinstance(value, six.text_type):
+        return len(value), len(repr(value))
+    if isinstance(value, (dict, list, tuple)):
+        length = len(force_text(value))
+        return length, length
+    if isinstance(value, six.binary_type):
+        try:
+            return len(value.decode('utf-8')), len(repr(value))
+        except UnicodeDecodeError:
+            # Let ``force_text`` raise its own error.
+            return len(force_text(value)), len(repr(value))
+    if isinstance(value, _SCALAR_TYPES):
+        return len(force_text(value)), len(repr(value))
+    return len(force_text(value)), len(force_text(repr(value)))
+
+
+def _trim(value, max_size, max_depth, object_hook, _depth, _size, _measured):
+    """
+    Returns the trimmed value, the length of its text representation and the
+    length of its representation inside a container. Lengths are only
+    computed if ``_measured`` is set, and the lengths of containers are
+    accumulated from their children instead of stringifying every trimmed
+    container again at each level.
+    """
     if _depth > max_depth:
         if not isinstance(value, six.string_types):
-            value = repr(value)
-        return trim(value, _size=_size, max_size=max_size)
+            value = _repr_prefix(value, max_size - _size)
+        result = truncatechars(value, max_size - _size)
+        if _measured:
+            return (result, ) + _measure(result)
+        return result, None, None
 
-    elif isinstance(value, dict):
+    length = None
+    if isinstance(value, dict):
         result = {}
         _size += 2
+        length = 2
         for k in sorted(value.keys()):
-            v = value[k]
-            trim_v = trim(v, _size=_size, **options)
+            trim_v, text_len, repr_len = _trim(
+                value[k], max_size, max_depth, object_hook, _depth + 1, _size, True)
             result[k] = trim_v
-            _size += len(force_text(trim_v)) + 1
+            _size += text_len + 1
+            if _measured:
+                length += (2 if length == 2 else 4) + _measure(k)[1] + repr_len
             if _size >= max_size:
                 break
 
     elif isinstance(value, (list, tuple)):
         result = []
         _size += 2
+        length = 2
         for v in value:
-            trim_v = trim(v, _size=_size, **options)
+            trim_v, text_len, repr_len = _trim(
+                v, max_size, max_depth, object_hook, _depth + 1, _size, True)
+            _size += text_len
+            if _measured:
+                length += repr_len if not result else repr_len + 2
             result.append(trim_v)
-            _size += len(force_text(trim_v))
             if _size >= max_size:
                 break
 
@@ -95,9 +171,34 @@ def trim(
     else:
         result = value
 
-    if object_hook is None:
-        return result
-    return object_hook(result)
+    if object_hook is not None:
+        hooked = object_hook(result)
+        if hooked is not result:
+            result = hooked
+            length = None
+
+    if not _measured:
+        return result, None, None
+    if length is None:
+        return (result, ) + _measure(result)
+    return result, length, length
+
+
+def trim(
+    value,
+    max_size=settings.SENTRY_MAX_VARIABLE_SIZE,
+    max_depth=3,
+    object_hook=None,
+    _depth=0,
+    _size=0,
+    **kwargs
+):
+    """
+    Truncates a value to ```MAX_VARIABLE_SIZE```.
+
+    The method of truncation depends on the type of value.
+    """
+    return _trim(value, max_size, max_depth, object_hook, _depth, _size, False)[0]
 
 
 def trim_pairs(iterable, max_items=settings.SENTRY_MAX_DICTIONARY_ITEMS, **kwargs):
@@ -114,9 +215,10 @@ def trim_pairs(iterable, max_items=settings.SENTRY_MAX_DICTIONARY_ITEMS, **kwarg
 def trim_dict(value, max_items=settings.SENTRY_MAX_DICTIONARY_ITEMS, **kwargs):
     max_items -= 1
     for idx, key in enumerate(list(iter(value))):
-        value[key] = trim(value[key], **kwargs)
         if idx > max_items:
             del value[key]
+        else:
+            value[key] = trim(value[key], **kwargs)
     return value
 
 
@@ -1,10 +1,11 @@
 from __future__ import absolute_import
 
 import six
+import sys
 
 from collections import defaultdict
 from Queue import Queue, Empty
-from threading import Thread
+from threading import Event, Lock, Thread, local
 
 
 class Worker(Thread):
@@ -58,3 +59,101 @@ class ThreadPool(object):
             for k, v in six.iteritems(worker.results):
                 results[k].extend(v)
         return results
+
+
+class TimeoutError(Exception):
+    pass
+
+
+class FutureResult(object):
+    """
+    The eventual result of a call submitted to a ``BoundedThreadPool``.
+    """
+
+    def __init__(self):
+        self._event = Event()
+        self._result = None
+        self._exc_info = None
+
+    def set_result(self, result):
+        self._result = result
+        self._event.set()
+
+    def set_exception(self, exc_info):
+        self._exc_info = exc_info
+        self._event.set()
+
+    def done(self):
+        return self._event.is_set()
+
+    def result(self, timeout=None):
+        """
+        Wait for the call to complete, returning its result or raising its
+        exception. Raises ``TimeoutError`` if the call has not completed
+        within ``timeout`` seconds.
+        """
+        if not self._event.wait(timeout):
+            raise TimeoutError('Timed out waiting for result')
+        if self._exc_info is not None:
+            six.reraise(*self._exc_info)
+        return self._result
+
+
+class BoundedThreadPool(object):
+    """
+    A fixed number of long-lived daemon threads executing submitted calls.
+
+    Workers are started lazily on the first submission. Calls submitted from
+    one of the pool's own workers are executed inline, so that nested use of
+    the pool can never deadlock waiting on a free worker.
+    """
+
+    def __init__(self, workers=10, name='pool'):
+        assert workers > 0
+        self.workers = workers
+        self.name = name
+        self.queue = Queue()
+        self._threads = []
+        self._lock = Lock()
+        self._local = local()
+
+    def _start(self):
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = Thread(
+                    target=self._run,
+                    name='%s-%s' % (self.name, i),
+                )
+                thread.setDaemon(True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _run(self):
+        self._local.is_worker = True
+        while True:
+            future, func, args, kwargs = self.queue.get()
+            try:
+                future.set_result(func(*args, **kwargs))
+            except Exception:
+                future.set_exception(sys.exc_info())
+            finally:
+                self.queue.task_done()
+
+    def in_worker(self):
+        return getattr(self._local, 'is_worker', False)
+
+    def submit(self, func, *args, **kwargs):
+        future = FutureResult()
+        if self.in_worker():
+            try:
+                future.set_result(func(*args, **kwargs))
+            except Exception:
+                future.set_exception(sys.exc_info())
+            return future
+
+        if not self._threads:
+            self._start()
+        self.queue.put((future, func, args, kwargs))
+        return future
@@ -9,7 +9,6 @@ from time import time
 
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
-from django.core.cache import cache
 from django.core.urlresolvers import reverse
 from django.http import HttpResponse, HttpResponseRedirect, HttpResponseNotAllowed
 from django.utils.encoding import force_bytes
@@ -28,7 +27,7 @@ from sentry.interfaces import schemas
 from sentry.models import Project, OrganizationOption, Organization
 from sentry.signals import (
     event_accepted, event_dropped, event_filtered, event_received)
-from sentry.quotas.base import RateLimit
+from sentry.tsdb.background import BackgroundIncrementer
 from sentry.utils import json, metrics
 from sentry.utils.data_filters import FILTER_STAT_KEYS_TO_VALUES
 from sentry.utils.data_scrubber import SensitiveDataFilter
@@ -54,6 +53,10 @@ pubsub = QueuedPublisher(
     RedisPublisher(getattr(settings, 'REQUESTS_PUBSUB_CONNECTION', None))
 ) if getattr(settings, 'REQUESTS_PUBSUB_ENABLED', False) else None
 
+# Writes the store endpoint's outcome counters outside of the request cycle
+# when ``SENTRY_STORE_ASYNC_OUTCOMES`` is enabled.
+outcome_incrementer = BackgroundIncrementer()
+
 
 def api(func):
     @wraps(func)
@@ -382,10 +385,7 @@ class StoreView(APIView):
             except KeyError:
                 pass
 
-            tsdb.incr_multi(
-                increment_list,
-                timestamp=tsdb_start_time,
-            )
+            self._record_outcome(increment_list, tsdb_start_time)
 
             metrics.incr('events.blacklisted', tags={
                          'reason': filter_reason})
@@ -396,12 +396,21 @@ class StoreView(APIView):
             )
             raise APIForbidden('Event dropped due to filter')
 
-        # TODO: improve this API (e.g. make RateLimit act on __ne__)
-        rate_limit = safe_execute(
-            quotas.is_rate_limited, project=project, key=key, _with_transaction=False
+        event_id = data['event_id']
+
+        # The rate limit check and event ID deduplication are done together,
+        # which quota backends can implement as a single round trip.
+        admission = safe_execute(
+            quotas.admit_event,
+            project=project,
+            event_id=event_id,
+            key=key,
+            _with_transaction=False
         )
-        if isinstance(rate_limit, bool):
-            rate_limit = RateLimit(is_limited=rate_limit, retry_after=None)
+        if admission is None:
+            rate_limit, is_duplicate = None, False
+        else:
+            rate_limit, is_duplicate = admission
 
         # XXX(dcramer): when the rate limiter fails we drop events to ensure
         # it cannot cascade
@@ -409,7 +418,7 @@ class StoreView(APIView):
             if rate_limit is None:
                 helper.log.debug(
                     'Dropped event due to error with rate limiter')
-            tsdb.incr_multi(
+            self._record_outcome(
                 [
                     (tsdb.models.project_total_received, project.id),
                     (tsdb.models.project_total_rejected, project.id),
@@ -420,7 +429,7 @@ class StoreView(APIView):
                     (tsdb.models.key_total_received, key.id),
                     (tsdb.models.key_total_rejected, key.id),
                 ],
-                timestamp=tsdb_start_time,
+                tsdb_start_time,
             )
             metrics.incr(
                 'events.dropped',
@@ -437,16 +446,48 @@ class StoreView(APIView):
             if rate_limit is not None:
                 raise APIRateLimited(rate_limit.retry_after)
         else:
-            tsdb.incr_multi(
+            self._record_outcome(
                 [
                     (tsdb.models.project_total_received, project.id),
                     (tsdb.models.organization_total_received,
                      project.organization_id),
                     (tsdb.models.key_total_received, key.id),
                 ],
-                timestamp=tsdb_start_time,
+                tsdb_start_time,
             )
 
+        # TODO(dcramer): ideally we'd only validate this if the event_id was
+        # supplied by the user
+        if is_duplicate:
+            raise APIForbidden(
+                'An event with the same ID already exists (%s)' % (event_id, ))
+
+        try:
+            self._scrub_and_insert(project, helper, data, start_time)
+        except Exception:
+            # Allow the event to be resubmitted with the same ID.
+            safe_execute(
+                quotas.forget_event_id, project, event_id, _with_transaction=False)
+            raise
+
+        helper.log.debug('New event received (%s)', event_id)
+
+        event_accepted.send_robust(
+            ip=remote_addr,
+            data=data,
+            project=project,
+            sender=type(self),
+        )
+
+        return event_id
+
+    def _record_outcome(self, items, timestamp):
+        if settings.SENTRY_STORE_ASYNC_OUTCOMES:
+            outcome_incrementer.incr_multi(items, timestamp)
+        else:
+            tsdb.incr_multi(items, timestamp=timestamp)
+
+    def _scrub_and_insert(self, project, helper, data, start_time):
         org_options = OrganizationOption.objects.get_all_values(
             project.organization_id)
 
@@ -456,16 +497,6 @@ class StoreView(APIView):
             scrub_ip_address = project.get_option(
                 'sentry:scrub_ip_address', False)
 
-        event_id = data['event_id']
-
-        # TODO(dcramer): ideally we'd only validate this if the event_id was
-        # supplied by the user
-        cache_key = 'ev:%s:%s' % (project.id, event_id, )
-
-        if cache.get(cache_key) is not None:
-            raise APIForbidden(
-                'An event with the same ID already exists (%s)' % (event_id, ))
-
         if org_options.get('sentry:require_scrub_data', False):
             scrub_data = True
         else:
@@ -505,19 +536,6 @@ class StoreView(APIView):
         # mutates data (strips a lot of context if not queued)
         helper.insert_data_to_database(data, start_time=start_time)
 
-        cache.set(cache_key, '', 60 * 5)
-
-        helper.log.debug('New event received (%s)', event_id)
-
-        event_accepted.send_robust(
-            ip=remote_addr,
-            data=data,
-            project=project,
-            sender=type(self),
-        )
-
-        return event_id
-
 
 class MinidumpView(StoreView):
     helper_cls = MinidumpApiHelper
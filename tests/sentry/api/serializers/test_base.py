@@ -2,8 +2,13 @@
 
 from __future__ import absolute_import
 
+import pytest
+import threading
+
+from django.db import connection, transaction
+
 from sentry.api.serializers import serialize, Serializer
-from sentry.testutils import TestCase
+from sentry.testutils import TestCase, TransactionTestCase
 
 
 class Foo(object):
@@ -46,3 +51,70 @@ class BaseSerializerTest(TestCase):
         assert len(rv) == 2
         assert rv[0] is None
         assert isinstance(rv[1], dict)
+
+
+class LoadAttrsTest(TransactionTestCase):
+    def test_sequential(self):
+        current = threading.current_thread()
+        result = FooSerializer().load_attrs({
+            'a': lambda: (1, threading.current_thread()),
+            'b': lambda: (2, threading.current_thread()),
+        })
+        assert result == {'a': (1, current), 'b': (2, current)}
+
+    def test_concurrent(self):
+        barrier = threading.Event()
+
+        def wait():
+            # only completes if the other loader runs at the same time
+            assert barrier.wait(5)
+            return threading.current_thread()
+
+        def release():
+            barrier.set()
+            return threading.current_thread()
+
+        with self.settings(SENTRY_API_SERIALIZER_WORKERS=2):
+            result = FooSerializer().load_attrs({
+                'wait': wait,
+                'release': release,
+            })
+
+        assert threading.current_thread() not in result.values()
+
+    def test_concurrent_error(self):
+        def fail():
+            raise ValueError('oops')
+
+        with self.settings(SENTRY_API_SERIALIZER_WORKERS=2):
+            with pytest.raises(ValueError):
+                FooSerializer().load_attrs({
+                    'a': lambda: 1,
+                    'b': fail,
+                })
+
+    def test_atomic_block(self):
+        current = threading.current_thread()
+
+        with self.settings(SENTRY_API_SERIALIZER_WORKERS=2), transaction.atomic():
+            result = FooSerializer().load_attrs({
+                'a': threading.current_thread,
+                'b': threading.current_thread,
+            })
+
+        assert result == {'a': current, 'b': current}
+
+    def test_connections_are_reused(self):
+        def query():
+            connection.cursor().execute('SELECT 1')
+            return threading.current_thread(), id(connection.connection)
+
+        connection_ids = {}
+        with self.settings(SENTRY_API_SERIALIZER_WORKERS=2):
+            for _ in range(3):
+                result = FooSerializer().load_attrs({'a': query, 'b': query})
+                for thread, connection_id in result.values():
+                    connection_ids.setdefault(thread, set()).add(connection_id)
+
+        # every worker thread kept using its own connection
+        assert all(len(ids) == 1 for ids in connection_ids.values())
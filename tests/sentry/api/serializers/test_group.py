@@ -6,6 +6,7 @@ import six
 
 from datetime import timedelta
 
+from django.db import transaction
 from django.utils import timezone
 from mock import patch
 
@@ -14,7 +15,7 @@ from sentry.models import (
     GroupResolution, GroupSnooze, GroupStatus,
     GroupSubscription, UserOption, UserOptionValue
 )
-from sentry.testutils import TestCase
+from sentry.testutils import TestCase, TransactionTestCase
 
 
 class GroupSerializerTest(TestCase):
@@ -267,3 +268,33 @@ class GroupSerializerTest(TestCase):
 
         result = serialize(group)
         assert not result['isSubscribed']
+
+
+class GroupSerializerWorkersTest(TransactionTestCase):
+    def test_is_ignored(self):
+        user = self.create_user()
+        group = self.create_group(status=GroupStatus.IGNORED)
+        GroupSnooze.objects.create(
+            group=group,
+            until=timezone.now() + timedelta(minutes=1),
+        )
+
+        with self.settings(SENTRY_API_SERIALIZER_WORKERS=2):
+            result = serialize(group, user)
+        assert result['status'] == 'ignored'
+        assert result['isBookmarked'] is False
+
+    def test_atomic_block(self):
+        user = self.create_user()
+        group = self.create_group()
+
+        with self.settings(SENTRY_API_SERIALIZER_WORKERS=2), transaction.atomic():
+            # not visible to other connections until committed
+            group.update(status=GroupStatus.IGNORED)
+            GroupSnooze.objects.create(
+                group=group,
+                until=timezone.now() + timedelta(minutes=1),
+            )
+            result = serialize(group, user)
+
+        assert result['status'] == 'ignored'
@@ -24,6 +24,19 @@ class BufferTest(TestCase):
         kwargs = dict(model=model, columns=columns, filters=filters, extra=None)
         process_incr.apply_async.assert_called_once_with(kwargs=kwargs)
 
+    @mock.patch('sentry.buffer.base.process_incr')
+    def test_incr_multi_delays_tasks(self, process_incr):
+        model = mock.Mock()
+        self.buf.incr_multi([
+            (model, {'times_seen': 1}, {'id': 1}, None),
+            (model, {'times_seen': 2}, {'id': 2}, {'foo': 'bar'}),
+        ])
+        assert len(process_incr.apply_async.mock_calls) == 2
+        process_incr.apply_async.assert_any_call(kwargs=dict(
+            model=model, columns={'times_seen': 1}, filters={'id': 1}, extra=None))
+        process_incr.apply_async.assert_any_call(kwargs=dict(
+            model=model, columns={'times_seen': 2}, filters={'id': 2}, extra={'foo': 'bar'}))
+
     def test_process_saves_data(self):
         group = Group.objects.create(project=Project(id=1))
         columns = {'times_seen': 1}
@@ -99,3 +99,28 @@ class RedisBufferTest(TestCase):
         }
         pending = client.zrange('b:p', 0, -1)
         assert pending == ['foo']
+
+    @mock.patch('sentry.buffer.redis.process_incr', mock.Mock())
+    def test_incr_multi_saves_to_redis(self):
+        client = self.buf.cluster.get_routing_client()
+        model = mock.Mock()
+        model.__name__ = 'Mock'
+        self.buf.incr_multi([
+            (model, {'times_seen': 1}, {'pk': 1}, {'foo': 'bar'}),
+            (model, {'times_seen': 2}, {'pk': 2}, None),
+            (model, {'times_seen': 3}, {'pk': 1}, None),
+        ])
+        key1 = self.buf._make_key(model, {'pk': 1})
+        key2 = self.buf._make_key(model, {'pk': 2})
+        assert client.hgetall(key1) == {
+            'e+foo': "S'bar'\np1\n.",
+            'f': "(dp1\nS'pk'\np2\nI1\ns.",
+            'i+times_seen': '4',
+            'm': 'mock.Mock',
+        }
+        assert client.hgetall(key2) == {
+            'f': "(dp1\nS'pk'\np2\nI2\ns.",
+            'i+times_seen': '2',
+            'm': 'mock.Mock',
+        }
+        assert sorted(client.zrange('b:p', 0, -1)) == sorted([key1, key2])
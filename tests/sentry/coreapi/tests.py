@@ -2,9 +2,11 @@
 
 from __future__ import absolute_import
 
+import base64
 import six
 import mock
 import pytest
+import zlib
 
 from django.core.exceptions import SuspiciousOperation
 from sentry.constants import VERSION_LENGTH
@@ -12,11 +14,13 @@ from uuid import UUID
 
 from sentry.coreapi import (
     APIError,
+    APIPayloadTooLarge,
     APIUnauthorized,
     Auth,
     ClientApiHelper,
     CspApiHelper,
     APIForbidden,
+    LazyData,
 )
 from sentry.event_manager import EventManager
 from sentry.interfaces.base import get_interface
@@ -508,6 +512,40 @@ class SafelyLoadJSONStringTest(BaseAPITest):
             self.helper.safely_load_json_string('1')
 
 
+class DecompressDataTest(BaseAPITest):
+    payload = b'{"message": "%s"}' % (b'x' * 1000, )
+
+    def test_deflate(self):
+        data = self.helper.decompress_deflate(zlib.compress(self.payload))
+        assert data == self.payload
+
+    def test_gzip(self):
+        compressor = zlib.compressobj(9, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        encoded = compressor.compress(self.payload) + compressor.flush()
+        assert self.helper.decompress_gzip(encoded) == self.payload
+
+    def test_base64(self):
+        encoded = base64.b64encode(zlib.compress(self.payload))
+        assert self.helper.decode_and_decompress_data(encoded) == self.payload
+        encoded = base64.b64encode(self.payload)
+        assert self.helper.decode_and_decompress_data(encoded) == self.payload
+
+    def test_invalid_data(self):
+        with self.assertRaises(APIError):
+            self.helper.decompress_deflate(b'\x99')
+
+    def test_payload_too_large(self):
+        with self.settings(SENTRY_MAX_EVENT_PAYLOAD_SIZE=len(self.payload) - 1):
+            with self.assertRaises(APIPayloadTooLarge):
+                self.helper.decompress_deflate(zlib.compress(self.payload))
+            with self.assertRaises(APIPayloadTooLarge):
+                self.helper.decode_and_decompress_data(base64.b64encode(self.payload))
+
+        with self.settings(SENTRY_MAX_EVENT_PAYLOAD_SIZE=1024 * 1024):
+            with self.assertRaises(APIPayloadTooLarge):
+                self.helper.decompress_deflate(zlib.compress(b'\0' * 1024 * 1024 * 10))
+
+
 class DecodeDataTest(BaseAPITest):
     def test_valid_data(self):
         data = self.helper.decode_data('foo')
@@ -518,6 +556,14 @@ class DecodeDataTest(BaseAPITest):
         with self.assertRaises(APIError):
             self.helper.decode_data('\x99')
 
+    @mock.patch('sentry.coreapi._json_loads_bytes', False)
+    def test_invalid_payload(self):
+        data = LazyData(b'{"message": "\x99"}', None, self.helper,
+                        self.project, self.pk, None, None)
+        with pytest.raises(APIError) as excinfo:
+            data['message']
+        assert excinfo.value.msg.startswith('Bad data decoding request')
+
 
 class GetInterfaceTest(TestCase):
     def test_does_not_let_through_disallowed_name(self):
@@ -0,0 +1,126 @@
+from __future__ import absolute_import
+
+import time
+
+from mock import Mock, patch
+
+from sentry.db.models import manager
+from sentry.db.models.localcache import LocalModelCache
+from sentry.models import Organization
+from sentry.testutils import TestCase
+from sentry.utils import redis
+
+
+class GetManyFromCacheTest(TestCase):
+    def test_by_pk(self):
+        foo = self.create_organization(slug='foo')
+        bar = self.create_organization(slug='bar')
+
+        assert Organization.objects.get_many_from_cache([bar.id, foo.id, 0]) == [bar, foo]
+        assert Organization.objects.get_many_from_cache([str(foo.id)]) == [foo]
+
+    def test_by_cache_field(self):
+        foo = self.create_organization(slug='foo')
+        bar = self.create_organization(slug='bar')
+
+        assert Organization.objects.get_many_from_cache(
+            ['bar', 'missing', 'foo'],
+            key='slug',
+        ) == [bar, foo]
+
+    def test_uncached_field(self):
+        foo = self.create_organization(name='foo')
+
+        assert Organization.objects.get_many_from_cache(['foo'], key='name') == [foo]
+
+
+class LocalModelCacheTest(TestCase):
+    def setUp(self):
+        super(LocalModelCacheTest, self).setUp()
+        client = redis.clusters.get('default').get_local_client(0)
+        self.cache = LocalModelCache(client, 'sentry.modelcache.test', retry_interval=0.1)
+
+    def wait_until_subscribed(self, cache=None):
+        cache = cache or self.cache
+        for _ in range(50):
+            generation = cache.generation
+            cache.set('key', 'value', generation)
+            if cache.get('key') == 'value':
+                return
+            time.sleep(0.1)
+        raise AssertionError('local model cache did not subscribe')
+
+    def wait_for_eviction(self, cache, generation, timeout=5.0):
+        for _ in range(int(timeout * 10)):
+            if cache.generation != generation:
+                return True
+            time.sleep(0.1)
+        return False
+
+    def test_set_and_invalidate(self):
+        self.wait_until_subscribed()
+
+        other = LocalModelCache(self.cache.client, self.cache.channel)
+        other.invalidate(['key'])
+        for _ in range(50):
+            if self.cache.get('key') is None:
+                break
+            time.sleep(0.1)
+        else:
+            raise AssertionError('key was not invalidated')
+
+    def test_stale_generation(self):
+        self.wait_until_subscribed()
+
+        generation = self.cache.generation
+        self.cache.invalidate(['other'])
+        self.cache.set('stale', 'value', generation)
+        assert self.cache.get('stale') is None
+
+    def test_ttl(self):
+        self.wait_until_subscribed()
+
+        self.cache.ttl = -1
+        self.cache.set('expired', 'value', self.cache.generation)
+        assert self.cache.get('expired') is None
+
+    def test_publish_error(self):
+        self.wait_until_subscribed()
+
+        self.cache.client = Mock()
+        self.cache.client.publish.side_effect = Exception('boom')
+        self.cache.invalidate(['key'])
+        assert self.cache.get('key') is None
+
+    def test_eviction_after_shared_cache_update(self):
+        # ``other`` plays the part of another process.
+        other = LocalModelCache(self.cache.client, self.cache.channel)
+        self.wait_until_subscribed()
+        self.wait_until_subscribed(other)
+
+        org = self.create_organization(slug='foo')
+        cache_key = Organization.objects._BaseManager__get_lookup_cache_key(id=org.id)
+        cache_version = Organization.objects.cache_version
+        set_shared = manager.cache.set
+        reads = []
+
+        def set_and_read(key, *args, **kwargs):
+            if key == cache_key and not reads:
+                # The other process reads the shared cache between the
+                # eviction and the update, if the eviction came first.
+                generation = other.generation
+                self.wait_for_eviction(other, generation, timeout=0.5)
+                reads.append((other.generation, manager.cache.get(key, version=cache_version)))
+            return set_shared(key, *args, **kwargs)
+
+        with patch.object(manager, 'get_local_cache', return_value=self.cache), \
+                patch.object(manager.cache, 'set', side_effect=set_and_read):
+            org.update(slug='bar')
+
+        generation, stale = reads[0]
+        assert stale.slug == 'foo'
+        assert self.wait_for_eviction(other, generation)
+
+        # the value read before the update must not be kept locally
+        other.set(cache_key, stale, generation)
+        assert other.get(cache_key) is None
@@ -41,3 +41,19 @@ class BulkDeleteQueryTest(TestCase):
         assert not Group.objects.filter(id=group1_1.id).exists()
         assert not Group.objects.filter(id=group1_2.id).exists()
         assert Group.objects.filter(id=group1_3.id).exists()
+
+    def test_returning(self):
+        project1 = self.create_project()
+        group1_1 = self.create_group(project1)
+        group1_2 = self.create_group(project1)
+        project2 = self.create_project()
+        self.create_group(project2)
+        rows = []
+        BulkDeleteQuery(
+            model=Group,
+            project_id=project1.id,
+        ).execute(chunk_size=1, returning=('id', 'project'), callback=rows.extend)
+        assert sorted(rows) == [
+            (group1_1.id, project1.id),
+            (group1_2.id, project1.id),
+        ]
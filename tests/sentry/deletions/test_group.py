@@ -1,12 +1,14 @@
 from __future__ import absolute_import
 
+from mock import patch
 from uuid import uuid4
 
-from sentry import tagstore
+from sentry import tagindex, tagstore
 from sentry.models import (
     Event, EventMapping, Group, GroupAssignee, GroupHash, GroupMeta, GroupRedirect,
     ScheduledDeletion
 )
+from sentry.tagindex.redis import RedisTagIndex
 from sentry.tasks.deletion import run_deletion
 from sentry.testutils import TestCase
 
@@ -67,3 +69,21 @@ class DeleteGroupTest(TestCase):
         assert not GroupRedirect.objects.filter(group_id=group.id).exists()
         assert not GroupHash.objects.filter(group_id=group.id).exists()
         assert not Group.objects.filter(id=group.id).exists()
+
+    def test_tag_index(self):
+        project = self.create_project()
+        group = self.create_group(project=project)
+        other_group = self.create_group(project=project)
+
+        tag_index = RedisTagIndex()
+        tag_index.rebuild(project.id)
+        tag_index.index_group_tags(project.id, group.id, [('foo', 'bar')])
+        tag_index.index_group_tags(project.id, other_group.id, [('foo', 'bar')])
+
+        deletion = ScheduledDeletion.schedule(group, days=0)
+        deletion.update(in_progress=True)
+
+        with patch.object(tagindex.backend, '_wrapped', tag_index), self.tasks():
+            run_deletion(deletion.id)
+
+        assert tag_index.get_group_ids(project.id, {'foo': 'bar'}) == set([other_group.id])
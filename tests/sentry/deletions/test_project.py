@@ -1,10 +1,14 @@
 from __future__ import absolute_import
 
+from mock import patch
+
+from sentry import tagindex
 from sentry.models import (
     Commit, CommitAuthor, Environment, EnvironmentProject, GroupAssignee, GroupMeta,
     GroupResolution, Project, Release, ReleaseCommit, Repository, ScheduledDeletion,
     ProjectDSymFile, File
 )
+from sentry.tagindex.redis import RedisTagIndex
 from sentry.tasks.deletion import run_deletion
 from sentry.testutils import TestCase
 
@@ -74,3 +78,22 @@ class DeleteProjectTest(TestCase):
         assert Commit.objects.filter(id=commit.id).exists()
         assert not ProjectDSymFile.objects.filter(id=dsym_file.id).exists()
         assert not File.objects.filter(id=file.id).exists()
+
+    def test_tag_index(self):
+        project = self.create_project()
+        group = self.create_group(project=project)
+
+        tag_index = RedisTagIndex()
+        tag_index.rebuild(project.id)
+        tag_index.index_group_tags(project.id, group.id, [('foo', 'bar')])
+
+        deletion = ScheduledDeletion.schedule(project, days=0)
+        deletion.update(in_progress=True)
+
+        with patch.object(tagindex.backend, '_wrapped', tag_index), self.tasks():
+            run_deletion(deletion.id)
+
+        with patch('sentry.tasks.tagindex.rebuild_tag_index.apply_async'):
+            assert tag_index.get_group_ids(project.id, {'foo': 'bar'}) is None
+        tag_index.rebuild(project.id)
+        assert tag_index.get_group_ids(project.id, {'foo': 'bar'}) == set()
@@ -1,7 +1,11 @@
 from __future__ import absolute_import
 
-from sentry import tagstore
+from mock import patch
+
+from sentry import tagindex, tagstore
 from sentry.models import ScheduledDeletion
+from sentry.search.base import ANY
+from sentry.tagindex.redis import RedisTagIndex
 from sentry.tasks.deletion import run_deletion
 from sentry.testutils import TestCase
 
@@ -94,3 +98,25 @@ class DeleteTagKeyTest(TestCase):
             group2.project_id, group2.id, None, key, value) is not None
         assert tagstore.get_event_tag_qs(key_id=tk.id).exists()
         assert tagstore.get_event_tag_qs(key_id=tk2.id).exists()
+
+    def test_tag_index(self):
+        project = self.create_project()
+        group = self.create_group(project=project)
+        tk = tagstore.create_tag_key(
+            key='foo',
+            project_id=project.id,
+            environment_id=self.environment.id)
+
+        tag_index = RedisTagIndex()
+        tag_index.rebuild(project.id)
+        tag_index.index_group_tags(project.id, group.id, [('foo', 'bar'), ('baz', 'qux')])
+
+        deletion = ScheduledDeletion.schedule(tk, days=0)
+        deletion.update(in_progress=True)
+
+        with patch.object(tagindex.backend, '_wrapped', tag_index), self.tasks():
+            run_deletion(deletion.id)
+
+        assert tag_index.get_group_ids(project.id, {'foo': 'bar'}) == set()
+        assert tag_index.get_group_ids(project.id, {'foo': ANY}) == set()
+        assert tag_index.get_group_ids(project.id, {'baz': 'qux'}) == set([group.id])
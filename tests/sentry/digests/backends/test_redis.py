@@ -3,6 +3,8 @@ from __future__ import absolute_import
 import pytest
 import time
 
+from mock import patch
+
 from sentry.digests import Record
 from sentry.digests.backends.base import InvalidState
 from sentry.digests.backends.redis import RedisBackend
@@ -117,6 +119,25 @@ class RedisBackendTestCase(TestCase):
             expected_keys = set('record:{}'.format(i) for i in xrange(10, 20))
             assert set(record.key for record in records) == expected_keys
 
+    def test_schedule_partition_timeout(self):
+        backend = RedisBackend(partition_timeout=0.1)
+        backend.add('timeline', Record('record:1', 'value', time.time()))
+        with backend.digest('timeline', 0):
+            pass
+
+        def slow_schedule(host, deadline, timestamp):
+            time.sleep(1)
+            return []
+
+        with patch.object(backend, '_RedisBackend__schedule_partition', side_effect=slow_schedule):
+            start = time.time()
+            assert set(backend.schedule(time.time())) == set()
+            assert time.time() - start < 1
+
+        # The partition still gets a chance on the next pass.
+        time.sleep(1)
+        assert set(entry.key for entry in backend.schedule(time.time())) == set(['timeline'])
+
     def test_delete(self):
         backend = RedisBackend()
         backend.add('timeline', Record('record:1', 'value', time.time()))
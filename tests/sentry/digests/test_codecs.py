@@ -0,0 +1,32 @@
+from __future__ import absolute_import
+
+from sentry.digests.codecs import CompactNotificationCodec, CompressedPickleCodec
+from sentry.digests.notifications import EventReference, Notification, event_to_record
+from sentry.testutils import TestCase
+from sentry.utils.dates import to_timestamp
+
+
+class CompactNotificationCodecTestCase(TestCase):
+    codec = CompactNotificationCodec()
+
+    def test_notification(self):
+        rule = self.event.project.rule_set.all()[0]
+        record = event_to_record(self.event, (rule, ))
+
+        assert self.codec.decode(self.codec.encode(record.value)) == Notification(
+            EventReference(
+                self.event.event_id,
+                self.event.group_id,
+                to_timestamp(self.event.datetime),
+            ),
+            [rule.id],
+        )
+
+    def test_other_values(self):
+        assert self.codec.decode(self.codec.encode('value')) == 'value'
+
+    def test_legacy_values(self):
+        notification = Notification(self.event, [1, 2])
+        value = self.codec.decode(CompressedPickleCodec().encode(notification))
+        assert value.event.event_id == self.event.event_id
+        assert value.rules == [1, 2]
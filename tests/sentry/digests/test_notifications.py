@@ -11,6 +11,8 @@ from sentry.digests import Record
 from sentry.digests.notifications import (
     Notification,
     event_to_record,
+    fetch_events,
+    to_event_reference,
     rewrite_record,
     group_records,
     sort_group_contents,
@@ -75,6 +77,23 @@ class RewriteRecordTestCase(TestCase):
         )
 
 
+class FetchEventsTestCase(TestCase):
+    def test_success(self):
+        event = self.create_event(group=self.group, data={'foo': 'bar'})
+        records = [
+            Record('a', Notification(to_event_reference(event), [1]), 0),
+            Record('b', Notification(to_event_reference(self.event), [2]), 1),
+            # The event for this record doesn't exist, so it should be dropped.
+            Record('c', Notification(to_event_reference(event)._replace(event_id='f' * 32), [3]), 2),
+        ]
+
+        result = fetch_events(self.project, records)
+        assert [record.key for record in result] == ['a', 'b']
+        assert [record.value.event.id for record in result] == [event.id, self.event.id]
+        assert [record.value.rules for record in result] == [[1], [2]]
+        assert result[0].value.event.data['foo'] == 'bar'
+
+
 class GroupRecordsTestCase(TestCase):
     @fixture
     def rule(self):
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+import copy
+import mock
+import os
+import uuid
+
+import jsonschema
+
+from sentry.constants import DATA_ROOT
+from sentry.interfaces.schema_compiler import CompiledValidator
+from sentry.interfaces.schemas import (
+    INTERFACE_SCHEMAS, SCHEMA_TYPES, validate_and_default_interface, validator_for_interface
+)
+from sentry.testutils import TestCase
+from sentry.utils import json
+
+INVALID_INSTANCES = [
+    None,
+    True,
+    1,
+    -1.5,
+    u'',
+    u'foo\n',
+    [],
+    [u'a', u'b'],
+    (u'a', u'b'),
+    [[u'a', u'b'], [u'release', u'1.0'], [u'a'], [u'', u'b'], [u'a b', u'x' * 300]],
+    {},
+    {u'frames': []},
+    {u'frames': [{}], u'frames_omitted': [1, u'2'], u'bogus': 1},
+    {u'name': u'', u'version': 1, u'data': None},
+    {u'type': None, u'value': u'Error', u'stacktrace': {u'frames': {}}},
+    {u'url': u'', u'cookies': [[u'a']], u'headers': 1, u'data': 1},
+    {u'abs_path': 1, u'in_app': u'yes', u'platform': u'bogus', u'vars': 1, u'x': 2},
+    {u'release': u'1.0', u'foo': u'bar', u'a b': u'c', u'x' * 40: u'y'},
+    {
+        u'event_id': u'zz',
+        u'logger': u'a b',
+        u'platform': u'bogus',
+        u'level': u'x',
+        u'timestamp': [],
+        u'time_spent': -1,
+        u'dist': u'?',
+        u'tags': 1,
+        u'fingerprint': [1],
+        u'environment': u'x' * 65,
+    },
+]
+
+
+def get_sample_events():
+    path = os.path.join(DATA_ROOT, 'samples')
+    for filename in sorted(os.listdir(path)):
+        if filename.endswith('.json'):
+            with open(os.path.join(path, filename)) as f:
+                yield json.loads(f.read())
+
+
+def get_error_details(error):
+    return (
+        list(error.path),
+        list(error.schema_path),
+        error.validator,
+        error.validator_value,
+        error.instance,
+        error.schema,
+        error.message,
+        [get_error_details(e) for e in error.context],
+    )
+
+
+class CompiledValidatorTest(TestCase):
+    def assert_same_errors(self, schema, instance):
+        expected = jsonschema.Draft4Validator(schema, types=SCHEMA_TYPES)
+        compiled = CompiledValidator(schema, types=SCHEMA_TYPES)
+        assert [get_error_details(e) for e in compiled.iter_errors(instance)] == \
+            [get_error_details(e) for e in expected.iter_errors(instance)]
+        assert compiled.is_valid(instance) == expected.is_valid(instance)
+
+    def test_interface_schemas_are_compiled(self):
+        for name in INTERFACE_SCHEMAS:
+            assert isinstance(validator_for_interface(name), CompiledValidator)
+
+    def test_matches_draft4_on_samples(self):
+        for data in get_sample_events():
+            for name, schema in INTERFACE_SCHEMAS.items():
+                self.assert_same_errors(schema, data)
+                if name in data:
+                    self.assert_same_errors(schema, data[name])
+
+    def test_matches_draft4_on_invalid_data(self):
+        for name, schema in INTERFACE_SCHEMAS.items():
+            for instance in INVALID_INSTANCES:
+                self.assert_same_errors(schema, instance)
+
+    def test_matches_draft4_defaulting(self):
+        def normalize(name, instance):
+            data = copy.deepcopy(instance)
+            try:
+                result = validate_and_default_interface(data, name)
+            except Exception as e:
+                result = type(e)
+            return result, data
+
+        for name, schema in INTERFACE_SCHEMAS.items():
+            for instance in INVALID_INSTANCES:
+                with mock.patch('uuid.uuid4', return_value=uuid.UUID(int=1)):
+                    compiled = normalize(name, instance)
+                    with mock.patch('sentry.interfaces.schemas.validator_for_interface',
+                                    return_value=jsonschema.Draft4Validator(
+                                        schema, types=SCHEMA_TYPES)):
+                        expected = normalize(name, instance)
+                assert compiled == expected
@@ -9,7 +9,9 @@ from django.template.loader import render_to_string
 from exam import fixture
 
 from sentry.interfaces.base import InterfaceValidationError
-from sentry.interfaces.stacktrace import (Frame, Stacktrace, get_context, is_url, slim_frame_data)
+from sentry.interfaces.stacktrace import (
+    CompactFrame, CompactStacktrace, Frame, Stacktrace, get_context, is_url, slim_frame_data
+)
 from sentry.models import Event
 from sentry.testutils import TestCase
 
@@ -769,6 +771,62 @@ class StacktraceTest(TestCase):
         assert interface.image_addr == '0x0'
 
 
+class CompactStacktraceTest(TestCase):
+    @fixture
+    def interface(self):
+        return Stacktrace.to_python(
+            dict(
+                frames=[
+                    {
+                        'function': 'main',
+                        'package': '/usr/lib/libfoo.dylib',
+                        'instruction_addr': '0x1000',
+                        'symbol_addr': '0x0f00',
+                        'in_app': False,
+                    }, {
+                        'filename': 'foo.py',
+                        'module': 'foo',
+                        'function': 'bar',
+                        'lineno': 2,
+                        'context_line': 'return x',
+                        'vars': {'x': 1},
+                        'in_app': True,
+                    }
+                ]
+            )
+        )
+
+    def test_is_cached(self):
+        compact = self.interface.get_compact()
+        assert isinstance(compact, CompactStacktrace)
+        assert self.interface.get_compact() is compact
+        assert '_compact' not in self.interface.to_json()
+
+    def test_frames(self):
+        frames = self.interface.get_compact().frames
+        assert len(frames) == 2
+        assert all(isinstance(f, CompactFrame) for f in frames)
+        assert not hasattr(frames[0], '__dict__')
+        for frame, compact_frame in zip(self.interface.frames, frames):
+            assert compact_frame.function == frame.function
+            assert compact_frame.in_app == frame.in_app
+            assert compact_frame.get_hash('python') == frame.get_hash('python')
+            assert compact_frame.get_api_context() == frame.get_api_context()
+
+    def test_matches_frame_based_stacktrace(self):
+        # A ``CompactStacktrace`` over the interface's own frames behaves like
+        # the dict-backed representation did.
+        compact = self.interface.get_compact()
+        dict_backed = CompactStacktrace(
+            frames=self.interface.frames,
+            frames_omitted=self.interface.frames_omitted,
+            registers=self.interface.registers,
+        )
+        assert compact.compute_hashes('cocoa') == dict_backed.compute_hashes('cocoa')
+        assert compact.get_api_context() == dict_backed.get_api_context()
+        assert self.interface.get_culprit_string('python') == 'foo in bar'
+
+
 class SlimFrameDataTest(TestCase):
     def test_under_max(self):
         interface = Stacktrace.to_python({'frames': [{'filename': 'foo'}]})
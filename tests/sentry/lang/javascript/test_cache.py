@@ -1,7 +1,7 @@
 from __future__ import absolute_import
 
 from sentry.testutils import TestCase
-from sentry.lang.javascript.cache import SourceCache
+from sentry.lang.javascript.cache import SourceCache, SourceIndex
 
 
 class BasicCacheTest(TestCase):
@@ -38,3 +38,59 @@ class BasicCacheTest(TestCase):
         # fall back to utf-8
         cache.add(url, 'foobar'.encode('utf-32'), encoding='utf-32')
         assert cache.get(url)[0] == u'foobar'
+
+    def test_get_index(self):
+        cache = SourceCache()
+        url = 'http://example.com/foo.js'
+
+        assert cache.get_index(url) is None
+
+        cache.add(url, u'foo\nb\xe4r'.encode('latin-1'), encoding='latin-1')
+        index = cache.get_index(url)
+        assert index[:] == [u'foo', u'b\xe4r']
+        assert cache.get_index(url) is index
+
+        cache.add(url, b'baz')
+        assert cache.get_index(url)[:] == [u'baz']
+
+    def test_source_is_not_copied(self):
+        cache = SourceCache()
+        url = 'http://example.com/foo.js'
+        source = b'foo\nbar'
+
+        cache.add(url, source)
+        assert cache.get_index(url).source is source
+        assert cache._cache == {}
+
+        # The source view is only created for sourcemap lookups.
+        assert cache.get(url)[1] == u'bar'
+        assert cache.get(url) is cache.get(url)
+        assert cache.get_index(url).source is source
+
+
+class SourceIndexTest(TestCase):
+    def test_lines(self):
+        source = u'foo\r\nb\xe4r\rbaz\n\n\u2603\n'.encode('utf-8')
+        index = SourceIndex(source)
+        assert not index.is_ascii
+        assert len(index) == 6
+        assert index[:] == [u'foo', u'b\xe4r', u'baz', u'', u'\u2603', u'']
+        assert index[1] == u'b\xe4r'
+        assert index[2:4] == [u'baz', u'']
+        assert index.get_line_length(1) == 3
+        assert index.get_line_slice(1, 1, 10) == u'\xe4r'
+        assert index.get_line_length(4) == 1
+        with self.assertRaises(IndexError):
+            index[6]
+        with self.assertRaises(IndexError):
+            index.get_line_length(-1)
+
+    def test_ascii(self):
+        index = SourceIndex(b'foo\nbarbaz')
+        assert index.is_ascii
+        assert index[:] == [u'foo', u'barbaz']
+        assert index.get_line_length(1) == 6
+        assert index.get_line_slice(1, 2, 5) == u'rba'
+        assert index.get_line_slice(1, 4, 100) == u'az'
+        with self.assertRaises(IndexError):
+            index.get_line_slice(2, 0, 1)
@@ -16,10 +16,13 @@ from sentry.lang.javascript.processor import (
     fetch_sourcemap,
     fetch_file,
     generate_module,
+    get_source_context,
     trim_line,
+    trim_source_line,
     fetch_release_file,
     UnparseableSourcemap,
 )
+from sentry.lang.javascript.cache import SourceIndex
 from sentry.lang.javascript.errormapping import (rewrite_exception, REACT_MAPPING_URL)
 from sentry.models import File, Release, ReleaseFile, EventError
 from sentry.testutils import TestCase
@@ -165,6 +168,81 @@ class FetchReleaseFileTest(TestCase):
             'utf-8',
         )
 
+    def test_manifest(self):
+        project = self.project
+        release = Release.objects.create(
+            organization_id=project.organization_id,
+            version='abc',
+        )
+        release.add_project(project)
+
+        file = File.objects.create(
+            name='file.min.js',
+            type='release.file',
+            headers={'Content-Type': 'application/json; charset=utf-8'},
+        )
+        file.putfile(six.BytesIO(unicode_body.encode('utf-8')))
+
+        assert fetch_release_file('file.min.js', release) is None
+
+        releasefile = ReleaseFile.objects.create(
+            name='file.min.js',
+            release=release,
+            organization_id=project.organization_id,
+            file=file,
+        )
+
+        # Saving the artifact invalidates the manifest
+        assert fetch_release_file('file.min.js', release) is not None
+
+        # Both hits and misses are answered by the cached manifest
+        dist = release.add_dist('foo')
+        with self.assertNumQueries(0):
+            assert fetch_release_file('file.min.js', release) is not None
+            assert fetch_release_file('other.min.js', release) is None
+            assert fetch_release_file('file.min.js', release, dist) is None
+
+        releasefile.delete()
+        assert fetch_release_file('file.min.js', release) is None
+
+    def test_deleted_file(self):
+        project = self.project
+        release = Release.objects.create(
+            organization_id=project.organization_id,
+            version='abc',
+        )
+        release.add_project(project)
+
+        body = unicode_body.encode('utf-8')
+        file = File.objects.create(name='file.min.js', type='release.file')
+        file.putfile(six.BytesIO(body))
+        releasefile = ReleaseFile.objects.create(
+            name='file.min.js',
+            release=release,
+            organization_id=project.organization_id,
+            file=file,
+        )
+        ReleaseFile.objects.get_manifest(release)
+
+        # Deleted in another process, so the manifest here is stale.
+        with patch.object(ReleaseFile.objects, 'clear_manifest'):
+            releasefile.delete()
+            file.delete()
+
+        assert fetch_release_file('file.min.js', release) is None
+
+        # Uploading the same contents again is not affected by the failure.
+        file = File.objects.create(name='file.min.js', type='release.file')
+        file.putfile(six.BytesIO(body))
+        ReleaseFile.objects.create(
+            name='file.min.js',
+            release=release,
+            organization_id=project.organization_id,
+            file=file,
+        )
+
+        assert fetch_release_file('file.min.js', release).body == body
+
 
 class FetchFileTest(TestCase):
     @responses.activate
@@ -450,6 +528,33 @@ class TrimLineTest(TestCase):
             self.long_line, column=9999
         ) == '{snip} gn. It is, in effect, conditioned to prefer bad design, because that is what it lives with. The new becomes threatening, the old reassuring.'
 
+    def test_source_line(self):
+        for long_line in (self.long_line, self.long_line.replace('design', u'd\xe9sign')):
+            source = SourceIndex(u'foo\n{}\n'.format(long_line).encode('utf-8'))
+            assert trim_source_line(source, 0) == u'foo'
+            assert trim_source_line(source, 2) == u''
+            for column in (0, 10, 66, 190, 9999):
+                assert trim_source_line(source, 1, column) == trim_line(long_line, column)
+
+
+class GetSourceContextTest(TestCase):
+    def test_simple(self):
+        # Line numbers are 1-indexed.
+        source = SourceIndex(b'\n'.join(b'line %d' % i for i in range(1, 21)))
+        assert get_source_context(source, 10, 0) == (
+            [u'line 5', u'line 6', u'line 7', u'line 8', u'line 9'],
+            u'line 10',
+            [u'line 11', u'line 12', u'line 13', u'line 14', u'line 15'],
+        )
+        assert get_source_context(source, 1, 0) == (
+            None, u'line 1', [u'line 2', u'line 3', u'line 4', u'line 5', u'line 6'],
+        )
+        assert get_source_context(source, 20, 0) == (
+            [u'line 15', u'line 16', u'line 17', u'line 18', u'line 19'], u'line 20', None,
+        )
+        assert get_source_context(source, 23, 0) == ([u'line 18', u'line 19', u'line 20'], u'', None)
+        assert get_source_context(None, 10, 0) == (None, None, None)
+
 
 def test_get_culprit_is_patched():
     from sentry.lang.javascript.plugin import fix_culprit, generate_modules
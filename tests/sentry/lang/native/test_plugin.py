@@ -1037,7 +1037,7 @@ class InAppHonoringResolvingIntegrationTest(TestCase):
 
 
 class RealResolvingIntegrationTest(TestCase):
-    def test_real_resolving(self):
+    def upload_dsym(self):
         url = reverse(
             'sentry-api-0-dsym-files',
             kwargs={
@@ -1064,6 +1064,7 @@ class RealResolvingIntegrationTest(TestCase):
         assert response.status_code == 201, response.content
         assert len(response.data) == 1
 
+    def post_event(self):
         event_data = {
             "project": self.project.id,
             "platform": "cocoa",
@@ -1106,7 +1107,14 @@ class RealResolvingIntegrationTest(TestCase):
         resp = self._postWithHeader(event_data)
         assert resp.status_code == 200
 
-        event = Event.objects.get()
+        return Event.objects.get()
+
+    def test_real_resolving(self):
+        # Symcaches are built by a task on upload.
+        with self.tasks():
+            self.upload_dsym()
+
+        event = self.post_event()
 
         bt = event.interfaces['sentry.interfaces.Exception'].values[0].stacktrace
         frames = bt.frames
@@ -1115,3 +1123,20 @@ class RealResolvingIntegrationTest(TestCase):
         assert frames[0].filename == 'hello.c'
         assert frames[0].abs_path == '/tmp/hello.c'
         assert frames[0].lineno == 1
+
+    @patch('sentry.tasks.symcache_update.symcache_update.delay')
+    def test_pending_symcache(self, symcache_update):
+        self.upload_dsym()
+        symcache_update.assert_called_once_with(
+            project_id=self.project.id,
+            uuids=['502fc0a5-1ec1-3e47-9998-684fa139dca7'],
+        )
+
+        event = self.post_event()
+
+        bt = event.interfaces['sentry.interfaces.Exception'].values[0].stacktrace
+        assert bt.frames[0].function == 'unknown'
+        assert [e['type'] for e in event.data['errors']] == ['native_symcache_pending']
+
+        # The update was already enqueued on upload.
+        assert symcache_update.call_count == 1
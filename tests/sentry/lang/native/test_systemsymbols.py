@@ -0,0 +1,70 @@
+from __future__ import absolute_import
+
+from mock import patch
+
+from sentry.lang.native import systemsymbols
+from sentry.lang.native.systemsymbols import lookup_system_symbols
+from sentry.testutils import TestCase
+from sentry.testutils.helpers import override_options
+
+SDK_INFO = {
+    'sdk_name': 'iOS',
+    'version_major': 10,
+    'version_minor': 3,
+    'version_patchlevel': 0,
+}
+
+
+def make_symbol(addr):
+    return {
+        'object_uuid': 'c0bcc3f1-9827-3e5c-bd49-ab6e4ea6bd21',
+        'object_name': '/usr/lib/system/libdyld.dylib',
+        'addr': addr,
+    }
+
+
+def query(symbols, sdk_id, cpu_name):
+    return [
+        {'symbol': 'sym_%s' % s['addr']} if s['addr'] != '0x0' else None
+        for s in symbols
+    ]
+
+
+class LookupSystemSymbolsTest(TestCase):
+    def lookup(self, addrs):
+        with override_options({'symbolserver.enabled': True}):
+            return lookup_system_symbols(
+                [make_symbol(addr) for addr in addrs],
+                SDK_INFO,
+                'arm64',
+            )
+
+    def test_results_are_cached(self):
+        with patch.object(systemsymbols, '_query_system_symbols', side_effect=query) as mock:
+            assert self.lookup(['0x0', '0x1', '0x1']) == [
+                None,
+                {'symbol': 'sym_0x1'},
+                {'symbol': 'sym_0x1'},
+            ]
+            assert mock.call_count == 1
+            assert len(mock.call_args[0][0]) == 2
+
+            # Symbols that were not found are cached as well.
+            assert self.lookup(['0x1', '0x0']) == [{'symbol': 'sym_0x1'}, None]
+            assert mock.call_count == 1
+
+            # The results are shared with other processes.
+            systemsymbols.clear_local_cache()
+            assert self.lookup(['0x0', '0x1', '0x2']) == [
+                None,
+                {'symbol': 'sym_0x1'},
+                {'symbol': 'sym_0x2'},
+            ]
+            assert mock.call_count == 2
+            assert mock.call_args[0][0] == [make_symbol('0x2')]
+
+    def test_failures_are_not_cached(self):
+        with patch.object(systemsymbols, '_query_system_symbols', return_value=None) as mock:
+            assert self.lookup(['0x1']) is None
+            assert self.lookup(['0x1']) is None
+            assert mock.call_count == 2
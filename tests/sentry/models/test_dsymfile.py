@@ -1,6 +1,8 @@
 from __future__ import absolute_import
 
 import os
+import shutil
+import tempfile
 import time
 import uuid
 import zipfile
@@ -9,8 +11,10 @@ from six import BytesIO, text_type
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.core.urlresolvers import reverse
 
-from sentry.testutils import APITestCase
+from sentry.testutils import APITestCase, TestCase
+from sentry.testutils.helpers import override_options
 from sentry.models import ProjectDSymFile
+from sentry.models.dsymfile import create_files_from_dsym_zip
 
 # This is obviously a freely generated UUID and not the checksum UUID.
 # This is permissible if users want to send different UUIDs
@@ -23,6 +27,15 @@ org.slf4j.helpers.Util$ClassContextSecurityManager -> org.a.b.g$a:
 '''
 
 
+def make_proguard_zip():
+    out = BytesIO()
+    f = zipfile.ZipFile(out, 'w')
+    f.writestr('proguard/%s.txt' % PROGUARD_UUID, PROGUARD_SOURCE)
+    f.close()
+    out.seek(0)
+    return out
+
+
 class DSymFilesClearTest(APITestCase):
     def test_simple_cache_clear(self):
         project = self.create_project(name='foo')
@@ -82,3 +95,75 @@ class DSymFilesClearTest(APITestCase):
 
         # But it's gone now
         assert not os.path.isfile(dsyms[PROGUARD_UUID])
+
+
+class DSymCacheHandlesTest(TestCase):
+    def test_proguard_mappings_are_pooled(self):
+        project = self.create_project(name='foo')
+        dsymcache = ProjectDSymFile.dsymcache
+
+        assert dsymcache.get_proguard_mappings(project, [PROGUARD_UUID]) == {}
+
+        create_files_from_dsym_zip(make_proguard_zip(), project=project)
+
+        # The missing mapping is remembered until it is uploaded in this
+        # process.
+        views = dsymcache.get_proguard_mappings(project, [PROGUARD_UUID])
+        assert list(views) == [PROGUARD_UUID]
+
+        with self.assertNumQueries(0):
+            again = dsymcache.get_proguard_mappings(project, [PROGUARD_UUID])
+        assert again[PROGUARD_UUID] is views[PROGUARD_UUID]
+
+
+class DSymCacheFilesTest(TestCase):
+    def setUp(self):
+        self.cache_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_path)
+
+    def test_files_are_shared_between_projects(self):
+        dsymcache = ProjectDSymFile.dsymcache
+        project = self.create_project(name='foo')
+        other_project = self.create_project(name='bar')
+        create_files_from_dsym_zip(make_proguard_zip(), project=project)
+        create_files_from_dsym_zip(make_proguard_zip(), project=other_project)
+
+        with override_options({'dsym.cache-path': self.cache_path}):
+            path = dsymcache.fetch_dsyms(project, [PROGUARD_UUID])[PROGUARD_UUID]
+            other_path = dsymcache.fetch_dsyms(other_project, [PROGUARD_UUID])[PROGUARD_UUID]
+
+        assert path == other_path
+        assert path.startswith(os.path.join(self.cache_path, 'objects'))
+        with open(path, 'rb') as f:
+            assert f.read() == PROGUARD_SOURCE
+
+    def test_least_recently_used_files_are_evicted(self):
+        dsymcache = ProjectDSymFile.dsymcache
+        project = self.create_project(name='foo')
+        other_project = self.create_project(name='bar')
+        create_files_from_dsym_zip(make_proguard_zip(), project=project)
+        other_zip = BytesIO()
+        f = zipfile.ZipFile(other_zip, 'w')
+        f.writestr('proguard/%s.txt' % PROGUARD_UUID, PROGUARD_SOURCE + b'\n')
+        f.close()
+        other_zip.seek(0)
+        create_files_from_dsym_zip(other_zip, project=other_project)
+
+        with override_options({'dsym.cache-path': self.cache_path}):
+            path = dsymcache.fetch_dsyms(project, [PROGUARD_UUID])[PROGUARD_UUID]
+            other_path = dsymcache.fetch_dsyms(other_project, [PROGUARD_UUID])[PROGUARD_UUID]
+            os.utime(path, (time.time() - 3600, time.time() - 3600))
+
+            # Both files fit into the budget
+            dsymcache.clear_old_entries()
+            assert os.path.isfile(path)
+            assert os.path.isfile(other_path)
+
+            with override_options({'dsym.cache-size': len(PROGUARD_SOURCE) + 1}):
+                dsymcache.clear_old_entries()
+            assert not os.path.isfile(path)
+            assert os.path.isfile(other_path)
+
+            # Using an evicted file fetches it again
+            assert dsymcache.fetch_dsyms(project, [PROGUARD_UUID])[PROGUARD_UUID] == path
+            assert os.path.isfile(path)
@@ -37,3 +37,17 @@ class OrganizationOptionManagerTest(TestCase):
         OrganizationOption.objects.create(organization=self.organization, key='foo', value='bar')
         result = OrganizationOption.objects.get_value_bulk([self.organization], 'foo')
         assert result == {self.organization: 'bar'}
+
+    def test_get_all_values_bulk(self):
+        other = self.create_organization()
+        OrganizationOption.objects.create(organization=self.organization, key='foo', value='bar')
+
+        assert OrganizationOption.objects.get_all_values_bulk([self.organization, other.id]) == {
+            self.organization.id: {'foo': 'bar'},
+            other.id: {},
+        }
+
+        with self.assertNumQueries(0):
+            assert OrganizationOption.objects.get_all_values_bulk([self.organization]) == {
+                self.organization.id: {'foo': 'bar'},
+            }
@@ -35,3 +35,26 @@ class ProjectOptionManagerTest(TestCase):
         ProjectOption.objects.create(project=self.project, key='foo', value='bar')
         result = ProjectOption.objects.get_value_bulk([self.project], 'foo')
         assert result == {self.project: 'bar'}
+
+    def test_get_all_values_bulk(self):
+        other = self.create_project()
+        ProjectOption.objects.create(project=self.project, key='foo', value='bar')
+
+        assert ProjectOption.objects.get_all_values_bulk([self.project, other.id]) == {
+            self.project.id: {'foo': 'bar'},
+            other.id: {},
+        }
+
+        # Values are served from the local cache without any queries.
+        with self.assertNumQueries(0):
+            assert ProjectOption.objects.get_all_values_bulk([self.project]) == {
+                self.project.id: {'foo': 'bar'},
+            }
+
+        # Values that aren't cached locally are loaded from the shared cache.
+        ProjectOption.objects.clear_local_cache()
+        with self.assertNumQueries(0):
+            assert ProjectOption.objects.get_all_values(other) == {}
+
+        ProjectOption.objects.set_value(other, 'foo', 'baz')
+        assert ProjectOption.objects.get_all_values(other) == {'foo': 'baz'}
@@ -9,6 +9,7 @@ import time
 from exam import fixture, patcher
 
 from sentry.quotas.redis import (
+    admit_event,
     is_rate_limited,
     BasicRedisQuota,
     RedisQuota,
@@ -68,6 +69,35 @@ def test_is_rate_limited_script():
     ))) == [False, ]
 
 
+def test_admit_event_script():
+    now = int(time.time())
+
+    cluster = clusters.get('default')
+    client = cluster.get_local_client(six.next(iter(cluster.hosts)))
+
+    keys = ('admit:foo', 'r:admit:foo', 'ev:1:a')
+    assert list(map(bool, admit_event(client, keys, (1, now + 60, 1, 300)))) == [False, False]
+    assert client.get('admit:foo') == '1'
+    assert 299 <= client.ttl('ev:1:a') <= 300
+
+    # The same event ID is reported as a duplicate.
+    keys = ('admit:bar', 'r:admit:bar', 'ev:1:a')
+    assert list(map(bool, admit_event(client, keys, (2, now + 60, 1, 300)))) == [False, True]
+
+    # Rejections by an enforced quota don't remember the event ID...
+    keys = ('admit:foo', 'r:admit:foo', 'ev:1:b')
+    assert list(map(bool, admit_event(client, keys, (1, now + 60, 1, 300)))) == [True, False]
+    assert client.get('ev:1:b') is None
+
+    # ...but rejections by a quota which is not enforced do.
+    assert list(map(bool, admit_event(client, keys, (1, now + 60, 0, 300)))) == [True, False]
+    assert client.get('ev:1:b') == '1'
+    assert client.get('admit:foo') == '1'
+
+    # Without any quotas only the event ID is checked.
+    assert list(map(bool, admit_event(client, ('ev:1:b', ), (300, )))) == [True]
+
+
 class RedisQuotaTest(TestCase):
     quota = fixture(RedisQuota)
 
@@ -155,6 +185,32 @@ class RedisQuotaTest(TestCase):
 
         assert self.quota.is_rate_limited(self.project).is_limited
 
+    def test_admit_event(self):
+        self.get_project_quota.return_value = (1, 60)
+
+        rate_limit, is_duplicate = self.quota.admit_event(self.project, 'a' * 32)
+        assert not rate_limit.is_limited
+        assert not is_duplicate
+
+        # Duplicates are still rejected by the quota first.
+        rate_limit, is_duplicate = self.quota.admit_event(self.project, 'a' * 32)
+        assert rate_limit.is_limited
+        assert rate_limit.reason_code == 'project_quota'
+        assert not is_duplicate
+
+    def test_admit_event_duplicate(self):
+        rate_limit, is_duplicate = self.quota.admit_event(self.project, 'a' * 32)
+        assert not rate_limit.is_limited
+        assert not is_duplicate
+
+        rate_limit, is_duplicate = self.quota.admit_event(self.project, 'a' * 32)
+        assert not rate_limit.is_limited
+        assert is_duplicate
+
+        self.quota.forget_event_id(self.project, 'a' * 32)
+        rate_limit, is_duplicate = self.quota.admit_event(self.project, 'a' * 32)
+        assert not is_duplicate
+
     def test_get_usage(self):
         timestamp = time.time()
 
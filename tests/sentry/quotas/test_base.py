@@ -2,6 +2,8 @@
 
 from __future__ import absolute_import
 
+import mock
+
 from sentry.models import OrganizationOption, ProjectKey
 from sentry.quotas.base import Quota
 from sentry.testutils import TestCase
@@ -41,3 +43,16 @@ class QuotaTest(TestCase):
             project=self.project, rate_limit_window=None, rate_limit_count=None
         )
         assert self.backend.get_key_quota(key) == (0, 0)
+
+    @mock.patch('django.core.cache.cache')
+    def test_admit_event(self, cache):
+        cache.get.return_value = None
+        rate_limit, is_duplicate = self.backend.admit_event(self.project, 'a' * 32)
+        assert not rate_limit.is_limited
+        assert not is_duplicate
+        cache.set.assert_called_once_with(
+            'ev:{}:{}'.format(self.project.id, 'a' * 32), '', 300)
+
+        cache.get.return_value = ''
+        rate_limit, is_duplicate = self.backend.admit_event(self.project, 'a' * 32)
+        assert is_duplicate
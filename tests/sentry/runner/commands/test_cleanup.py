@@ -2,9 +2,14 @@
 
 from __future__ import absolute_import
 
+from mock import patch
+
+from sentry import tagindex
 from sentry.models import Event, Group
 from sentry.tagstore.legacy.models import GroupTagKey, GroupTagValue, TagValue
 from sentry.runner.commands.cleanup import cleanup
+from sentry.search.base import ANY
+from sentry.tagindex.redis import RedisTagIndex
 from sentry.testutils import CliTestCase
 
 ALL_MODELS = (Event, Group, GroupTagKey, GroupTagValue, TagValue)
@@ -39,3 +44,21 @@ class SentryCleanupTest(CliTestCase):
 
         for model in ALL_MODELS:
             assert model.objects.count() == 0
+
+    def test_tag_index(self):
+        tag_index = RedisTagIndex()
+        tag_index.rebuild(1)
+        tag_index.index_group_tags(1, 2, [('key', 'value'), ('key', 'other')])
+        tag_index.index_group_tags(1, 3, [('key', 'value')])
+
+        with patch.object(tagindex.backend, '_wrapped', tag_index):
+            rv = self.invoke('--days=1', '--project=2')
+            assert rv.exit_code == 0, rv.output
+            assert tag_index.get_group_ids(1, {'key': 'value'}) == set([2, 3])
+
+            # only the deleted group tag value is removed from the index
+            rv = self.invoke('--days=1')
+            assert rv.exit_code == 0, rv.output
+            assert tag_index.get_group_ids(1, {'key': 'value'}) == set([3])
+            assert tag_index.get_group_ids(1, {'key': 'other'}) == set([2])
+            assert tag_index.get_group_ids(1, {'key': ANY}) == set([2, 3])
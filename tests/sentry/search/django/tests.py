@@ -2,6 +2,8 @@
 
 from __future__ import absolute_import
 
+import mock
+
 from datetime import datetime, timedelta
 
 from sentry import tagstore
@@ -10,6 +12,7 @@ from sentry.models import (
 )
 from sentry.search.base import ANY
 from sentry.search.django.backend import DjangoSearchBackend
+from sentry.tagindex.redis import RedisTagIndex
 from sentry.testutils import TestCase
 
 
@@ -178,6 +181,33 @@ class DjangoSearchBackendTest(TestCase):
         )
         assert len(results) == 0
 
+    def test_tags_with_tag_index(self):
+        tag_index = RedisTagIndex()
+        tag_index.rebuild(self.project1.id)
+
+        with mock.patch('sentry.search.django.backend.tagindex', tag_index):
+            results = self.backend.query(self.project1, tags={'env': 'staging'})
+            assert len(results) == 1
+            assert results[0] == self.group2
+
+            results = self.backend.query(self.project1, tags={'env': ANY})
+            assert len(results) == 2
+
+            results = self.backend.query(
+                self.project1, tags={'env': 'staging',
+                                     'server': 'bar.example.com'}
+            )
+            assert len(results) == 0
+
+    def test_tags_with_tag_index_too_many_results(self):
+        tag_index = RedisTagIndex(max_results=1)
+        tag_index.rebuild(self.project1.id)
+
+        with mock.patch('sentry.search.django.backend.tagindex', tag_index):
+            assert tag_index.get_group_ids(self.project1.id, {'env': ANY}) is None
+            results = self.backend.query(self.project1, tags={'env': ANY})
+            assert len(results) == 2
+
     def test_bookmarked_by(self):
         results = self.backend.query(self.project1, bookmarked_by=self.user)
         assert len(results) == 1
@@ -0,0 +1,64 @@
+from __future__ import absolute_import
+
+from datetime import datetime, timedelta
+
+from django.utils import timezone
+from exam import fixture
+from mock import patch
+
+from sentry.similarity import _make_index_backend, features
+from sentry.similarity.buffer import FeatureRecordBuffer
+from sentry.testutils import TestCase
+from sentry.utils import redis
+from sentry.utils.dates import to_timestamp
+
+# Use the default redis client as a cluster client in the similarity index
+client = redis.clusters.get('default').get_local_client(0)
+index = _make_index_backend(client)
+
+
+@patch('sentry.similarity.features.index', new=index)
+class FeatureRecordBufferTestCase(TestCase):
+    @fixture
+    def buffer(self):
+        return FeatureRecordBuffer(features, client)
+
+    def test_flush_matches_record(self):
+        buffered = self.create_group()
+        recorded = self.create_group()
+
+        for message in ('This is message #1.', 'This is message #1.', 'Something else.'):
+            self.buffer.add(self.create_event(group=buffered, message=message))
+            features.record([self.create_event(group=recorded, message=message)])
+
+        assert self.buffer.flush() == 1
+        assert self.buffer.flush() == 0
+
+        scores = dict(features.compare(recorded))
+        assert scores[buffered.id]['message:message:character-shingles'] == 1.0
+
+    def test_flush_records_each_interval(self):
+        group = self.create_group()
+        buffer = FeatureRecordBuffer(features, client, interval=60)
+        start = datetime(2017, 1, 1, tzinfo=timezone.utc)
+
+        for seconds in (0, 30, 20, 120):
+            buffer.add(
+                self.create_event(
+                    group=group,
+                    message='This is message #1.',
+                    datetime=start + timedelta(seconds=seconds),
+                )
+            )
+
+        with patch.object(features, 'record_encoded') as record_encoded:
+            assert buffer.flush() == 1
+
+        timestamp = int(to_timestamp(start))
+        assert [
+            (call[1]['timestamp'], [count for _, _, count in call[0][2]])
+            for call in record_encoded.call_args_list
+        ] == [
+            (timestamp + 30, [3]),
+            (timestamp + 120, [1]),
+        ]
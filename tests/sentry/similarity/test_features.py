@@ -0,0 +1,42 @@
+from __future__ import absolute_import
+
+from collections import namedtuple
+
+from mock import Mock
+
+from sentry.similarity.features import FeatureSet, InterfaceDoesNotExist, MessageFeature
+from sentry.testutils import TestCase
+from sentry.utils.datastructures import BidirectionalMapping, LRUCache
+
+Event = namedtuple('Event', 'interfaces')
+Message = namedtuple('Message', 'message')
+
+
+def make_event(message):
+    return Event({'sentry.interfaces.Message': Message(message)})
+
+
+class FeatureSetTestCase(TestCase):
+    def test_encode_cache(self):
+        function = Mock(side_effect=lambda interface: list(interface.message))
+        encoder = Mock()
+        encoder.dumps.side_effect = lambda value: value
+        features = FeatureSet(
+            Mock(),
+            encoder,
+            BidirectionalMapping({'message': 'a'}),
+            {'message': MessageFeature(function)},
+            expected_extraction_errors=(InterfaceDoesNotExist, ),
+            expected_encoding_errors=(),
+            cache=LRUCache(10),
+        )
+
+        assert features.encode(make_event('ab')) == [('message', ['a', 'b'])]
+        assert features.encode(make_event('ab')) == [('message', ['a', 'b'])]
+        assert function.call_count == 1
+
+        assert features.encode(make_event('cd')) == [('message', ['c', 'd'])]
+        assert function.call_count == 2
+
+        assert features.encode(Event({})) == []
+        assert function.call_count == 2
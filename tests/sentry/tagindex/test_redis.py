@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+import mock
+
+from sentry import tagstore
+from sentry.search.base import ANY, EMPTY
+from sentry.tagindex.redis import RedisTagIndex
+from sentry.testutils import TestCase
+
+
+class RedisTagIndexTest(TestCase):
+    def setUp(self):
+        self.backend = RedisTagIndex()
+
+    @mock.patch('sentry.tasks.tagindex.rebuild_tag_index.apply_async')
+    def test_not_ready_until_rebuilt(self, apply_async):
+        self.backend.index_group_tags(self.project.id, 1, [('environment', 'production')])
+        assert self.backend.get_group_ids(self.project.id, {'environment': 'production'}) is None
+
+    def test_intersection(self):
+        self.backend.rebuild(self.project.id)
+        self.backend.index_group_tags(self.project.id, 1, [
+            ('environment', 'production'),
+            ('browser', 'Chrome'),
+        ])
+        self.backend.index_group_tags(self.project.id, 2, [
+            ('environment', 'production'),
+            ('browser', 'Firefox'),
+        ])
+        self.backend.index_group_tags(self.project.id, 3, [
+            ('environment', 'staging'),
+        ])
+
+        get_group_ids = self.backend.get_group_ids
+        assert get_group_ids(self.project.id, {'environment': 'production'}) == set([1, 2])
+        assert get_group_ids(self.project.id, {
+            'environment': 'production',
+            'browser': 'Chrome',
+        }) == set([1])
+        assert get_group_ids(self.project.id, {'browser': ANY}) == set([1, 2])
+        assert get_group_ids(self.project.id, {
+            'environment': 'staging',
+            'browser': ANY,
+        }) == set()
+        assert get_group_ids(self.project.id, {'environment': EMPTY}) == set()
+        assert get_group_ids(self.project.id, {'environment': 'development'}) == set()
+
+    @mock.patch('sentry.tasks.tagindex.rebuild_tag_index.apply_async')
+    def test_rebuild(self, apply_async):
+        group = self.create_group(project=self.project)
+        other_project = self.create_project()
+        other_group = self.create_group(project=other_project)
+        tagstore.create_group_tag_value(
+            project_id=self.project.id,
+            group_id=group.id,
+            environment_id=None,
+            key='environment',
+            value='production',
+        )
+        tagstore.create_group_tag_value(
+            project_id=other_project.id,
+            group_id=other_group.id,
+            environment_id=None,
+            key='environment',
+            value='production',
+        )
+
+        # stale data is cleared by a rebuild
+        self.backend.rebuild(self.project.id)
+        self.backend.index_group_tags(self.project.id, 0, [('environment', 'production')])
+        client = self.backend._get_client(self.project.id)
+        keys = client.keys('ti:%s:*' % (self.project.id, ))
+
+        self.backend.rebuild(self.project.id)
+        assert self.backend.get_group_ids(
+            self.project.id, {'environment': 'production'}) == set([group.id])
+        assert not set(keys) & set(client.keys('ti:%s:*' % (self.project.id, )))
+
+        self.backend.delete_project(self.project.id)
+        assert self.backend.get_group_ids(
+            self.project.id, {'environment': 'production'}) is None
+
+    def test_rebuild_is_scheduled(self):
+        with mock.patch('sentry.tasks.tagindex.rebuild_tag_index.apply_async') as apply_async:
+            assert self.backend.get_group_ids(self.project.id, {'environment': 'production'}) is None
+            assert self.backend.get_group_ids(self.project.id, {'environment': 'production'}) is None
+            apply_async.assert_called_once_with(
+                kwargs={'project_id': self.project.id, 'generation': mock.ANY},
+                countdown=self.backend.rebuild_delay,
+            )
+
+        # changes made after the rebuild was scheduled are kept, even if the
+        # tag store doesn't have them yet
+        self.backend.index_group_tags(self.project.id, 1, [('environment', 'production')])
+        self.backend.rebuild(**apply_async.call_args[1]['kwargs'])
+        assert self.backend.get_group_ids(
+            self.project.id, {'environment': 'production'}) == set([1])
+
+        # the next rebuild can be scheduled once the index is complete
+        self.backend.invalidate(self.project.id)
+        with mock.patch('sentry.tasks.tagindex.rebuild_tag_index.apply_async') as apply_async:
+            assert self.backend.get_group_ids(self.project.id, {'environment': 'production'}) is None
+            assert apply_async.call_count == 1
+
+    def test_rebuild_superseded(self):
+        with mock.patch('sentry.tasks.tagindex.rebuild_tag_index.apply_async') as apply_async:
+            self.backend.get_group_ids(self.project.id, {'environment': 'production'})
+        kwargs = apply_async.call_args[1]['kwargs']
+
+        self.backend.rebuild(self.project.id)
+        self.backend.index_group_tags(self.project.id, 1, [('environment', 'production')])
+
+        # a scheduled rebuild doesn't replace a rebuild that was started later
+        self.backend.rebuild(**kwargs)
+        assert self.backend.get_group_ids(
+            self.project.id, {'environment': 'production'}) == set([1])
+
+    def test_too_many_results(self):
+        backend = RedisTagIndex(max_results=1)
+        backend.rebuild(self.project.id)
+        backend.index_group_tags(self.project.id, 1, [('environment', 'production')])
+        backend.index_group_tags(self.project.id, 2, [
+            ('environment', 'production'),
+            ('browser', 'Chrome'),
+        ])
+
+        assert backend.get_group_ids(self.project.id, {'environment': 'production'}) is None
+        assert backend.get_group_ids(self.project.id, {
+            'environment': 'production',
+            'browser': 'Chrome',
+        }) == set([2])
+
+    def test_merge_groups(self):
+        self.backend.rebuild(self.project.id)
+        self.backend.index_group_tags(self.project.id, 1, [
+            ('environment', 'production'),
+            ('browser', 'Chrome'),
+        ])
+        self.backend.index_group_tags(self.project.id, 2, [('environment', 'staging')])
+
+        self.backend.merge_groups(self.project.id, 1, 2)
+
+        get_group_ids = self.backend.get_group_ids
+        assert get_group_ids(self.project.id, {'environment': 'production'}) == set([2])
+        assert get_group_ids(self.project.id, {'environment': 'staging'}) == set([2])
+        assert get_group_ids(self.project.id, {'browser': ANY}) == set([2])
+
+        # the merged tags are removed along with the group
+        self.backend.delete_groups(self.project.id, [2])
+        assert get_group_ids(self.project.id, {'browser': ANY}) == set()
+
+    def test_merge_groups_does_not_restore_deleted_keys(self):
+        self.backend.rebuild(self.project.id)
+        self.backend.index_group_tags(self.project.id, 1, [('browser', 'Chrome')])
+        self.backend.delete_tag_key(self.project.id, 'browser')
+
+        self.backend.merge_groups(self.project.id, 1, 2)
+        assert self.backend.get_group_ids(self.project.id, {'browser': 'Chrome'}) == set()
+        assert self.backend.get_group_ids(self.project.id, {'browser': ANY}) == set()
+
+    def test_delete_groups(self):
+        self.backend.rebuild(self.project.id)
+        self.backend.index_group_tags(self.project.id, 1, [('environment', 'production')])
+        self.backend.index_group_tags(self.project.id, 2, [('environment', 'production')])
+
+        self.backend.delete_groups(self.project.id, [1])
+        assert self.backend.get_group_ids(
+            self.project.id, {'environment': 'production'}) == set([2])
+        assert self.backend.get_group_ids(self.project.id, {'environment': ANY}) == set([2])
+
+    def test_remove_group_tags(self):
+        self.backend.rebuild(self.project.id)
+        self.backend.index_group_tags(self.project.id, 1, [
+            ('environment', 'production'),
+            ('environment', 'staging'),
+            ('browser', 'Chrome'),
+        ])
+
+        get_group_ids = self.backend.get_group_ids
+        self.backend.remove_group_tags(self.project.id, 1, [('environment', 'production')])
+        assert get_group_ids(self.project.id, {'environment': 'production'}) == set()
+        assert get_group_ids(self.project.id, {'environment': ANY}) == set([1])
+
+        self.backend.remove_group_tags(self.project.id, 1, [
+            ('environment', 'staging'),
+            ('browser', 'Chrome'),
+        ])
+        assert get_group_ids(self.project.id, {'environment': ANY}) == set()
+        assert get_group_ids(self.project.id, {'browser': ANY}) == set()
+
+        # the group is no longer referenced by the index
+        client = self.backend._get_client(self.project.id)
+        assert client.keys('ti:%s:*:g:*' % (self.project.id, )) == []
+
+    def test_delete_tag_key(self):
+        self.backend.rebuild(self.project.id)
+        self.backend.index_group_tags(self.project.id, 1, [
+            ('environment', 'production'),
+            ('browser', 'Chrome'),
+        ])
+
+        self.backend.delete_tag_key(self.project.id, 'browser')
+
+        get_group_ids = self.backend.get_group_ids
+        assert get_group_ids(self.project.id, {'browser': 'Chrome'}) == set()
+        assert get_group_ids(self.project.id, {'browser': ANY}) == set()
+        assert get_group_ids(self.project.id, {'environment': 'production'}) == set([1])
+
+    def test_invalidate(self):
+        other_project = self.create_project()
+        self.backend.rebuild(self.project.id)
+        self.backend.rebuild(other_project.id)
+
+        with mock.patch('sentry.tasks.tagindex.rebuild_tag_index.apply_async'):
+            self.backend.invalidate(self.project.id)
+            assert self.backend.get_group_ids(self.project.id, {'environment': ANY}) is None
+            assert self.backend.get_group_ids(other_project.id, {'environment': ANY}) == set()
@@ -3,9 +3,10 @@ from __future__ import absolute_import
 from collections import defaultdict
 from mock import patch
 
-from sentry import tagstore
+from sentry import tagindex, tagstore
+from sentry.tagindex.redis import RedisTagIndex
 from sentry.tagstore.models import GroupTagValue
-from sentry.tasks.merge import merge_group, rehash_group_events
+from sentry.tasks.merge import merge_group, merge_objects, rehash_group_events
 from sentry.models import Event, Group, GroupMeta, GroupRedirect, UserReport
 from sentry.similarity import _make_index_backend
 from sentry.testutils import TestCase
@@ -62,6 +63,21 @@ class MergeGroupTest(TestCase):
             group_id=groups[2].id,
         ).count() == 2
 
+    def test_merge_updates_tag_index(self):
+        project = self.create_project()
+        group1, group2 = [self.create_group(project) for _ in range(0, 2)]
+
+        tag_index = RedisTagIndex()
+        tag_index.rebuild(project.id)
+        tag_index.index_group_tags(project.id, group1.id, [('foo', 'bar')])
+        tag_index.index_group_tags(project.id, group2.id, [('foo', 'baz')])
+
+        with patch.object(tagindex.backend, '_wrapped', tag_index), self.tasks():
+            merge_group(group1.id, group2.id)
+
+        assert tag_index.get_group_ids(project.id, {'foo': 'bar'}) == set([group2.id])
+        assert tag_index.get_group_ids(project.id, {'foo': 'baz'}) == set([group2.id])
+
     def test_merge_updates_tag_values_seen(self):
         project = self.create_project()
         target, other = [self.create_group(project) for _ in range(0, 2)]
@@ -209,6 +225,81 @@ class MergeGroupTest(TestCase):
         assert UserReport.objects.get(id=ur.id).group_id == group2.id
 
 
+class MergeObjectsTest(TestCase):
+    def test_respects_limit(self):
+        project = self.create_project()
+        group1, group2 = [self.create_group(project) for _ in range(0, 2)]
+        for key in ('a', 'b', 'c'):
+            GroupMeta.objects.create(group=group1, key=key, value='1')
+
+        calls = 0
+        while merge_objects([GroupMeta], group1, group2, limit=2):
+            calls += 1
+
+        assert calls == 2
+        assert not GroupMeta.objects.filter(group=group1).exists()
+        assert sorted(GroupMeta.objects.filter(group=group2).values_list('key', flat=True)) == [
+            'a', 'b', 'c',
+        ]
+
+    def test_merges_conflicting_counts(self):
+        project = self.create_project()
+        group1, group2 = [self.create_group(project) for _ in range(0, 2)]
+
+        for group, value, times_seen in [
+            (group1, 'foo', 1),
+            (group1, 'bar', 2),
+            (group1, 'baz', 3),
+            (group2, 'bar', 5),
+        ]:
+            tagstore.create_group_tag_value(
+                project_id=project.id,
+                group_id=group.id,
+                environment_id=self.environment.id,
+                key='key',
+                value=value,
+                times_seen=times_seen,
+            )
+
+        while merge_objects([GroupTagValue], group1, group2, limit=2):
+            pass
+
+        assert not GroupTagValue.objects.filter(group_id=group1.id).exists()
+        assert dict(
+            (gtv.value, gtv.times_seen) for gtv in
+            tagstore.get_group_tag_values(project.id, group2.id, None, 'key')
+        ) == {'foo': 1, 'bar': 7, 'baz': 3}
+
+    def test_merges_counts_out_of_range(self):
+        project = self.create_project()
+        group1, group2 = [self.create_group(project) for _ in range(0, 2)]
+        max_value = GroupTagValue._meta.get_field('times_seen').MAX_VALUE
+
+        for group, value, times_seen in [
+            (group1, 'foo', 1),
+            (group1, 'bar', 2),
+            (group2, 'foo', 3),
+            (group2, 'bar', max_value),
+        ]:
+            tagstore.create_group_tag_value(
+                project_id=project.id,
+                group_id=group.id,
+                environment_id=self.environment.id,
+                key='key',
+                value=value,
+                times_seen=times_seen,
+            )
+
+        while merge_objects([GroupTagValue], group1, group2):
+            pass
+
+        assert not GroupTagValue.objects.filter(group_id=group1.id).exists()
+        assert dict(
+            (gtv.value, gtv.times_seen) for gtv in
+            tagstore.get_group_tag_values(project.id, group2.id, None, 'key')
+        ) == {'foo': 4, 'bar': max_value}
+
+
 class RehashGroupEventsTest(TestCase):
     def test_simple(self):
         project = self.create_project()
@@ -236,3 +327,29 @@ class RehashGroupEventsTest(TestCase):
         assert sorted(Event.objects.filter(group_id=group2.id).values_list('id', flat=True)) == [
             event3.id,
         ]
+
+    def test_aggregates_counts(self):
+        project = self.create_project()
+        group = self.create_group(project)
+        tags = [['environment', 'production'], ['foo', 'bar']]
+        events = [
+            self.create_event(c * 32, message='foo', group=group, data={'tags': tags})
+            for c in 'abc'
+        ]
+
+        with self.tasks():
+            rehash_group_events(group.id)
+
+        new_group = Event.objects.get(id=events[0].id).group
+        assert new_group.id != group.id
+        assert sorted(Event.objects.filter(group_id=new_group.id).values_list('id', flat=True)) == [
+            e.id for e in events
+        ]
+        assert new_group.times_seen == 3
+        assert tagstore.get_group_tag_value(
+            project_id=project.id,
+            group_id=new_group.id,
+            environment_id=None,
+            key='foo',
+            value='bar',
+        ).times_seen == 3
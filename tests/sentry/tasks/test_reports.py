@@ -9,12 +9,13 @@ import pytz
 from django.core import mail
 
 from sentry.app import tsdb
-from sentry.models import Project, UserOption
+from sentry.models import GroupStatus, Project, UserOption
 from sentry.tasks.reports import (
     DISABLED_ORGANIZATIONS_USER_OPTION_KEY, Report, Skipped, change, clean_series, colorize,
     deliver_organization_user_report, get_calendar_range, get_percentile, has_valid_aggregates,
-    index_to_month, merge_mappings, merge_sequences, merge_series, month_to_index, prepare_reports,
-    safe_add, user_subscribed_to_organization_reports
+    index_to_month, merge_mappings, merge_sequences, merge_series, month_to_index,
+    prepare_organization_reports, prepare_project_report, prepare_reports, safe_add,
+    user_subscribed_to_organization_reports
 )
 from sentry.testutils.cases import TestCase
 from sentry.utils.dates import to_datetime, to_timestamp
@@ -298,6 +299,42 @@ class ReportTestCase(TestCase):
             message = mail.outbox[0]
             assert self.organization.name in message.subject
 
+    def test_prepare_organization_reports(self):
+        now = datetime(2016, 9, 12, tzinfo=pytz.utc)
+        interval = (now - timedelta(days=7), now)
+
+        projects = [
+            self.create_project(
+                organization=self.organization,
+                team=self.team,
+                date_added=now - timedelta(days=90),
+            ) for _ in range(3)
+        ]
+
+        for i, project in enumerate(projects[:2]):
+            resolved = self.create_group(
+                project=project,
+                status=GroupStatus.RESOLVED,
+                resolved_at=now - timedelta(days=2),
+                first_seen=now - timedelta(days=3),
+                last_seen=now - timedelta(days=2),
+            )
+            unresolved = self.create_group(project=project, first_seen=now - timedelta(days=30))
+            for days, group, count in [(1, resolved, 2 + i), (3, unresolved, 5), (10, unresolved, 1)]:
+                timestamp = now - timedelta(days=days)
+                tsdb.incr(tsdb.models.group, group.id, timestamp, count=count)
+                tsdb.incr(tsdb.models.project, project.id, timestamp, count=count)
+
+        with mock.patch.object(tsdb, 'get_earliest_timestamp') as get_earliest_timestamp:
+            get_earliest_timestamp.return_value = to_timestamp(now - timedelta(days=60))
+
+            reports = prepare_organization_reports(interval, projects)
+            assert reports == {
+                project.id: prepare_project_report(interval, project) for project in projects
+            }
+
+        assert reports[projects[0].id].issue_summaries == [2, 0, 5]
+
     def test_deliver_organization_user_report_respects_settings(self):
         user = self.user
         organization = self.organization
@@ -12,7 +12,7 @@ import pytz
 from django.utils import timezone
 from mock import patch
 
-from sentry import tagstore
+from sentry import tagindex, tagstore
 from sentry.tagstore.models import GroupTagValue
 from sentry.app import tsdb
 from sentry.event_manager import ScoreClause
@@ -20,10 +20,12 @@ from sentry.models import (
     Activity, Environment, EnvironmentProject, Event, EventMapping, Group, GroupHash, GroupRelease,
     Release, UserReport
 )
+from sentry.search.base import ANY
 from sentry.similarity import features, _make_index_backend
+from sentry.tagindex.redis import RedisTagIndex
 from sentry.tasks.unmerge import (
     get_caches, get_event_user_from_interface, get_fingerprint, get_group_backfill_attributes,
-    get_group_creation_attributes, unmerge
+    get_group_creation_attributes, repair_tag_data, truncate_denormalizations, unmerge
 )
 from sentry.testutils import TestCase
 from sentry.utils.dates import to_timestamp
@@ -186,6 +188,47 @@ class UnmergeTestCase(TestCase):
             'first_release': None,
         }
 
+    def test_repair_tag_index(self):
+        project = self.create_project()
+        source = self.create_group(project)
+        destination = self.create_group(project)
+        Environment.objects.create(
+            organization_id=project.organization_id,
+            name='production',
+        )
+
+        tag_index = RedisTagIndex()
+        tag_index.rebuild(project.id)
+        tag_index.index_group_tags(project.id, source.id, [('color', 'red'), ('color', 'blue')])
+
+        events = [
+            Event(
+                project_id=project.id,
+                group_id=group.id,
+                event_id=uuid.uuid4().hex,
+                datetime=timezone.now(),
+                data={
+                    'tags': [
+                        ['color', color],
+                        ['environment', 'production'],
+                    ],
+                },
+            ) for group, color in ((source, 'red'), (destination, 'blue'))
+        ]
+
+        with patch.object(tagindex.backend, '_wrapped', tag_index):
+            truncate_denormalizations(source)
+            assert tag_index.get_group_ids(project.id, {'color': ANY}) == set()
+
+            repair_tag_data(get_caches(), project, events)
+
+        assert tag_index.get_group_ids(project.id, {'color': 'red'}) == set([source.id])
+        assert tag_index.get_group_ids(project.id, {'color': 'blue'}) == set([destination.id])
+        assert tag_index.get_group_ids(project.id, {'environment': 'production'}) == set([
+            source.id,
+            destination.id,
+        ])
+
     def test_unmerge(self):
         def shift(i):
             return timedelta(seconds=1 << i)
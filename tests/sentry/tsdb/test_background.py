@@ -0,0 +1,42 @@
+from __future__ import absolute_import
+
+import mock
+
+from datetime import datetime
+from django.utils import timezone
+
+from sentry.testutils import TestCase
+from sentry.tsdb.background import BackgroundIncrementer
+from sentry.tsdb.base import TSDBModel
+
+
+class BackgroundIncrementerTest(TestCase):
+    @mock.patch('sentry.tsdb.incr_multi')
+    def test_flush_aggregates(self, incr_multi):
+        incrementer = BackgroundIncrementer(interval=3600, resolution=10)
+        timestamp = datetime(2017, 1, 1, 0, 0, 1, tzinfo=timezone.utc)
+        later = datetime(2017, 1, 1, 0, 0, 9, tzinfo=timezone.utc)
+        next_bucket = datetime(2017, 1, 1, 0, 0, 10, tzinfo=timezone.utc)
+
+        incrementer.incr_multi([
+            (TSDBModel.project_total_received, 1),
+            (TSDBModel.key_total_received, 2),
+        ], timestamp)
+        incrementer.incr_multi([(TSDBModel.project_total_received, 1)], later)
+        incrementer.incr_multi([(TSDBModel.project_total_received, 1)], next_bucket)
+
+        assert not incr_multi.called
+        incrementer.flush()
+
+        bucket = datetime(2017, 1, 1, 0, 0, 0, tzinfo=timezone.utc)
+        assert len(incr_multi.call_args_list) == 3
+        incr_multi.assert_any_call(
+            [(TSDBModel.project_total_received, 1)], timestamp=bucket, count=2)
+        incr_multi.assert_any_call(
+            [(TSDBModel.key_total_received, 2)], timestamp=bucket, count=1)
+        incr_multi.assert_any_call(
+            [(TSDBModel.project_total_received, 1)], timestamp=next_bucket, count=1)
+
+        incr_multi.reset_mock()
+        incrementer.flush()
+        assert not incr_multi.called
@@ -2,7 +2,7 @@
 
 from __future__ import absolute_import
 
-from sentry.utils.hashlib import md5_text, sha1_text
+from sentry.utils.hashlib import hash_values, md5_text, sha1_text
 from sentry.testutils import TestCase
 
 
@@ -14,3 +14,9 @@ class HashlibTest(TestCase):
     def test_unicode(self):
         md5_text(u'ü').hexdigest() == 'c03410a5204b21cd8229ff754688d743'
         sha1_text(u'ü').hexdigest() == '94a759fd37735430753c7b6b80684306d80ea16e'
+
+    def test_hash_values(self):
+        assert hash_values(['ab', 'c']) == hash_values(['ab', 'c'])
+        assert hash_values(['ab', 'c']) != hash_values(['a', 'bc'])
+        assert hash_values([None]) != hash_values([''])
+        assert hash_values([u'ü']) == hash_values([u'ü'.encode('utf-8')])
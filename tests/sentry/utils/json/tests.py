@@ -5,6 +5,8 @@ from __future__ import absolute_import
 import datetime
 import uuid
 
+from six import BytesIO
+
 from sentry.utils import json
 
 from sentry.testutils import TestCase
@@ -19,6 +21,17 @@ class JSONTest(TestCase):
         res = datetime.datetime(day=1, month=1, year=2011, hour=1, minute=1, second=1)
         self.assertEquals(json.dumps(res), '"2011-01-01T01:01:01.000000Z"')
 
+    def test_datetime_subclass(self):
+        class DateTime(datetime.datetime):
+            pass
+
+        res = DateTime(day=1, month=1, year=2011, hour=1, minute=1, second=1)
+        self.assertEquals(json.dumps(res), '"2011-01-01T01:01:01.000000Z"')
+
+    def test_date(self):
+        res = datetime.date(day=1, month=1, year=2011)
+        self.assertEquals(json.dumps(res), '"2011-01-01"')
+
     def test_set(self):
         res = set(['foo'])
         self.assertEquals(json.dumps(res), '["foo"]')
@@ -40,3 +53,8 @@ class JSONTest(TestCase):
     def test_inf(self):
         res = float('inf')
         self.assertEquals(json.dumps(res), 'null')
+
+    def test_dump(self):
+        fp = BytesIO()
+        json.dump({'foo': [uuid.UUID(int=1)]}, fp)
+        assert fp.getvalue() == '{"foo":["00000000000000000000000000000001"]}'
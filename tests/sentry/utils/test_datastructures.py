@@ -1,8 +1,9 @@
 from __future__ import absolute_import
 
 import pytest
+from mock import patch
 
-from sentry.utils.datastructures import BidirectionalMapping
+from sentry.utils.datastructures import BidirectionalMapping, LRUCache
 
 
 def test_bidirectional_mapping():
@@ -38,3 +39,50 @@ def test_bidirectional_mapping():
     del value['c']
 
     assert len(value) == len(value.inverse()) == 2
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1  # marks 'a' as recently used
+    cache.set('c', 3)
+
+    assert len(cache) == 2
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+
+
+def test_lru_cache_max_size():
+    cache = LRUCache(10, max_size=5)
+    cache.set('a', 'xx')
+    cache.set('b', 'yy')
+    cache.set('c', 'zz')
+    assert 'a' not in cache
+    assert cache.size == 4
+
+    cache.set('d', 'x' * 6)  # larger than the cache itself
+    assert 'd' not in cache
+    assert cache.size == 4
+
+    cache.set('b', 'y')
+    assert cache.size == 3
+
+    cache.delete('b')
+    assert cache.size == 2
+    assert len(cache) == 1
+
+
+def test_lru_cache_ttl():
+    cache = LRUCache(10, ttl=60)
+    with patch('sentry.utils.datastructures.time', return_value=1000):
+        cache.set('a', 1)
+
+    with patch('sentry.utils.datastructures.time', return_value=1059):
+        assert cache.get('a') == 1
+
+    with patch('sentry.utils.datastructures.time', return_value=1060):
+        assert cache.get('a') is None
+        assert 'a' not in cache
+        assert len(cache) == 0
@@ -1,14 +1,92 @@
 from __future__ import absolute_import
 
+import random
+import six
+
 from collections import OrderedDict
+from django.utils.encoding import force_text
 from functools import partial
 
+from sentry.interfaces.stacktrace import handle_nan
 from sentry.testutils import TestCase
 from sentry.utils.safe import safe_execute, trim, trim_dict, get_path
+from sentry.utils.strings import truncatechars
 
 a_very_long_string = 'a' * 1024
 
 
+def reference_trim(value, max_size=512, max_depth=3, object_hook=None, _depth=0, _size=0):
+    # The original implementation of ``trim``, which stringifies every
+    # trimmed child to measure it.
+    options = {
+        'max_depth': max_depth,
+        'max_size': max_size,
+        'object_hook': object_hook,
+        '_depth': _depth + 1,
+    }
+
+    if _depth > max_depth:
+        if not isinstance(value, six.string_types):
+            value = repr(value)
+        return reference_trim(value, _size=_size, max_size=max_size)
+
+    elif isinstance(value, dict):
+        result = {}
+        _size += 2
+        for k in sorted(value.keys()):
+            v = value[k]
+            trim_v = reference_trim(v, _size=_size, **options)
+            result[k] = trim_v
+            _size += len(force_text(trim_v)) + 1
+            if _size >= max_size:
+                break
+
+    elif isinstance(value, (list, tuple)):
+        result = []
+        _size += 2
+        for v in value:
+            trim_v = reference_trim(v, _size=_size, **options)
+            result.append(trim_v)
+            _size += len(force_text(trim_v))
+            if _size >= max_size:
+                break
+
+    elif isinstance(value, six.string_types):
+        result = truncatechars(value, max_size - _size)
+
+    else:
+        result = value
+
+    if object_hook is None:
+        return result
+    return object_hook(result)
+
+
+def random_value(rng, depth=0):
+    kind = rng.randint(0, 9 if depth < 4 else 6)
+    width = 30 if depth < 2 else 4
+    if kind == 0:
+        return rng.choice([None, True, False])
+    if kind == 1:
+        return rng.randint(-10 ** 12, 10 ** 12)
+    if kind == 2:
+        return rng.choice([0.1 + 0.2, 1e100, -2.5, float('inf'), float('nan')])
+    if kind == 3:
+        return u''.join(rng.choice(u'ab\'"\n\xfc\u2603') for _ in range(rng.randint(0, 80)))
+    if kind == 4:
+        return ''.join(rng.choice(['a', 'b', '\'', '"', '\n', '\xc3\xbc']) for _ in range(rng.randint(0, 80)))
+    if kind in (5, 6):
+        return 'x' * rng.randint(0, 1200)
+    if kind == 7:
+        return tuple(random_value(rng, depth + 1) for _ in range(rng.randint(0, 4)))
+    if kind == 8:
+        return [random_value(rng, depth + 1) for _ in range(rng.randint(0, width))]
+    return dict(
+        (rng.choice([rng.randint(0, 100), u'k%d' % rng.randint(0, 100)]), random_value(rng, depth + 1))
+        for _ in range(rng.randint(0, width))
+    )
+
+
 class TrimTest(TestCase):
     def test_simple_string(self):
         assert trim(a_very_long_string) == a_very_long_string[:509] + '...'
@@ -39,6 +117,25 @@ class TrimTest(TestCase):
         assert trm(alpha) == expected
         assert trm(reverse) == expected
 
+    def test_matches_reference_trim(self):
+        rng = random.Random(42)
+        for _ in range(500):
+            value = random_value(rng)
+            kwargs = {
+                'max_size': rng.choice([0, 10, 100, 512, 4096]),
+                'max_depth': rng.choice([0, 1, 3, 6]),
+                'object_hook': rng.choice([None, handle_nan]),
+            }
+            assert repr(trim(value, **kwargs)) == repr(reference_trim(value, **kwargs))
+
+    def test_matches_reference_trim_recursive(self):
+        a = [1, {'b': None}]
+        a[1]['b'] = a
+        a.append((a, ))
+        for max_size in (5, 20, 512):
+            assert trim(a, max_size=max_size, max_depth=0) == \
+                reference_trim(a, max_size=max_size, max_depth=0)
+
 
 class TrimDictTest(TestCase):
     def test_large_dict(self):
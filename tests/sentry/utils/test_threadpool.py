@@ -0,0 +1,42 @@
+from __future__ import absolute_import
+
+import pytest
+import threading
+
+from sentry.utils.threadpool import BoundedThreadPool, TimeoutError
+
+
+def test_bounded_thread_pool():
+    pool = BoundedThreadPool(workers=2)
+    futures = [pool.submit(lambda x: x * 2, i) for i in range(10)]
+    assert [f.result(5) for f in futures] == [i * 2 for i in range(10)]
+    assert len(pool._threads) == 2
+
+
+def test_bounded_thread_pool_exception():
+    def fail():
+        raise ValueError('oops')
+
+    pool = BoundedThreadPool(workers=1)
+    with pytest.raises(ValueError):
+        pool.submit(fail).result(5)
+
+
+def test_bounded_thread_pool_timeout():
+    event = threading.Event()
+    pool = BoundedThreadPool(workers=1)
+    future = pool.submit(event.wait)
+    with pytest.raises(TimeoutError):
+        future.result(0.01)
+    event.set()
+    future.result(5)
+
+
+def test_bounded_thread_pool_nested_submit():
+    pool = BoundedThreadPool(workers=1)
+
+    def outer():
+        # would deadlock if not executed inline
+        return pool.submit(lambda: 'inner').result(5)
+
+    assert pool.submit(outer).result(5) == 'inner'